@@ -0,0 +1,563 @@
+"""The Armada stack as a dependency graph for the StackLauncher.
+
+Each component mirrors what used to be a fixture body in conftest.py. The edges
+are the real startup dependencies, so Keycloak, both databases and their
+migrations, the Azurite containers, the broker and the webhook receiver all come
+up side by side, and Flotilla and SARA start as soon as what they need is ready.
+
+The launcher owns the network too, so a stack can outlive a single test: with
+ARMADA_REUSE_STACK one launcher serves a whole xdist worker, and
+reset_armada_state() puts it back to a freshly seeded state between tests.
+"""
+
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from loguru import logger
+from testcontainers.core.container import DockerContainer
+from testcontainers.core.network import Network
+
+from robotics_integration_tests.armada import Armada
+from robotics_integration_tests.custom_containers.azurite import (
+    ArmadaStorage,
+    AzuriteStorageContainer,
+    azurite_connection_string_for_containers,
+    clear_blob_containers,
+    create_azurite_container,
+    ensure_blob_containers,
+)
+from robotics_integration_tests.custom_containers.flotilla_backend import (
+    FlotillaBackend,
+    create_flotilla_backend_container,
+)
+from robotics_integration_tests.custom_containers.keycloak import (
+    Keycloak,
+    create_keycloak_container,
+)
+from robotics_integration_tests.custom_containers.migration_sources import (
+    FLOTILLA_MIGRATIONS,
+    SARA_MIGRATIONS,
+)
+from robotics_integration_tests.custom_containers.migrations_runner import (
+    create_migrations_runner_container,
+    create_sara_migrations_runner_container,
+    run_migrations_to_completion,
+)
+from robotics_integration_tests.custom_containers.mosquitto import (
+    FlotillaBroker,
+    create_flotilla_broker_container,
+)
+from robotics_integration_tests.custom_containers.postgres import (
+    FlotillaDatabase,
+    SaraDatabase,
+    create_postgres_container,
+    create_sara_postgres_container,
+    flotilla_connection_string,
+    sara_connection_string,
+    truncate_all_tables,
+)
+from robotics_integration_tests.custom_containers.postgres_server import (
+    PostgresServer,
+    shared_postgres_server,
+)
+from robotics_integration_tests.custom_containers.postgres_snapshots import (
+    FLOTILLA_SNAPSHOT,
+    SARA_SNAPSHOT,
+    migrated_postgres_image,
+)
+from robotics_integration_tests.custom_containers.sara import (
+    Sara,
+    create_sara_container,
+)
+from robotics_integration_tests.custom_containers.teams_webhook_receiver import (
+    TeamsWebhookReceiver,
+    create_teams_webhook_receiver_container,
+)
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.authentication import (
+    configure_issuer,
+    reset_issuer,
+)
+from robotics_integration_tests.utilities.authentication_assertions import (
+    assert_authentication_is_enforced,
+)
+from robotics_integration_tests.utilities.backend_client import (
+    close_backend_clients,
+)
+from robotics_integration_tests.utilities.blob_storage import (
+    close_blob_service_clients,
+)
+from robotics_integration_tests.utilities.container_readiness import (
+    wait_for_healthy,
+    wait_for_published_port,
+)
+from robotics_integration_tests.utilities.flotilla_backend_api import (
+    populate_database_with_minimum_models,
+    wait_for_backend_to_be_responsive,
+)
+from robotics_integration_tests.utilities.flotilla_signalr import (
+    FlotillaSignalR,
+    mission_runs_activity,
+    robots_activity,
+    signalr_subscriber,
+    start_signalr_subscriber,
+    stop_signalr_subscriber,
+)
+from robotics_integration_tests.utilities.mqtt_observer import MqttObserver
+from robotics_integration_tests.utilities.sara_backend_api import (
+    wait_for_sara_to_be_responsive,
+)
+from robotics_integration_tests.utilities.stack_launcher import StackLauncher
+
+# Everything armada_without_robots needs; the launcher starts their dependencies too.
+ARMADA_COMPONENTS = (
+    "network",
+    "keycloak",
+    "flotilla_broker",
+    "flotilla_database",
+    "flotilla_backend",
+    "sara_database",
+    "sara",
+    "armada_storage",
+    "teams_webhook_receiver",
+)
+
+
+def wait_for_port_mapping_to_be_available(
+    container: DockerContainer, port: int, timeout: int = 60
+) -> None:
+    wait_for_published_port(container=container, port=port, timeout=timeout)
+
+
+class ArmadaLauncher(StackLauncher):
+    def __init__(self, test_id: str) -> None:
+        super().__init__(name=f"armada-{test_id}")
+        self.test_id: str = test_id
+        # Set once a test has run on this stack, so the next one resets it first.
+        self.is_dirty: bool = False
+
+
+@contextmanager
+def _network() -> Iterator[Network]:
+    with Network() as network:
+        yield network
+
+
+@contextmanager
+def _keycloak(network: Network, test_id: str) -> Iterator[Keycloak]:
+    """Local OpenID Connect issuer standing in for Azure Entra ID.
+
+    The realm is imported from custom_realms/, the same file a developer mounts to
+    run flotilla or sara against Keycloak locally, so a local run and a CI run
+    exercise the same clients, scopes and roles.
+    """
+    container, issuer = create_keycloak_container(
+        network=network,
+        alias=settings.KEYCLOAK_ALIAS,
+        port=settings.KEYCLOAK_PORT,
+        test_id=test_id,
+    )
+    with container:
+        wait_for_port_mapping_to_be_available(container=container, port=issuer.port)
+        issuer.wait_until_ready()
+
+        configure_issuer(issuer.host_url)
+        try:
+            yield issuer
+        finally:
+            reset_issuer()
+
+
+@contextmanager
+def _flotilla_database(network: Network, test_id: str) -> Iterator[FlotillaDatabase]:
+    snapshot: Optional[str] = migrated_postgres_image(FLOTILLA_SNAPSHOT)
+    with create_postgres_container(
+        network, test_id=test_id, image=snapshot or settings.POSTGRESQL_IMAGE
+    ) as database:
+        wait_for_port_mapping_to_be_available(container=database, port=5432)
+        logger.info(
+            f"Postgres URL: {database.get_connection_url()}, "
+            f"Port: {database.get_exposed_port(5432)}"
+        )
+
+        connection_string: str = flotilla_connection_string()
+
+        if snapshot is None:
+            run_migrations_to_completion(
+                create_migrations_runner_container(
+                    network=network,
+                    postgres_connection_string=connection_string,
+                    test_id=test_id,
+                    git_commit=FLOTILLA_MIGRATIONS.git_commit,
+                ),
+                description="Migrations",
+            )
+
+        yield FlotillaDatabase(
+            database=database,
+            connection_string=connection_string,
+            alias=settings.DB_ALIAS,
+        )
+
+
+@contextmanager
+def _sara_database(network: Network, test_id: str) -> Iterator[SaraDatabase]:
+    snapshot: Optional[str] = migrated_postgres_image(SARA_SNAPSHOT)
+    with create_sara_postgres_container(
+        network, test_id=test_id, image=snapshot or settings.POSTGRESQL_IMAGE
+    ) as database:
+        wait_for_port_mapping_to_be_available(container=database, port=5432)
+        logger.info(
+            f"Postgres URL: {database.get_connection_url()}, "
+            f"Port: {database.get_exposed_port(5432)}"
+        )
+
+        connection_string: str = sara_connection_string()
+
+        if snapshot is None:
+            run_migrations_to_completion(
+                create_sara_migrations_runner_container(
+                    network=network,
+                    postgres_connection_string=connection_string,
+                    test_id=test_id,
+                    git_commit=SARA_MIGRATIONS.git_commit,
+                ),
+                description="Sara migrations",
+            )
+
+        yield SaraDatabase(
+            database=database,
+            connection_string=connection_string,
+            alias=settings.SARA_DB_ALIAS,
+        )
+
+
+@contextmanager
+def _shared_flotilla_database(
+    network: Network, test_id: str
+) -> Iterator[FlotillaDatabase]:
+    server: PostgresServer = shared_postgres_server()
+    with server.database(FLOTILLA_SNAPSHOT, network, test_id) as dbname:
+        yield FlotillaDatabase(
+            database=server.container,
+            connection_string=flotilla_connection_string(database=dbname),
+            alias=settings.DB_ALIAS,
+            dbname=dbname,
+        )
+
+
+@contextmanager
+def _shared_sara_database(network: Network, test_id: str) -> Iterator[SaraDatabase]:
+    server: PostgresServer = shared_postgres_server()
+    with server.database(SARA_SNAPSHOT, network, test_id) as dbname:
+        yield SaraDatabase(
+            database=server.container,
+            connection_string=sara_connection_string(database=dbname),
+            alias=settings.SARA_DB_ALIAS,
+            dbname=dbname,
+        )
+
+
+@contextmanager
+def _azurite(
+    network: Network, test_id: str, azurite_container_alias: str
+) -> Iterator[AzuriteStorageContainer]:
+    with create_azurite_container(
+        network=network,
+        name=azurite_container_alias,
+        test_id=test_id,
+    ) as container:
+        wait_for_port_mapping_to_be_available(container=container, port=10000)
+
+        docker_connection_string: str = azurite_connection_string_for_containers(
+            settings.AZURITE_ACCOUNT,
+            settings.AZURITE_KEY,
+            azurite_container_alias,
+            port=10000,
+        )
+        host_connection_string: str = azurite_connection_string_for_containers(
+            settings.AZURITE_ACCOUNT,
+            settings.AZURITE_KEY,
+            "localhost",
+            port=container.get_exposed_port(10000),
+        )
+        try:
+            ensure_blob_containers(host_connection_string, "hua", "kaa", "nls", "test")
+
+            yield AzuriteStorageContainer(
+                alias=azurite_container_alias,
+                container=container,
+                docker_connection_string=docker_connection_string,
+                host_connection_string=host_connection_string,
+            )
+        finally:
+            close_blob_service_clients(host_connection_string)
+
+
+@contextmanager
+def _armada_storage(**azurite_containers: AzuriteStorageContainer) -> Iterator[ArmadaStorage]:
+    yield ArmadaStorage(
+        azurite_containers={
+            container.alias: container for container in azurite_containers.values()
+        }
+    )
+
+
+@contextmanager
+def _flotilla_broker(network: Network, test_id: str) -> Iterator[FlotillaBroker]:
+    with create_flotilla_broker_container(
+        network=network,
+        image=settings.FLOTILLA_BROKER_IMAGE,
+        name=settings.FLOTILLA_BROKER_NAME,
+        port=settings.FLOTILLA_BROKER_PORT,
+        alias=settings.FLOTILLA_BROKER_ALIAS,
+        test_id=test_id,
+    ) as broker:
+        wait_for_port_mapping_to_be_available(
+            container=broker, port=settings.FLOTILLA_BROKER_PORT
+        )
+
+        observer: Optional[MqttObserver] = None
+        if settings.MQTT_OBSERVER_ENABLED:
+            observer = MqttObserver(
+                host=broker.get_container_host_ip(),
+                port=int(broker.get_exposed_port(settings.FLOTILLA_BROKER_PORT)),
+                username="flotilla",
+                password=settings.FLOTILLA_MQTT_PASSWORD,
+            ).start()
+        try:
+            yield FlotillaBroker(
+                broker=broker,
+                name=settings.FLOTILLA_BROKER_NAME,
+                port=settings.FLOTILLA_BROKER_PORT,
+                alias=settings.FLOTILLA_BROKER_ALIAS,
+                observer=observer,
+            )
+        finally:
+            if observer is not None:
+                observer.stop()
+
+
+@contextmanager
+def _teams_webhook_receiver(
+    network: Network, test_id: str
+) -> Iterator[TeamsWebhookReceiver]:
+    container, receiver = create_teams_webhook_receiver_container(
+        network=network,
+        test_id=test_id,
+    )
+    with container:
+        wait_for_port_mapping_to_be_available(container=container, port=receiver.port)
+        yield receiver
+
+
+@contextmanager
+def _flotilla_backend(
+    network: Network,
+    test_id: str,
+    keycloak: Keycloak,
+    flotilla_database: FlotillaDatabase,
+    teams_webhook_receiver: TeamsWebhookReceiver,
+    flotilla_broker: FlotillaBroker,
+) -> Iterator[FlotillaBackend]:
+    with create_flotilla_backend_container(
+        network=network,
+        keycloak=keycloak,
+        database_connection_string=flotilla_database.connection_string,
+        teams_notification_webhook_url=teams_webhook_receiver.internal_url,
+        image=settings.FLOTILLA_BACKEND_IMAGE,
+        name=settings.FLOTILLA_BACKEND_NAME,
+        port=settings.FLOTILLA_BACKEND_PORT,
+        alias=settings.FLOTILLA_BACKEND_ALIAS,
+        test_id=test_id,
+    ) as flotilla_backend:
+        wait_for_port_mapping_to_be_available(
+            container=flotilla_backend, port=settings.FLOTILLA_BACKEND_PORT
+        )
+        wait_for_healthy(flotilla_backend)
+
+        backend_url: str = f"http://localhost:{flotilla_backend.get_exposed_port(8000)}"
+        try:
+            wait_for_backend_to_be_responsive(backend_url=backend_url)
+            assert_authentication_is_enforced(f"{backend_url}/robots")
+            populate_database_with_minimum_models(backend_url=backend_url)
+            if settings.FLOTILLA_SIGNALR_ENABLED:
+                start_signalr_subscriber(backend_url)
+            if flotilla_broker.observer is not None:
+                flotilla_broker.observer.report("status", robots_activity(backend_url))
+                for topic in ("mission", "task"):
+                    flotilla_broker.observer.report(
+                        topic, mission_runs_activity(backend_url)
+                    )
+
+            yield FlotillaBackend(
+                flotilla_backend=flotilla_backend,
+                backend_url=backend_url,
+                name=settings.FLOTILLA_BACKEND_NAME,
+                port=settings.FLOTILLA_BACKEND_PORT,
+                alias=settings.FLOTILLA_BACKEND_ALIAS,
+            )
+        finally:
+            stop_signalr_subscriber(backend_url)
+            close_backend_clients(backend_url)
+
+
+@contextmanager
+def _sara(
+    network: Network,
+    test_id: str,
+    keycloak: Keycloak,
+    sara_database: SaraDatabase,
+    armada_storage: ArmadaStorage,
+    flotilla_broker: FlotillaBroker,
+) -> Iterator[Sara]:
+    with create_sara_container(
+        network=network,
+        keycloak=keycloak,
+        database_connection_string=sara_database.connection_string,
+        raw_storage_connection_string=armada_storage.azurite_containers[
+            settings.SARA_RAW_STORAGE_CONTAINER
+        ].docker_connection_string,
+        image=settings.SARA_IMAGE,
+        name=settings.SARA_NAME,
+        port=settings.SARA_PORT,
+        alias=settings.SARA_ALIAS,
+        test_id=test_id,
+    ) as sara_container:
+        wait_for_port_mapping_to_be_available(
+            container=sara_container, port=settings.SARA_PORT
+        )
+        wait_for_healthy(sara_container)
+
+        sara_url: str = f"http://localhost:{sara_container.get_exposed_port(8100)}"
+        try:
+            wait_for_sara_to_be_responsive(sara_url=sara_url)
+            assert_authentication_is_enforced(f"{sara_url}/api/analysis")
+
+            yield Sara(
+                sara=sara_container,
+                backend_url=sara_url,
+                name=settings.SARA_NAME,
+                port=settings.SARA_PORT,
+                alias=settings.SARA_ALIAS,
+            )
+        finally:
+            close_backend_clients(sara_url)
+
+
+def create_armada_launcher(test_id: str) -> ArmadaLauncher:
+    """Describe the Armada stack; nothing starts until start()."""
+    launcher: ArmadaLauncher = ArmadaLauncher(test_id=test_id)
+    launcher.add("network", _network)
+
+    def for_stack(component: Callable[..., Any], **kwargs: Any) -> Callable[..., Any]:
+        return partial(component, test_id=test_id, **kwargs)
+
+    flotilla_database, sara_database = (
+        (_shared_flotilla_database, _shared_sara_database)
+        if settings.POSTGRES_SHARED_SERVER
+        else (_flotilla_database, _sara_database)
+    )
+
+    azurite_components: Dict[str, str] = {
+        alias: f"azurite_{alias}" for alias in settings.AZURITE_ALIASES
+    }
+    for alias, component in azurite_components.items():
+        launcher.add(
+            component,
+            for_stack(_azurite, azurite_container_alias=alias),
+            depends_on=("network",),
+        )
+
+    # The broker is a dependency of Flotilla and SARA because both connect to it
+    # on startup; ISAR robots, started later, need it too.
+    return (
+        launcher.add("keycloak", for_stack(_keycloak), depends_on=("network",))
+        .add(
+            "flotilla_database",
+            for_stack(flotilla_database),
+            depends_on=("network",),
+        )
+        .add("sara_database", for_stack(sara_database), depends_on=("network",))
+        .add(
+            "armada_storage",
+            _armada_storage,
+            depends_on=azurite_components.values(),
+        )
+        .add(
+            "flotilla_broker", for_stack(_flotilla_broker), depends_on=("network",)
+        )
+        .add(
+            "teams_webhook_receiver",
+            for_stack(_teams_webhook_receiver),
+            depends_on=("network",),
+        )
+        .add(
+            "flotilla_backend",
+            for_stack(_flotilla_backend),
+            depends_on=(
+                "network",
+                "keycloak",
+                "flotilla_database",
+                "teams_webhook_receiver",
+                "flotilla_broker",
+            ),
+        )
+        .add(
+            "sara",
+            for_stack(_sara),
+            depends_on=(
+                "network",
+                "keycloak",
+                "sara_database",
+                "armada_storage",
+                "flotilla_broker",
+            ),
+        )
+    )
+
+
+def build_armada(launcher: ArmadaLauncher) -> Armada:
+    """Wait for the whole stack and gather it into an Armada without robots."""
+    armada: Armada = Armada()
+
+    armada.network = launcher.get("network")
+    armada.test_id = launcher.test_id
+    armada.keycloak = launcher.get("keycloak")
+    armada.sara_database = launcher.get("sara_database")
+    armada.sara = launcher.get("sara")
+    armada.flotilla_database = launcher.get("flotilla_database")
+    armada.armada_storage = launcher.get("armada_storage")
+    armada.flotilla_broker = launcher.get("flotilla_broker")
+    armada.flotilla_backend = launcher.get("flotilla_backend")
+    armada.teams_webhook_receiver = launcher.get("teams_webhook_receiver")
+
+    return armada
+
+
+def reset_armada_state(armada: Armada) -> None:
+    """Return a reused stack to the state a freshly started one would be in.
+
+    Robots are not touched: they are started per test on top of the stack, and the
+    previous test's robots are gone by now. Truncating Flotilla drops their rows
+    too, so the next robots register exactly as they would on a new stack.
+    """
+    backend_url: str = armada.flotilla_backend.backend_url
+
+    truncate_all_tables(
+        armada.flotilla_database.database, dbname=armada.flotilla_database.dbname
+    )
+    truncate_all_tables(
+        armada.sara_database.database, dbname=armada.sara_database.dbname
+    )
+    populate_database_with_minimum_models(backend_url=backend_url)
+
+    for azurite_container in armada.armada_storage.azurite_containers.values():
+        clear_blob_containers(azurite_container.host_connection_string)
+
+    armada.teams_webhook_receiver.clear_notifications()
+    subscriber: Optional[FlotillaSignalR] = signalr_subscriber(backend_url)
+    if subscriber is not None:
+        subscriber.forget_pushed_statuses()
+    logger.info(f"Reset reused Armada stack {armada.test_id}")
@@ -0,0 +1,122 @@
+"""Fully started stacks, kept warm and leased to tests one at a time.
+
+With ARMADA_POOL_SIZE set, each xdist worker keeps that many stacks per robot
+profile building in the background: migrated, seeded, authenticated and with
+their robots registered. A test leases a ready one, and a replacement starts
+building while the test runs, so from the second test on a test waits for the
+mission under test rather than for the stack.
+
+A profile's stacks only start building once a test first asks for that profile,
+and a leased stack is torn down when the test ends.
+"""
+
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Deque, Dict, Iterator, Optional
+
+from loguru import logger
+
+from robotics_integration_tests.armada import Armada
+from robotics_integration_tests.armada_launcher import (
+    ARMADA_COMPONENTS,
+    build_armada,
+    create_armada_launcher,
+)
+from robotics_integration_tests.armada_robots import start_robots
+from robotics_integration_tests.utilities.authentication import (
+    configure_issuer,
+    reset_issuer,
+    separate_issuer,
+)
+
+
+class PooledStack:
+    def __init__(self, armada: Armada, exit_stack: ExitStack) -> None:
+        self.armada: Armada = armada
+        self._exit_stack: ExitStack = exit_stack
+
+    def close(self) -> None:
+        self._exit_stack.close()
+
+
+class StackPool:
+    def __init__(self, size: int) -> None:
+        self.size: int = size
+        self._lock: threading.Lock = threading.Lock()
+        self._ready: Dict[str, Deque[Future]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @contextmanager
+    def lease(self, profile: str) -> Iterator[Armada]:
+        with self._lock:
+            queue: Deque[Future] = self._ready.setdefault(profile, deque())
+            future: Future = queue.popleft() if queue else self._submit(profile)
+            # Replace the stack being leased while the test runs.
+            while len(queue) < self.size:
+                queue.append(self._submit(profile))
+
+        stack: PooledStack = future.result()
+        try:
+            # The stack was built with an issuer of its own; the test's API
+            # helpers use the process one.
+            configure_issuer(stack.armada.keycloak.host_url)
+            yield stack.armada
+        finally:
+            # Its Keycloak goes with it, and with it the tokens fetched from it.
+            reset_issuer()
+            stack.close()
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            futures = [future for queue in self._ready.values() for future in queue]
+            self._ready.clear()
+
+        for future in futures:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result().close()
+
+    def __enter__(self) -> "StackPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _submit(self, profile: str) -> Future:
+        if self._executor is None:
+            # A worker leases one stack at a time, so size + 1 builders keep a
+            # single profile's pool full; further builds queue.
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.size + 1, thread_name_prefix="stack-pool"
+            )
+        return self._executor.submit(_build_stack, profile)
+
+
+def _build_stack(profile: str) -> PooledStack:
+    test_id: str = uuid.uuid4().hex[:8]
+    exit_stack: ExitStack = ExitStack()
+    try:
+        # The launcher's threads inherit the separate issuer and keep it after
+        # this thread leaves the block, so the stack never touches the issuer of
+        # the test that is running meanwhile.
+        with separate_issuer():
+            launcher = exit_stack.enter_context(
+                create_armada_launcher(test_id=test_id)
+            )
+            launcher.start(*ARMADA_COMPONENTS)
+            armada: Armada = exit_stack.enter_context(
+                start_robots(build_armada(launcher), profile)
+            )
+    except BaseException:
+        exit_stack.close()
+        raise
+
+    logger.info(f"Stack {test_id} with {profile} is ready in the pool")
+    return PooledStack(armada=armada, exit_stack=exit_stack)
@@ -0,0 +1,166 @@
+"""The ISAR robots a test runs against, started on top of an Armada stack.
+
+A robot profile names the robots a test needs. Each robot fixture asks for one,
+and the stack pool builds its warm stacks per profile, so a test and the stack
+it leases agree on what is running.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from functools import partial
+from typing import Dict, Iterator, Tuple
+
+from robotics_integration_tests.armada import Armada
+from robotics_integration_tests.armada_launcher import (
+    wait_for_port_mapping_to_be_available,
+)
+from robotics_integration_tests.custom_containers.isar import (
+    IsarRobot,
+    RobotConfig,
+    create_isar_robot_container,
+)
+from robotics_integration_tests.custom_containers.stream_logging_docker_container import (
+    StreamLoggingDockerContainer,
+)
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.authentication_assertions import (
+    assert_authentication_is_enforced,
+    isar_url,
+)
+from robotics_integration_tests.utilities.container_readiness import wait_for_healthy
+from robotics_integration_tests.utilities.flotilla_async_api import (
+    AsyncFlotillaClient,
+)
+from robotics_integration_tests.utilities.stack_launcher import StackLauncher
+
+SINGLE_SUCCESSFUL_ROBOT = "single_successful_robot"
+SINGLE_FAILING_ROBOT = "single_failing_robot"
+MULTIPLE_ROBOTS = "multiple_robots"
+
+# MULTIPLE_ROBOTS runs four robots with different mission/return-home behaviour
+# to test parallel multi-robot scenarios:
+#     1. MissionOkThenHome – mission succeeds, returns home successfully
+#     2. MissionOkThenLost – mission succeeds, fails to return home
+#     3. MissionFailThenHome – mission fails, returns home successfully
+#     4. MissionFailThenLost – mission fails, fails to return home
+#
+# They are configured with ROBOT_SHOULD_START_AT_HOME=true so they boot directly
+# into ISAR's Home state, skipping the bootstrap return-home cycle. Without this,
+# robots configured to fail return-home would race the test: the boot
+# return-home would fail and put them into InterventionNeeded before the test
+# had a chance to schedule the echo mission, making the mission un-dispatchable.
+ROBOT_PROFILES: Dict[str, Tuple[RobotConfig, ...]] = {
+    SINGLE_SUCCESSFUL_ROBOT: (
+        RobotConfig(name=settings.ISAR_ROBOT_NAME, alias=settings.ISAR_ROBOT_ALIAS),
+    ),
+    SINGLE_FAILING_ROBOT: (
+        RobotConfig(
+            name=settings.ISAR_ROBOT_NAME,
+            alias=settings.ISAR_ROBOT_ALIAS,
+            should_fail_normal_task=True,
+        ),
+    ),
+    MULTIPLE_ROBOTS: tuple(
+        RobotConfig(
+            name=name,
+            alias=alias,
+            should_fail_normal_task=should_fail_normal_task,
+            should_fail_return_home=should_fail_return_home,
+            return_home_retry_limit=1,
+            should_start_at_home=True,
+        )
+        for name, alias, should_fail_normal_task, should_fail_return_home in (
+            ("MissionOkThenHome", "isar_mission_ok_then_home", False, False),
+            ("MissionOkThenLost", "isar_mission_ok_then_lost", False, True),
+            ("MissionFailThenHome", "isar_mission_fail_then_home", True, False),
+            ("MissionFailThenLost", "isar_mission_fail_then_lost", True, True),
+        )
+    ),
+}
+
+
+def _blob_connection_strings(armada: Armada) -> tuple[str, str]:
+    """In-network Azurite connection strings for ISAR's data and metadata stores."""
+    containers = armada.armada_storage.azurite_containers
+    return (
+        containers[settings.SARA_RAW_STORAGE_CONTAINER].docker_connection_string,
+        containers[settings.SARA_ANON_STORAGE_CONTAINER].docker_connection_string,
+    )
+
+
+def _assert_robots_require_authentication(armada: Armada) -> None:
+    """Confirm every ISAR robot rejects unauthenticated callers.
+
+    An unauthenticated POST is refused before the handler runs, so this cannot
+    disturb the robot's state machine.
+    """
+    for robot in armada.robots.values():
+        assert_authentication_is_enforced(
+            isar_url(robot, "/schedule/stop-mission"), method="POST"
+        )
+
+
+@contextmanager
+def _robot_container(
+    armada: Armada, config: RobotConfig
+) -> Iterator[StreamLoggingDockerContainer]:
+    """One robot's container, up once its API accepts connections."""
+    blob_conn_data, blob_conn_metadata = _blob_connection_strings(armada)
+    with create_isar_robot_container(
+        network=armada.network,
+        openid_config_url=armada.keycloak.internal_openid_config_url,
+        image=settings.ISAR_ROBOT_IMAGE,
+        name=config.name,
+        port=settings.ISAR_ROBOT_PORT,
+        alias=config.alias,
+        blob_storage_connection_string_data=blob_conn_data,
+        blob_storage_connection_string_metadata=blob_conn_metadata,
+        should_fail_normal_task=config.should_fail_normal_task,
+        should_fail_return_home=config.should_fail_return_home,
+        return_home_retry_limit=config.return_home_retry_limit,
+        should_start_at_home=config.should_start_at_home,
+        test_id=armada.test_id,
+    ) as container:
+        wait_for_port_mapping_to_be_available(
+            container=container, port=settings.ISAR_ROBOT_PORT
+        )
+        wait_for_healthy(container)
+        yield container
+
+
+@contextmanager
+def start_robots(armada: Armada, profile: str) -> Iterator[Armada]:
+    """Start the robots of *profile* and register them with Flotilla.
+
+    The containers start concurrently, each as a component of a launcher of its
+    own, which logs when each robot is up and stops every robot started so far
+    if one fails. The fleet is then registered with Flotilla all at once, so
+    bring-up takes about as long for forty robots as for four.
+    """
+    configs: Tuple[RobotConfig, ...] = ROBOT_PROFILES[profile]
+    with StackLauncher(name=f"fleet-{armada.test_id}") as fleet:
+        for config in configs:
+            fleet.add(config.name, partial(_robot_container, armada, config))
+        containers: Dict[str, StreamLoggingDockerContainer] = fleet.get_all(
+            config.name for config in configs
+        )
+
+        # The robots register with Flotilla on their own; wait for and set up
+        # all of them at once rather than one after the other.
+        flotilla = AsyncFlotillaClient(armada.flotilla_backend.backend_url)
+        registrations = asyncio.run(flotilla.setup_robots(containers))
+
+        for config in configs:
+            robot_id, installation_code = registrations[config.name]
+            armada.robots[config.name] = IsarRobot(
+                container=containers[config.name],
+                name=config.name,
+                robot_id=robot_id,
+                port=settings.ISAR_ROBOT_PORT,
+                alias=config.alias,
+                installation_code=installation_code,
+            )
+
+        _assert_robots_require_authentication(armada)
+        armada.log_startup_info()
+        yield armada
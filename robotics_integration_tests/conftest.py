@@ -1,10 +1,5 @@
 import os
-import subprocess
-import time
 import uuid
-from contextlib import ExitStack
-from datetime import datetime
-from typing import Dict
 
 # Disable the testcontainers Reaper (Ryuk) before any testcontainers import.
 # Ryuk is started lazily on the first container.start() call and queries its
@@ -15,122 +10,96 @@ from typing import Dict
 os.environ.setdefault("TESTCONTAINERS_RYUK_DISABLED", "true")
 
 import pytest
-from loguru import logger
-from testcontainers.core.container import DockerContainer
 from testcontainers.core.network import Network
 
 from robotics_integration_tests.armada import Armada
-from robotics_integration_tests.custom_containers.azurite import (
-    create_azurite_container,
-    azurite_connection_string_for_containers,
-    ensure_blob_containers,
-    ArmadaStorage,
-    AzuriteStorageContainer,
+from robotics_integration_tests.armada_launcher import (
+    ARMADA_COMPONENTS,
+    ArmadaLauncher,
+    build_armada,
+    create_armada_launcher,
+    reset_armada_state,
 )
+from robotics_integration_tests.armada_pool import StackPool
+from robotics_integration_tests.armada_robots import (
+    MULTIPLE_ROBOTS,
+    SINGLE_FAILING_ROBOT,
+    SINGLE_SUCCESSFUL_ROBOT,
+    start_robots,
+)
+from robotics_integration_tests.custom_containers.azurite import ArmadaStorage
 from robotics_integration_tests.custom_containers.flotilla_backend import (
-    create_flotilla_backend_container,
     FlotillaBackend,
 )
-from robotics_integration_tests.custom_containers.isar import (
-    create_isar_robot_container,
-    IsarRobot,
-)
-from robotics_integration_tests.custom_containers.migrations_runner import (
-    create_migrations_runner_container,
-    create_sara_migrations_runner_container,
-)
-from robotics_integration_tests.custom_containers.mosquitto import (
-    create_flotilla_broker_container,
-    FlotillaBroker,
-)
-from robotics_integration_tests.custom_containers.keycloak import (
-    Keycloak,
-    create_keycloak_container,
-)
+from robotics_integration_tests.custom_containers.mosquitto import FlotillaBroker
+from robotics_integration_tests.custom_containers.keycloak import Keycloak
 from robotics_integration_tests.custom_containers.postgres import (
     SaraDatabase,
-    create_postgres_container,
     FlotillaDatabase,
-    create_sara_postgres_container,
 )
-from robotics_integration_tests.custom_containers.sara import (
-    Sara,
-    create_sara_container,
+from robotics_integration_tests.custom_containers.postgres_server import (
+    close_shared_postgres_server,
 )
+from robotics_integration_tests.custom_containers.sara import Sara
 from robotics_integration_tests.custom_containers.teams_webhook_receiver import (
     TeamsWebhookReceiver,
-    create_teams_webhook_receiver_container,
-)
-from robotics_integration_tests.custom_containers.stream_logging_docker_container import (
-    StreamLoggingDockerContainer,
 )
 from robotics_integration_tests.settings.settings import settings
-from robotics_integration_tests.utilities.authentication import (
-    configure_issuer,
-    reset_issuer,
-)
-from robotics_integration_tests.utilities.authentication_assertions import (
-    assert_authentication_is_enforced,
-    isar_url,
+from robotics_integration_tests.utilities.image_prefetch import prefetch_images
+from robotics_integration_tests.utilities.log_collector import (
+    archived_output_tail,
+    begin_test_output_archive,
+    end_test_output_archive,
 )
-from robotics_integration_tests.utilities.flotilla_backend_api import (
-    setup_robot_in_flotilla,
-    wait_for_backend_to_be_responsive,
-    populate_database_with_minimum_models,
-    wait_for_database_to_be_populated,
+from robotics_integration_tests.utilities.log_events import (
+    begin_test_log_events,
+    export_test_log_events,
 )
-from robotics_integration_tests.utilities.sara_backend_api import (
-    wait_for_sara_to_be_responsive,
-)
-
 
-def _pull_latest_images() -> None:
-    """Pull the latest versions of all container images used by the integration tests.
 
-    Images that are run with platform="linux/amd64" are pulled with the
-    --platform flag so that Docker fetches the correct manifest on Apple
-    Silicon hosts instead of silently falling back to a stale cached image.
-    """
-    amd64_images = [
-        settings.FLOTILLA_BACKEND_IMAGE,
-        settings.FLOTILLA_BROKER_IMAGE,
-        settings.ISAR_ROBOT_IMAGE,
-        settings.SARA_IMAGE,
-    ]
-    native_images = [
-        settings.POSTGRESQL_IMAGE,
-        settings.AZURITE_IMAGE,
-        settings.KEYCLOAK_IMAGE,
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo):
+    """Add the tail of the containers' output to the report of a failing test."""
+    outcome = yield
+    report: pytest.TestReport = outcome.get_result()
+    if not report.failed:
+        return
+    # The containers of the test's own stack, if it got that far.
+    stack_ids = [
+        value.test_id
+        for value in getattr(item, "funcargs", {}).values()
+        if isinstance(value, Armada) and value.test_id
     ]
+    tail: str = archived_output_tail(item.nodeid, stack_ids)
+    if tail:
+        report.sections.append(("Container output", tail))
+
 
-    for image in amd64_images:
-        logger.info(f"Pulling image (linux/amd64): {image}")
-        result = subprocess.run(
-            ["docker", "pull", "--platform", "linux/amd64", image],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode != 0:
-            logger.warning(f"Failed to pull {image}: {result.stderr.strip()}")
-        else:
-            logger.info(f"Successfully pulled {image}")
-
-    for image in native_images:
-        logger.info(f"Pulling image: {image}")
-        result = subprocess.run(
-            ["docker", "pull", image],
-            capture_output=True,
-            text=True,
-        )
-        if result.returncode != 0:
-            logger.warning(f"Failed to pull {image}: {result.stderr.strip()}")
-        else:
-            logger.info(f"Successfully pulled {image}")
+@pytest.fixture(autouse=True)
+def container_output_archive(request: pytest.FixtureRequest):
+    """Archive what the containers print during each test, and the events the
+    services logged; see log_archive and log_events."""
+    begin_test_output_archive(request.node.nodeid)
+    begin_test_log_events()
+    yield
+    end_test_output_archive()
+    export_test_log_events(request.node.nodeid)
 
 
 @pytest.fixture(scope="session", autouse=True)
 def pull_latest_images():
-    _pull_latest_images()
+    """Start pulling in the background; each container waits for its own image."""
+    prefetch_images()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shared_postgres_server():
+    """Stop this worker's shared Postgres server, if POSTGRES_SHARED_SERVER started one.
+
+    Autouse, so that it outlives every stack using the server.
+    """
+    yield
+    close_shared_postgres_server()
 
 
 @pytest.fixture
@@ -138,484 +107,116 @@ def test_id():
     return uuid.uuid4().hex[:8]
 
 
-@pytest.fixture
-def network():
-    with Network() as network:
-        yield network
+@pytest.fixture(scope="session")
+def reusable_armada_launcher():
+    """One stack for the whole session of this xdist worker.
+
+    Only requested when ARMADA_REUSE_STACK is set; see armada_launcher.
+    """
+    with create_armada_launcher(test_id=uuid.uuid4().hex[:8]) as launcher:
+        launcher.start(*ARMADA_COMPONENTS)
+        yield launcher
 
 
 @pytest.fixture
-def keycloak(network: Network, test_id: str):
-    """Local OpenID Connect issuer standing in for Azure Entra ID.
+def armada_launcher(request: pytest.FixtureRequest, test_id: str):
+    """Start the whole stack concurrently; the fixtures below only wait on it."""
+    if settings.ARMADA_REUSE_STACK:
+        launcher: ArmadaLauncher = request.getfixturevalue("reusable_armada_launcher")
+        if launcher.is_dirty:
+            reset_armada_state(build_armada(launcher))
+        launcher.is_dirty = True
+        yield launcher
+        return
 
-    The realm is imported from custom_realms/, the same file a developer mounts to
-    run flotilla or sara against Keycloak locally, so a local run and a CI run
-    exercise the same clients, scopes and roles.
-    """
-    container, issuer = create_keycloak_container(
-        network=network,
-        alias=settings.KEYCLOAK_ALIAS,
-        port=settings.KEYCLOAK_PORT,
-        test_id=test_id,
-    )
-    with container:
-        wait_for_port_mapping_to_be_available(container=container, port=issuer.port)
-        issuer.wait_until_ready()
-
-        configure_issuer(issuer.host_url)
-        try:
-            yield issuer
-        finally:
-            reset_issuer()
+    with create_armada_launcher(test_id=test_id) as launcher:
+        launcher.start(*ARMADA_COMPONENTS)
+        yield launcher
 
 
 @pytest.fixture
-def flotilla_database(network: Network, test_id: str):
-    with create_postgres_container(network, test_id=test_id) as database:
-        wait_for_port_mapping_to_be_available(container=database, port=5432)
-        logger.info(
-            f"Postgres URL: {database.get_connection_url()}, "
-            f"Port: {database.get_exposed_port(5432)}"
-        )
-
-        connection_string: str = (
-            f"Host={settings.DB_ALIAS}; Port={5432}; Username={settings.DB_USER}; Password={settings.DB_PASSWORD}; "
-            f"Database={settings.DB_ALIAS}; SSL Mode=Disable;"
-        )
-
-        with create_migrations_runner_container(
-            network=network,
-            postgres_connection_string=connection_string,
-            test_id=test_id,
-        ) as migrations_runner:
-            # Block until the container exits; returns {"StatusCode": int}
-            result = migrations_runner.get_wrapped_container().wait()
-            status = int(result.get("StatusCode", 1))
-            if status != 0:
-                raise RuntimeError(f"Migrator failed with exit code {status}")
-
-        logger.info("Migrations completed successfully (container exited cleanly)")
-
-        yield FlotillaDatabase(
-            database=database,
-            connection_string=connection_string,
-            alias=settings.DB_ALIAS,
-        )
+def network(armada_launcher: ArmadaLauncher) -> Network:
+    return armada_launcher.get("network")
 
 
 @pytest.fixture
-def sara_database(network: Network, test_id: str):
-    with create_sara_postgres_container(network, test_id=test_id) as database:
-        wait_for_port_mapping_to_be_available(container=database, port=5432)
-        logger.info(
-            f"Postgres URL: {database.get_connection_url()}, "
-            f"Port: {database.get_exposed_port(5432)}"
-        )
-
-        connection_string: str = (
-            f"Host={settings.SARA_DB_ALIAS}; Port={5432}; Username={settings.SARA_DB_USER}; Password={settings.SARA_DB_PASSWORD}; "
-            f"Database={settings.SARA_DB_ALIAS}; SSL Mode=Disable;"
-        )
-
-        with create_sara_migrations_runner_container(
-            network=network,
-            postgres_connection_string=connection_string,
-            test_id=test_id,
-        ) as migrations_runner:
-            # Block until the container exits; returns {"StatusCode": int}
-            result = migrations_runner.get_wrapped_container().wait()
-            status = int(result.get("StatusCode", 1))
-            if status != 0:
-                raise RuntimeError(f"Sara migrator failed with exit code {status}")
-
-        logger.info("Sara migrations completed successfully (container exited cleanly)")
-
-        yield SaraDatabase(
-            database=database,
-            connection_string=connection_string,
-            alias=settings.SARA_DB_ALIAS,
-        )
+def keycloak(armada_launcher: ArmadaLauncher) -> Keycloak:
+    return armada_launcher.get("keycloak")
 
 
 @pytest.fixture
-def armada_storage(network: Network, test_id: str):
-    with ExitStack() as stack:
-        azurite_containers: Dict[str, AzuriteStorageContainer] = {}
-
-        for azurite_container_alias in settings.AZURITE_ALIASES:
-            container: StreamLoggingDockerContainer = stack.enter_context(
-                create_azurite_container(
-                    network=network,
-                    name=azurite_container_alias,
-                    test_id=test_id,
-                )
-            )
-
-            wait_for_port_mapping_to_be_available(container=container, port=10000)
-
-            docker_connection_string: str = azurite_connection_string_for_containers(
-                settings.AZURITE_ACCOUNT,
-                settings.AZURITE_KEY,
-                azurite_container_alias,
-                port=10000,
-            )
-            host_connection_string: str = azurite_connection_string_for_containers(
-                settings.AZURITE_ACCOUNT,
-                settings.AZURITE_KEY,
-                "localhost",
-                port=container.get_exposed_port(10000),
-            )
-            azurite_containers[azurite_container_alias] = AzuriteStorageContainer(
-                alias=azurite_container_alias,
-                container=container,
-                docker_connection_string=docker_connection_string,
-                host_connection_string=host_connection_string,
-            )
-
-            ensure_blob_containers(host_connection_string, "hua", "kaa", "nls", "test")
-
-        yield ArmadaStorage(azurite_containers=azurite_containers)
+def flotilla_database(armada_launcher: ArmadaLauncher) -> FlotillaDatabase:
+    return armada_launcher.get("flotilla_database")
 
 
 @pytest.fixture
-def flotilla_broker(network: Network, test_id: str):
-    with create_flotilla_broker_container(
-        network=network,
-        image=settings.FLOTILLA_BROKER_IMAGE,
-        name=settings.FLOTILLA_BROKER_NAME,
-        port=settings.FLOTILLA_BROKER_PORT,
-        alias=settings.FLOTILLA_BROKER_ALIAS,
-        test_id=test_id,
-    ) as broker:
-        wait_for_port_mapping_to_be_available(
-            container=broker, port=settings.FLOTILLA_BROKER_PORT
-        )
-
-        yield FlotillaBroker(
-            broker=broker,
-            name=settings.FLOTILLA_BROKER_NAME,
-            port=settings.FLOTILLA_BROKER_PORT,
-            alias=settings.FLOTILLA_BROKER_ALIAS,
-        )
+def sara_database(armada_launcher: ArmadaLauncher) -> SaraDatabase:
+    return armada_launcher.get("sara_database")
 
 
 @pytest.fixture
-def teams_webhook_receiver(network: Network, test_id: str):
-    container, receiver = create_teams_webhook_receiver_container(
-        network=network,
-        test_id=test_id,
-    )
-    with container:
-        wait_for_port_mapping_to_be_available(container=container, port=receiver.port)
-        yield receiver
+def armada_storage(armada_launcher: ArmadaLauncher) -> ArmadaStorage:
+    return armada_launcher.get("armada_storage")
 
 
 @pytest.fixture
-def flotilla_backend(
-    network: Network,
-    keycloak: Keycloak,
-    flotilla_database: FlotillaDatabase,
-    teams_webhook_receiver: TeamsWebhookReceiver,
-    test_id: str,
-):
-    with create_flotilla_backend_container(
-        network=network,
-        keycloak=keycloak,
-        database_connection_string=flotilla_database.connection_string,
-        teams_notification_webhook_url=teams_webhook_receiver.internal_url,
-        image=settings.FLOTILLA_BACKEND_IMAGE,
-        name=settings.FLOTILLA_BACKEND_NAME,
-        port=settings.FLOTILLA_BACKEND_PORT,
-        alias=settings.FLOTILLA_BACKEND_ALIAS,
-        test_id=test_id,
-    ) as flotilla_backend:
-        wait_for_port_mapping_to_be_available(
-            container=flotilla_backend, port=settings.FLOTILLA_BACKEND_PORT
-        )
-
-        backend_url: str = f"http://localhost:{flotilla_backend.get_exposed_port(8000)}"
-        wait_for_backend_to_be_responsive(backend_url=backend_url)
-        assert_authentication_is_enforced(f"{backend_url}/robots")
-        populate_database_with_minimum_models(backend_url=backend_url)
-        wait_for_database_to_be_populated(backend_url=backend_url)
-
-        yield FlotillaBackend(
-            flotilla_backend=flotilla_backend,
-            backend_url=backend_url,
-            name=settings.FLOTILLA_BACKEND_NAME,
-            port=settings.FLOTILLA_BACKEND_PORT,
-            alias=settings.FLOTILLA_BACKEND_ALIAS,
-        )
+def flotilla_broker(armada_launcher: ArmadaLauncher) -> FlotillaBroker:
+    return armada_launcher.get("flotilla_broker")
 
 
 @pytest.fixture
-def sara(
-    network: Network,
-    keycloak: Keycloak,
-    sara_database: SaraDatabase,
-    armada_storage: ArmadaStorage,
-    test_id: str,
-):
-    with create_sara_container(
-        network=network,
-        keycloak=keycloak,
-        database_connection_string=sara_database.connection_string,
-        raw_storage_connection_string=armada_storage.azurite_containers[
-            settings.SARA_RAW_STORAGE_CONTAINER
-        ].docker_connection_string,
-        image=settings.SARA_IMAGE,
-        name=settings.SARA_NAME,
-        port=settings.SARA_PORT,
-        alias=settings.SARA_ALIAS,
-        test_id=test_id,
-    ) as sara_container:
-        wait_for_port_mapping_to_be_available(
-            container=sara_container, port=settings.SARA_PORT
-        )
-
-        sara_url: str = f"http://localhost:{sara_container.get_exposed_port(8100)}"
-        wait_for_sara_to_be_responsive(sara_url=sara_url)
-        assert_authentication_is_enforced(f"{sara_url}/api/analysis")
-
-        yield Sara(
-            sara=sara_container,
-            backend_url=sara_url,
-            name=settings.SARA_NAME,
-            port=settings.SARA_PORT,
-            alias=settings.SARA_ALIAS,
-        )
+def teams_webhook_receiver(armada_launcher: ArmadaLauncher) -> TeamsWebhookReceiver:
+    return armada_launcher.get("teams_webhook_receiver")
 
 
 @pytest.fixture
-def armada_without_robots(
-    network: Network,
-    test_id: str,
-    keycloak: Keycloak,
-    flotilla_broker: FlotillaBroker,
-    flotilla_database: FlotillaDatabase,
-    flotilla_backend: FlotillaBackend,
-    sara_database: SaraDatabase,
-    sara: Sara,
-    armada_storage: ArmadaStorage,
-    teams_webhook_receiver: TeamsWebhookReceiver,
-):
-    armada: Armada = Armada()
-
-    armada.network = network
-    armada.test_id = test_id
-    armada.keycloak = keycloak
-    armada.sara_database = sara_database
-    armada.sara = sara
-    armada.flotilla_database = flotilla_database
-    armada.armada_storage = armada_storage
-    armada.flotilla_broker = flotilla_broker
-    armada.flotilla_backend = flotilla_backend
-    armada.teams_webhook_receiver = teams_webhook_receiver
-
-    yield armada
-
-
-def _blob_connection_strings(armada: Armada) -> tuple[str, str]:
-    """In-network Azurite connection strings for ISAR's data and metadata stores."""
-    containers = armada.armada_storage.azurite_containers
-    return (
-        containers[settings.SARA_RAW_STORAGE_CONTAINER].docker_connection_string,
-        containers[settings.SARA_ANON_STORAGE_CONTAINER].docker_connection_string,
-    )
-
-
-def _assert_robots_require_authentication(armada: Armada) -> None:
-    """Confirm every ISAR robot rejects unauthenticated callers.
-
-    An unauthenticated POST is refused before the handler runs, so this cannot
-    disturb the robot's state machine.
-    """
-    for robot in armada.robots.values():
-        assert_authentication_is_enforced(
-            isar_url(robot, "/schedule/stop-mission"), method="POST"
-        )
+def flotilla_backend(armada_launcher: ArmadaLauncher) -> FlotillaBackend:
+    return armada_launcher.get("flotilla_backend")
 
 
 @pytest.fixture
-def armada_with_single_successful_robot(armada_without_robots: Armada):
-    armada: Armada = armada_without_robots
-    blob_conn_data, blob_conn_metadata = _blob_connection_strings(armada)
-    with create_isar_robot_container(
-        network=armada.network,
-        openid_config_url=armada.keycloak.internal_openid_config_url,
-        image=settings.ISAR_ROBOT_IMAGE,
-        name=settings.ISAR_ROBOT_NAME,
-        port=settings.ISAR_ROBOT_PORT,
-        alias=settings.ISAR_ROBOT_ALIAS,
-        blob_storage_connection_string_data=blob_conn_data,
-        blob_storage_connection_string_metadata=blob_conn_metadata,
-        test_id=armada.test_id,
-    ) as isar_robot:
-
-        robot_id, installation_code_for_robot = setup_robot_in_flotilla(
-            backend_url=armada.flotilla_backend.backend_url,
-            robot_name=settings.ISAR_ROBOT_NAME,
-        )
-
-        armada.robots[settings.ISAR_ROBOT_NAME] = IsarRobot(
-            container=isar_robot,
-            name=settings.ISAR_ROBOT_NAME,
-            robot_id=robot_id,
-            port=settings.ISAR_ROBOT_PORT,
-            alias=settings.ISAR_ROBOT_ALIAS,
-            installation_code=installation_code_for_robot,
-        )
-        _assert_robots_require_authentication(armada)
-        armada.log_startup_info()
-        yield armada
+def sara(armada_launcher: ArmadaLauncher) -> Sara:
+    return armada_launcher.get("sara")
 
 
 @pytest.fixture
-def armada_with_single_failing_robot(armada_without_robots: Armada):
-    armada: Armada = armada_without_robots
-    blob_conn_data, blob_conn_metadata = _blob_connection_strings(armada)
-
-    with create_isar_robot_container(
-        network=armada.network,
-        openid_config_url=armada.keycloak.internal_openid_config_url,
-        image=settings.ISAR_ROBOT_IMAGE,
-        name=settings.ISAR_ROBOT_NAME,
-        port=settings.ISAR_ROBOT_PORT,
-        alias=settings.ISAR_ROBOT_ALIAS,
-        blob_storage_connection_string_data=blob_conn_data,
-        blob_storage_connection_string_metadata=blob_conn_metadata,
-        should_fail_normal_task=True,
-        test_id=armada.test_id,
-    ) as isar_robot:
-
-        robot_id, installation_code_for_robot = setup_robot_in_flotilla(
-            backend_url=armada.flotilla_backend.backend_url,
-            robot_name=settings.ISAR_ROBOT_NAME,
-        )
-
-        armada.robots[settings.ISAR_ROBOT_NAME] = IsarRobot(
-            container=isar_robot,
-            name=settings.ISAR_ROBOT_NAME,
-            robot_id=robot_id,
-            port=settings.ISAR_ROBOT_PORT,
-            alias=settings.ISAR_ROBOT_ALIAS,
-            installation_code=installation_code_for_robot,
-        )
-        _assert_robots_require_authentication(armada)
-        armada.log_startup_info()
-        yield armada
+def armada_without_robots(armada_launcher: ArmadaLauncher):
+    yield build_armada(armada_launcher)
 
 
-@pytest.fixture
-def armada_with_multiple_robots(armada_without_robots: Armada):
-    """Spin up four ISAR robot containers with different mission/return-home
-    behaviour to test parallel multi-robot scenarios.
-
-    All robots are configured with ``ROBOT_SHOULD_START_AT_HOME=true`` so they
-    boot directly into ISAR's ``Home`` state, skipping the bootstrap
-    return-home cycle. Without this, robots configured to fail return-home
-    would race the test: the boot return-home would fail and put them into
-    ``InterventionNeeded`` before the test had a chance to schedule the echo
-    mission, making the mission un-dispatchable.
-
-    Robot configurations (mission and post-mission return-home outcomes):
-        1. MissionOkThenHome – mission succeeds, returns home successfully
-        2. MissionOkThenLost – mission succeeds, fails to return home
-        3. MissionFailThenHome – mission fails, returns home successfully
-        4. MissionFailThenLost – mission fails, fails to return home
+@pytest.fixture(scope="session")
+def stack_pool():
+    """Warm stacks for this xdist worker.
+
+    Only requested when ARMADA_POOL_SIZE is set; see armada_pool.
     """
-    armada: Armada = armada_without_robots
-    blob_conn_data, blob_conn_metadata = _blob_connection_strings(armada)
-
-    robot_configs = [
-        {
-            "name": "MissionOkThenHome",
-            "alias": "isar_mission_ok_then_home",
-            "should_fail_normal_task": False,
-            "should_fail_return_home": False,
-            "should_start_at_home": True,
-        },
-        {
-            "name": "MissionOkThenLost",
-            "alias": "isar_mission_ok_then_lost",
-            "should_fail_normal_task": False,
-            "should_fail_return_home": True,
-            "should_start_at_home": True,
-        },
-        {
-            "name": "MissionFailThenHome",
-            "alias": "isar_mission_fail_then_home",
-            "should_fail_normal_task": True,
-            "should_fail_return_home": False,
-            "should_start_at_home": True,
-        },
-        {
-            "name": "MissionFailThenLost",
-            "alias": "isar_mission_fail_then_lost",
-            "should_fail_normal_task": True,
-            "should_fail_return_home": True,
-            "should_start_at_home": True,
-        },
-    ]
+    with StackPool(size=settings.ARMADA_POOL_SIZE) as pool:
+        yield pool
 
-    with ExitStack() as stack:
-        for cfg in robot_configs:
-            container = stack.enter_context(
-                create_isar_robot_container(
-                    network=armada.network,
-                    openid_config_url=armada.keycloak.internal_openid_config_url,
-                    image=settings.ISAR_ROBOT_IMAGE,
-                    name=cfg["name"],
-                    port=settings.ISAR_ROBOT_PORT,
-                    alias=cfg["alias"],
-                    blob_storage_connection_string_data=blob_conn_data,
-                    blob_storage_connection_string_metadata=blob_conn_metadata,
-                    should_fail_normal_task=cfg["should_fail_normal_task"],
-                    should_fail_return_home=cfg["should_fail_return_home"],
-                    return_home_retry_limit=1,
-                    should_start_at_home=cfg["should_start_at_home"],
-                    test_id=armada.test_id,
-                )
-            )
-
-            wait_for_port_mapping_to_be_available(
-                container=container, port=settings.ISAR_ROBOT_PORT
-            )
-
-            robot_id, installation_code = setup_robot_in_flotilla(
-                backend_url=armada.flotilla_backend.backend_url,
-                robot_name=cfg["name"],
-            )
-
-            armada.robots[cfg["name"]] = IsarRobot(
-                container=container,
-                name=cfg["name"],
-                robot_id=robot_id,
-                port=settings.ISAR_ROBOT_PORT,
-                alias=cfg["alias"],
-                installation_code=installation_code,
-            )
-
-        _assert_robots_require_authentication(armada)
-        armada.log_startup_info()
+
+def _armada_with_robots(request: pytest.FixtureRequest, profile: str):
+    if settings.ARMADA_POOL_SIZE > 0:
+        pool: StackPool = request.getfixturevalue("stack_pool")
+        with pool.lease(profile) as armada:
+            yield armada
+        return
+
+    armada: Armada = request.getfixturevalue("armada_without_robots")
+    with start_robots(armada, profile) as armada:
         yield armada
 
 
-def wait_for_port_mapping_to_be_available(
-    container: DockerContainer, port: int, timeout: int = 60, delay: int = 2
-) -> None:
-    now: datetime = datetime.now()
-    while (datetime.now() - now).seconds < timeout:
-        try:
-            container.get_exposed_port(port)
-            return
-        except ConnectionError:
-            logger.warning(
-                f"Port {port} not yet available, waiting for {delay} seconds..."
-            )
-            time.sleep(delay)
-            continue
-
-    raise ConnectionError(
-        f"Port mapping for container {container.image} on port {port} not available within timeout"
-    )
+@pytest.fixture
+def armada_with_single_successful_robot(request: pytest.FixtureRequest):
+    yield from _armada_with_robots(request, SINGLE_SUCCESSFUL_ROBOT)
+
+
+@pytest.fixture
+def armada_with_single_failing_robot(request: pytest.FixtureRequest):
+    yield from _armada_with_robots(request, SINGLE_FAILING_ROBOT)
+
+
+@pytest.fixture
+def armada_with_multiple_robots(request: pytest.FixtureRequest):
+    """Four robots with different mission/return-home behaviour; see armada_robots."""
+    yield from _armada_with_robots(request, MULTIPLE_ROBOTS)
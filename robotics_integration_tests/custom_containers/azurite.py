@@ -8,6 +8,8 @@ from robotics_integration_tests.custom_containers.stream_logging_docker_containe
     StreamLoggingDockerContainer,
 )
 from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.container_readiness import node_tcp_healthcheck
+from robotics_integration_tests.utilities.image_prefetch import wait_for_image
 
 
 class AzuriteStorageContainer:
@@ -39,12 +41,14 @@ def create_azurite_container(
 
     accounts = f"{settings.AZURITE_ACCOUNT}:{settings.AZURITE_KEY}"
 
+    wait_for_image(settings.AZURITE_IMAGE)
     container: StreamLoggingDockerContainer = (
         StreamLoggingDockerContainer(image=settings.AZURITE_IMAGE, command=cmd)
         .with_name(f"{name}-{test_id}")
         .with_network(network)
         .with_network_aliases(name)
         .with_exposed_ports(10000)
+        .with_kwargs(healthcheck=node_tcp_healthcheck(10000))
         .with_env("AZURITE_ACCOUNTS", accounts)
     )
     return container
@@ -68,3 +72,12 @@ def ensure_blob_containers(connection_string: str, *names: str) -> None:
             svc.create_container(name)
         except ResourceExistsError:
             pass
+
+
+def clear_blob_containers(connection_string: str) -> None:
+    """Delete every blob, keeping the containers so nothing needs re-creating."""
+    svc: BlobServiceClient = BlobServiceClient.from_connection_string(connection_string)
+    for container in svc.list_containers():
+        container_client = svc.get_container_client(container.name)
+        for blob in container_client.list_blobs():
+            container_client.delete_blob(blob.name)
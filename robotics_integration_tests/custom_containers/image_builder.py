@@ -1,20 +1,80 @@
 import fcntl
+import hashlib
+import os
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator, List
 
+import docker
+from docker.models.images import Image
 from loguru import logger
 from testcontainers.core.image import DockerImage
 
+# Images are looked up by the hash of their build context, so identical contexts
+# are built once however many tags they go by, and never again after that.
+_CONTEXT_HASH_LABEL = "armada.context-hash"
 
-def build_image_once(path: str, tag: str) -> str:
+
+@contextmanager
+def host_lock(name: str) -> Iterator[None]:
+    """Serialise work across the xdist workers, which are separate processes."""
     lock_path: Path = (
-        Path(tempfile.gettempdir()) / f"armada-build-{tag.replace('/', '_')}.lock"
+        Path(tempfile.gettempdir()) / f"armada-{name.replace('/', '_')}.lock"
     )
 
     with open(lock_path, "w") as lock_file:
         fcntl.flock(lock_file, fcntl.LOCK_EX)
         try:
-            logger.debug(f"Building image {tag} from {path}")
-            return str(DockerImage(path=path, tag=tag).build())
+            yield
         finally:
             fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def build_image_once(path: str, tag: str) -> str:
+    context_hash: str = _context_hash(Path(path))
+    client = docker.from_env()
+
+    existing: List[Image] = _images_with_context(client, context_hash)
+    if not existing:
+        # Per context rather than per tag: the Flotilla and SARA migrations runners
+        # share one, and the second should find the first's image, not rebuild it.
+        with host_lock(f"build-{context_hash[:16]}"):
+            existing = _images_with_context(client, context_hash)
+            if not existing:
+                logger.debug(f"Building image {tag} from {path}")
+                DockerImage(
+                    path=path, tag=tag, labels={_CONTEXT_HASH_LABEL: context_hash}
+                ).build()
+                return tag
+
+    image: Image = existing[0]
+    if not any(_untagged(name) == tag for name in image.tags):
+        image.tag(tag)
+    logger.debug(f"Image {tag} is up to date with {path}")
+    return tag
+
+
+def _images_with_context(client: docker.DockerClient, context_hash: str) -> List[Image]:
+    return client.images.list(filters={"label": f"{_CONTEXT_HASH_LABEL}={context_hash}"})
+
+
+def _untagged(name: str) -> str:
+    return name.rsplit(":", 1)[0] if ":" in name.rsplit("/", 1)[-1] else name
+
+
+def _context_hash(context: Path) -> str:
+    """Hash what Docker would be sent: every file's path, mode and content.
+
+    Bytecode caches are left out; they appear whenever the suite is compiled and
+    no image copies them.
+    """
+    digest = hashlib.sha256()
+    files = (
+        p for p in context.rglob("*") if p.is_file() and "__pycache__" not in p.parts
+    )
+    for file in sorted(files):
+        digest.update(f"{file.relative_to(context).as_posix()}\0".encode())
+        digest.update(f"{os.stat(file).st_mode & 0o777:o}\0".encode())
+        digest.update(file.read_bytes())
+    return digest.hexdigest()
@@ -6,6 +6,9 @@ from robotics_integration_tests.custom_containers.stream_logging_docker_containe
     StreamLoggingDockerContainer,
 )
 from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.container_readiness import python_tcp_healthcheck
+from robotics_integration_tests.utilities.image_prefetch import wait_for_image
+from robotics_integration_tests.utilities.log_events import ISAR
 
 
 class IsarRobot:
@@ -26,6 +29,26 @@ class IsarRobot:
         self.installation_code: str = installation_code
 
 
+class RobotConfig:
+    """How one robot of a stack behaves; see create_isar_robot_container."""
+
+    def __init__(
+        self,
+        name: str,
+        alias: str,
+        should_fail_normal_task: bool = False,
+        should_fail_return_home: bool = False,
+        return_home_retry_limit: int = 5,
+        should_start_at_home: bool = False,
+    ) -> None:
+        self.name: str = name
+        self.alias: str = alias
+        self.should_fail_normal_task: bool = should_fail_normal_task
+        self.should_fail_return_home: bool = should_fail_return_home
+        self.return_home_retry_limit: int = return_home_retry_limit
+        self.should_start_at_home: bool = should_start_at_home
+
+
 def create_isar_robot_container(
     network: Network,
     openid_config_url: str,
@@ -50,13 +73,15 @@ def create_isar_robot_container(
     if should_fail_return_home:
         return_home_failure_prob = 1.0
 
+    wait_for_image(image)
     container: StreamLoggingDockerContainer = (
         StreamLoggingDockerContainer(image=image)
         .with_name(f"{name}-{test_id}")
+        .with_log_events(ISAR)
         .with_exposed_ports(port)
         .with_network(network)
         .with_network_aliases(alias)
-        .with_kwargs(platform="linux/amd64")
+        .with_kwargs(platform="linux/amd64", healthcheck=python_tcp_healthcheck(port))
         .with_env("ISAR_MQTT_HOST", settings.FLOTILLA_BROKER_ALIAS)
         .with_env("ISAR_MQTT_PASSWORD", settings.ISAR_MQTT_PASSWORD)
         # ISAR_AZURE_CLIENT_ID is the expected `aud`. settings.py lets a bare
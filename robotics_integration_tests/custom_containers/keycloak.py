@@ -7,6 +7,12 @@ from robotics_integration_tests.custom_containers.stream_logging_docker_containe
     StreamLoggingDockerContainer,
 )
 from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.container_readiness import (
+    Backoff,
+    bash_tcp_healthcheck,
+    wait_for_healthy,
+)
+from robotics_integration_tests.utilities.image_prefetch import wait_for_image
 
 _REALM_DIR = Path(__file__).resolve().parent.parent / "custom_realms"
 
@@ -60,6 +66,8 @@ class Keycloak:
         token requested in that window comes back 401.
         """
         deadline = time.monotonic() + timeout
+        wait_for_healthy(self.container, timeout=timeout)
+        backoff = Backoff()
         last_error: Exception | None = None
         while time.monotonic() < deadline:
             try:
@@ -71,7 +79,7 @@ class Keycloak:
                     return
             except requests.RequestException as error:  # pragma: no cover - timing
                 last_error = error
-            time.sleep(0.5)
+            backoff.sleep()
         raise TimeoutError(
             f"keycloak did not become ready within {timeout}s: {last_error}"
         )
@@ -108,12 +116,14 @@ def create_keycloak_container(
     test_id: str = "",
 ) -> tuple[StreamLoggingDockerContainer, Keycloak]:
     """Start Keycloak with the robotics realm imported."""
+    wait_for_image(settings.KEYCLOAK_IMAGE)
     container: StreamLoggingDockerContainer = (
         StreamLoggingDockerContainer(image=settings.KEYCLOAK_IMAGE)
         .with_name(f"{name}-{test_id}")
         .with_exposed_ports(port)
         .with_network(network)
         .with_network_aliases(alias)
+        .with_kwargs(healthcheck=bash_tcp_healthcheck(port))
         .with_command("start-dev --import-realm")
         .with_env("KC_BOOTSTRAP_ADMIN_USERNAME", "admin")
         .with_env("KC_BOOTSTRAP_ADMIN_PASSWORD", "admin")
@@ -0,0 +1,155 @@
+"""Where a service's migrations come from, and a key for their content.
+
+The key covers the migration files only, not the whole service: those are all that
+`dotnet ef database update` applies, so two sources with the same migrations
+produce the same schema however much the rest of the code differs.
+"""
+
+import hashlib
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+
+from robotics_integration_tests.settings.settings import settings
+
+# EF names migrations <14-digit timestamp>_<Name>.cs, next to a .Designer.cs that
+# is not a migration of its own.
+_MIGRATION_FILE = re.compile(r"^(\d{14}_[^.]+)\.cs$")
+
+# What resolving a source raises when GitHub or the checkout is not as expected;
+# callers fall back to not relying on the key.
+RESOLUTION_ERRORS = (requests.RequestException, OSError, KeyError, RuntimeError)
+
+# Host build output; never part of the source, and huge.
+_IGNORED_DIRECTORIES = {"bin", "obj", "node_modules", ".git", "TestResults"}
+
+
+class MigrationSource:
+    def __init__(
+        self,
+        git_repository: str,
+        git_ref: str,
+        source_dir: str,
+        project_folder: str,
+    ) -> None:
+        self.git_repository: str = git_repository
+        self.git_ref: str = git_ref
+        self.source_dir: str = source_dir
+        self.project_folder: str = project_folder.strip("/")
+        # The commit the migrations were read from, so that the migrations runner
+        # applies exactly those. Empty for a local checkout.
+        self.git_commit: str = ""
+        self._files: Optional[Dict[str, str]] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def is_local(self) -> bool:
+        return bool(self.source_dir)
+
+    def migration_files(self) -> Dict[str, str]:
+        """Map each migration file's path to a hash of its content.
+
+        Resolved once per process: for a GitHub source the answer comes from the
+        API, which is rate limited.
+        """
+        with self._lock:
+            if self._files is None:
+                self._files = (
+                    self._local_migration_files()
+                    if self.is_local
+                    else self._github_migration_files()
+                )
+            return self._files
+
+    def migrations(self) -> Dict[str, str]:
+        """Map each migration ID to the hash of the file that defines it.
+
+        Only that file decides what the migration does to the database; its
+        .Designer.cs and the model snapshot are metadata.
+        """
+        migrations: Dict[str, str] = {}
+        for path, content_hash in self.migration_files().items():
+            match = _MIGRATION_FILE.match(Path(path).name)
+            if match:
+                migrations[match.group(1)] = content_hash
+        return migrations
+
+    def content_key(self) -> str:
+        digest = hashlib.sha256()
+        for path, content_hash in sorted(self.migration_files().items()):
+            digest.update(f"{path}\0{content_hash}\n".encode())
+        return digest.hexdigest()
+
+    def _local_migration_files(self) -> Dict[str, str]:
+        project_dir: Path = Path(self.source_dir).expanduser().resolve() / self.project_folder
+        files: Dict[str, str] = {}
+        for path in sorted(project_dir.rglob("*")):
+            relative: Path = path.relative_to(project_dir)
+            if not path.is_file() or _IGNORED_DIRECTORIES.intersection(relative.parts):
+                continue
+            if "Migrations" in relative.parts[:-1]:
+                files[relative.as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+        return files
+
+    def _github_migration_files(self) -> Dict[str, str]:
+        # Mirrors entrypoint.sh: "latest" is the latest release, anything else main.
+        if self.git_ref == "latest":
+            branch: str = _github_get(
+                f"repos/{self.git_repository}/releases/latest"
+            )["tag_name"]
+        else:
+            branch = "main"
+
+        commit: Dict = _github_get(f"repos/{self.git_repository}/commits/{branch}")
+        tree: Dict = _github_get(
+            f"repos/{self.git_repository}/git/trees/"
+            f"{commit['commit']['tree']['sha']}?recursive=1"
+        )
+        if tree.get("truncated"):
+            raise RuntimeError(
+                f"The tree of {self.git_repository}@{branch} is too large to list "
+                "through the GitHub API"
+            )
+
+        prefix: str = f"{self.project_folder}/"
+        files: Dict[str, str] = {}
+        for entry in tree["tree"]:
+            path: str = entry["path"]
+            if entry["type"] != "blob" or not path.startswith(prefix):
+                continue
+            relative: Path = Path(path[len(prefix) :])
+            if "Migrations" in relative.parts[:-1]:
+                # The blob SHA already addresses the content.
+                files[relative.as_posix()] = entry["sha"]
+
+        self.git_commit = commit["sha"]
+        return files
+
+
+def _github_get(path: str) -> Dict:
+    headers: Dict[str, str] = {"Accept": "application/vnd.github+json"}
+    if settings.GITHUB_TOKEN:
+        headers["Authorization"] = f"Bearer {settings.GITHUB_TOKEN}"
+    response = requests.get(
+        f"https://api.github.com/{path}", headers=headers, timeout=30
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+FLOTILLA_MIGRATIONS: MigrationSource = MigrationSource(
+    git_repository=settings.GIT_REPOSITORY_FOR_MIGRATIONS,
+    git_ref=settings.GIT_REPOSITORY_FOR_MIGRATIONS_REF,
+    source_dir=settings.FLOTILLA_MIGRATIONS_SOURCE_DIR,
+    project_folder=settings.BACKEND_PROJECT_FILE_FOLDER,
+)
+
+SARA_MIGRATIONS: MigrationSource = MigrationSource(
+    git_repository=settings.SARA_GIT_REPOSITORY_FOR_MIGRATIONS,
+    git_ref=settings.SARA_GIT_REPOSITORY_FOR_MIGRATIONS_REF,
+    source_dir=settings.SARA_MIGRATIONS_SOURCE_DIR,
+    project_folder=settings.SARA_BACKEND_PROJECT_FILE_FOLDER,
+)
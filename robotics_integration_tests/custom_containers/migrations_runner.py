@@ -1,9 +1,17 @@
+import hashlib
 from pathlib import Path
 
+import docker
 from docker.models.networks import Network
 from loguru import logger
 
 from robotics_integration_tests.custom_containers.image_builder import build_image_once
+from robotics_integration_tests.custom_containers.migration_sources import (
+    FLOTILLA_MIGRATIONS,
+    RESOLUTION_ERRORS,
+    SARA_MIGRATIONS,
+    MigrationSource,
+)
 from robotics_integration_tests.custom_containers.stream_logging_docker_container import (
     StreamLoggingDockerContainer,
 )
@@ -12,6 +20,13 @@ from robotics_integration_tests.settings.settings import settings
 # Where a local checkout is mounted inside the migrations runner.
 _LOCAL_REPO_MOUNT = "/src"
 
+# Where the migration bundles volume is mounted inside the migrations runner.
+_BUNDLES_MOUNT = "/bundles"
+
+# Where the package and restore caches are mounted inside the migrations runner.
+_NUGET_PACKAGES_MOUNT = "/home/runner/.nuget/packages"
+_RESTORE_CACHE_MOUNT = "/obj-cache"
+
 
 def _with_migrations_source(
     container: StreamLoggingDockerContainer,
@@ -53,6 +68,63 @@ def _with_migrations_source(
     ).with_env("LOCAL_REPO_PATH", _LOCAL_REPO_MOUNT)
 
 
+def _with_migrations_bundle(
+    container: StreamLoggingDockerContainer,
+    source: MigrationSource,
+    service: str,
+    image: str,
+) -> StreamLoggingDockerContainer:
+    """Apply the migrations with a bundle built once per migration source.
+
+    The bundle is keyed by the migration files and by the runner image, which
+    holds the EF tooling that builds it, and kept in a volume shared by every
+    runner on the host. The runner is pinned to the commit the key was computed
+    from. If the source cannot be resolved, the runner builds the project and
+    applies the migrations with `dotnet ef database update` as before.
+    """
+    if not settings.MIGRATION_BUNDLES_ENABLED:
+        return container
+
+    try:
+        content_key: str = source.content_key()
+    except RESOLUTION_ERRORS as e:
+        logger.warning(
+            f"Could not resolve the {service} migrations, building them instead "
+            f"of using a bundle: {e}"
+        )
+        return container
+
+    image_id: str = docker.from_env().images.get(image).id
+    key: str = hashlib.sha256(f"{image_id}\0{content_key}".encode()).hexdigest()[:24]
+    return (
+        container.with_volume_mapping(
+            settings.MIGRATION_BUNDLES_VOLUME, _BUNDLES_MOUNT, "rw"
+        )
+        .with_env("BUNDLE_DIR", _BUNDLES_MOUNT)
+        .with_env("BUNDLE_KEY", f"{service}-{key}")
+        .with_env("GIT_COMMIT", source.git_commit)
+    )
+
+
+def _with_restore_caches(
+    container: StreamLoggingDockerContainer,
+) -> StreamLoggingDockerContainer:
+    """Keep NuGet packages and restore output across containers and runs.
+
+    Shared by every runner on the host, local checkouts included; entrypoint.sh
+    takes a lock around restore.
+    """
+    return (
+        container.with_volume_mapping(
+            settings.MIGRATIONS_NUGET_VOLUME, _NUGET_PACKAGES_MOUNT, "rw"
+        )
+        .with_volume_mapping(
+            settings.MIGRATIONS_RESTORE_CACHE_VOLUME, _RESTORE_CACHE_MOUNT, "rw"
+        )
+        .with_env("OBJ_CACHE_DIR", _RESTORE_CACHE_MOUNT)
+    )
+
+
 def _with_design_time_database_config(
     container: StreamLoggingDockerContainer, postgres_connection_string: str
 ) -> StreamLoggingDockerContainer:
@@ -77,11 +149,25 @@ def _with_design_time_database_config(
     )
 
 
+def run_migrations_to_completion(
+    migrations_runner: StreamLoggingDockerContainer, description: str
+) -> None:
+    with migrations_runner:
+        # Block until the container exits; returns {"StatusCode": int}
+        result = migrations_runner.get_wrapped_container().wait()
+        status = int(result.get("StatusCode", 1))
+        if status != 0:
+            raise RuntimeError(f"{description} failed with exit code {status}")
+
+    logger.info(f"{description} completed successfully (container exited cleanly)")
+
+
 def create_migrations_runner_container(
     network: Network,
     postgres_connection_string: str,
     name: str = "flotilla_migrations",
     test_id: str = "",
+    git_commit: str = "",
 ) -> StreamLoggingDockerContainer:
     migrations_runner_image: str = build_image_once(
         path=str(Path(settings.RELATIVE_PATH_TO_DOCKERFILE).resolve(strict=True)),
@@ -95,6 +181,7 @@ def create_migrations_runner_container(
         .with_env("DATABASE_URL", postgres_connection_string)
         .with_env("GIT_REPO", settings.GIT_REPOSITORY_FOR_MIGRATIONS)
         .with_env("GIT_REF", settings.GIT_REPOSITORY_FOR_MIGRATIONS_REF)
+        .with_env("GIT_COMMIT", git_commit)
         .with_env("EF_PROJECT_PATH", settings.BACKEND_PROJECT_FILE_FOLDER)
         .with_env("EF_STARTUP_PATH", settings.BACKEND_PROJECT_FILE_FOLDER)
     )
@@ -104,6 +191,13 @@ def create_migrations_runner_container(
         project_folder=settings.BACKEND_PROJECT_FILE_FOLDER,
         setting_name="FLOTILLA_MIGRATIONS_SOURCE_DIR",
     )
+    container = _with_migrations_bundle(
+        container,
+        source=FLOTILLA_MIGRATIONS,
+        service="flotilla",
+        image=migrations_runner_image,
+    )
+    container = _with_restore_caches(container)
     return _with_design_time_database_config(container, postgres_connection_string)
 
 
@@ -112,6 +206,7 @@ def create_sara_migrations_runner_container(
     postgres_connection_string: str,
     name: str = "sara_migrations",
     test_id: str = "",
+    git_commit: str = "",
 ) -> StreamLoggingDockerContainer:
     sara_migrations_runner_image: str = build_image_once(
         path=str(Path(settings.RELATIVE_PATH_TO_DOCKERFILE).resolve(strict=True)),
@@ -125,6 +220,7 @@ def create_sara_migrations_runner_container(
         .with_env("DATABASE_URL", postgres_connection_string)
         .with_env("GIT_REPO", settings.SARA_GIT_REPOSITORY_FOR_MIGRATIONS)
         .with_env("GIT_REF", settings.SARA_GIT_REPOSITORY_FOR_MIGRATIONS_REF)
+        .with_env("GIT_COMMIT", git_commit)
         .with_env("EF_PROJECT_PATH", settings.SARA_BACKEND_PROJECT_FILE_FOLDER)
         .with_env("EF_STARTUP_PATH", settings.SARA_BACKEND_PROJECT_FILE_FOLDER)
     )
@@ -134,4 +230,11 @@ def create_sara_migrations_runner_container(
         project_folder=settings.SARA_BACKEND_PROJECT_FILE_FOLDER,
         setting_name="SARA_MIGRATIONS_SOURCE_DIR",
     )
+    container = _with_migrations_bundle(
+        container,
+        source=SARA_MIGRATIONS,
+        service="sara",
+        image=sara_migrations_runner_image,
+    )
+    container = _with_restore_caches(container)
     return _with_design_time_database_config(container, postgres_connection_string)
@@ -1,17 +1,28 @@
+from typing import Optional
+
 from docker.models.networks import Network
 from testcontainers.core.container import DockerContainer
 
 from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.image_prefetch import wait_for_image
+from robotics_integration_tests.utilities.mqtt_observer import MqttObserver
 
 
 class FlotillaBroker:
     def __init__(
-        self, broker: DockerContainer, name: str, port: int, alias: str
+        self,
+        broker: DockerContainer,
+        name: str,
+        port: int,
+        alias: str,
+        observer: Optional[MqttObserver] = None,
     ) -> None:
         self.broker = broker
         self.name = name
         self.port = port
         self.alias = alias
+        # Follows the robots' reports from the host; None when disabled.
+        self.observer = observer
 
 
 def create_flotilla_broker_container(
@@ -22,6 +33,7 @@ def create_flotilla_broker_container(
     alias: str = "broker",  # Must be named "broker" due to the certificate expecting this name
     test_id: str = "",
 ) -> DockerContainer:
+    wait_for_image(image)
     container: DockerContainer = (
         DockerContainer(image=image)
         .with_kwargs(platform="linux/amd64")
@@ -2,21 +2,77 @@ from docker.models.networks import Network
 from testcontainers.postgres import PostgresContainer
 
 from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.image_prefetch import wait_for_image
+
+# Everything but EF's migration history, so the schema survives and only the data
+# goes. CASCADE because the tables reference each other.
+_TRUNCATE_ALL_TABLES = """
+DO $$
+DECLARE
+    tables text;
+BEGIN
+    SELECT string_agg(format('%I.%I', schemaname, tablename), ', ')
+      INTO tables
+      FROM pg_tables
+     WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+       AND tablename <> '__EFMigrationsHistory';
+    IF tables IS NOT NULL THEN
+        EXECUTE 'TRUNCATE TABLE ' || tables || ' RESTART IDENTITY CASCADE';
+    END IF;
+END $$;
+"""
 
 
 class FlotillaDatabase:
     def __init__(
-        self, database: PostgresContainer, connection_string: str, alias: str
+        self,
+        database: PostgresContainer,
+        connection_string: str,
+        alias: str,
+        dbname: str = settings.DB_ALIAS,
     ) -> None:
         self.database: PostgresContainer = database
         self.connection_string: str = connection_string
         self.alias: str = alias
+        # Differs from the container's own database on a shared server.
+        self.dbname: str = dbname
+
+
+def npgsql_connection_string(host: str, username: str, password: str, database: str) -> str:
+    return (
+        f"Host={host}; Port={5432}; Username={username}; Password={password}; "
+        f"Database={database}; SSL Mode=Disable;"
+    )
+
+
+def flotilla_connection_string(database: str = settings.DB_ALIAS) -> str:
+    return npgsql_connection_string(
+        host=settings.DB_ALIAS,
+        username=settings.DB_USER,
+        password=settings.DB_PASSWORD,
+        database=database,
+    )
+
+
+def sara_connection_string(database: str = settings.SARA_DB_ALIAS) -> str:
+    return npgsql_connection_string(
+        host=settings.SARA_DB_ALIAS,
+        username=settings.SARA_DB_USER,
+        password=settings.SARA_DB_PASSWORD,
+        database=database,
+    )
 
 
-def create_postgres_container(network: Network, name: str = "flotilla_postgres", test_id: str = "") -> PostgresContainer:
+def create_postgres_container(
+    network: Network,
+    name: str = "flotilla_postgres",
+    test_id: str = "",
+    image: str = settings.POSTGRESQL_IMAGE,
+) -> PostgresContainer:
+    wait_for_image(image)
     container: PostgresContainer = (
         PostgresContainer(
-            image=settings.POSTGRESQL_IMAGE,
+            image=image,
             username=settings.DB_USER,
             password=settings.DB_PASSWORD,
             dbname=settings.DB_ALIAS,
@@ -32,17 +88,29 @@ def create_postgres_container(network: Network, name: str = "flotilla_postgres",
 
 class SaraDatabase:
     def __init__(
-        self, database: PostgresContainer, connection_string: str, alias: str
+        self,
+        database: PostgresContainer,
+        connection_string: str,
+        alias: str,
+        dbname: str = settings.SARA_DB_ALIAS,
     ) -> None:
         self.database: PostgresContainer = database
         self.connection_string: str = connection_string
         self.alias: str = alias
+        # Differs from the container's own database on a shared server.
+        self.dbname: str = dbname
 
 
-def create_sara_postgres_container(network: Network, name: str = "sara_postgres", test_id: str = "") -> PostgresContainer:
+def create_sara_postgres_container(
+    network: Network,
+    name: str = "sara_postgres",
+    test_id: str = "",
+    image: str = settings.POSTGRESQL_IMAGE,
+) -> PostgresContainer:
+    wait_for_image(image)
     container: PostgresContainer = (
         PostgresContainer(
-            image=settings.POSTGRESQL_IMAGE,
+            image=image,
             username=settings.SARA_DB_USER,
             password=settings.SARA_DB_PASSWORD,
             dbname=settings.SARA_DB_ALIAS,
@@ -54,3 +122,36 @@ def create_sara_postgres_container(network: Network, name: str = "sara_postgres"
     )
 
     return container
+
+
+def run_sql(database: PostgresContainer, sql: str, dbname: str = "") -> str:
+    """Run *sql* with psql inside the database container and return its output.
+
+    Through the container rather than a driver so that the tests need no Postgres
+    client library on the host. Connects to the container's own database unless
+    *dbname* names another.
+    """
+    result = database.exec(
+        [
+            "psql",
+            "--username",
+            database.username,
+            "--dbname",
+            dbname or database.dbname,
+            "--no-psqlrc",
+            "--tuples-only",
+            "--no-align",
+            "--set",
+            "ON_ERROR_STOP=1",
+            "--command",
+            sql,
+        ]
+    )
+    output: str = result.output.decode("utf-8", errors="replace")
+    if result.exit_code != 0:
+        raise RuntimeError(f"psql failed with exit code {result.exit_code}: {output}")
+    return output
+
+
+def truncate_all_tables(database: PostgresContainer, dbname: str = "") -> None:
+    run_sql(database, _TRUNCATE_ALL_TABLES, dbname=dbname)
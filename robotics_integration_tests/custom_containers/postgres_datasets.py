@@ -0,0 +1,561 @@
+"""Production-sized datasets, bulk loaded into the Flotilla and SARA databases.
+
+A dataset is a number of rows per table. The generator reads the schema EF
+migrated the database to, so it follows the services' models without knowing
+them:
+
+- Primary keys get fresh UUIDs, and foreign keys point at rows generated for the
+  referenced table, spread evenly, e.g. every mission run gets the same number
+  of tasks. A table that a generated row must reference is generated too.
+- A foreign key that a referenced row also has takes that row's value, so an
+  inspection area's installation is its plant's. A *Code column takes the
+  value of a referenced row, or of a row that one references in turn, so a
+  mission run's InstallationCode is its inspection area's installation's.
+- A column holding one of Flotilla's enums gets one of its members, by name or
+  by number as EF stores it; _ENUMS lists them and _DRAWS how often each is
+  drawn for the columns the API filters on, such as statuses.
+- Other required columns get a value of their type, unique per row for text;
+  optional ones are left NULL.
+
+Rows are written to CSV files on the host, copied into the database container
+and loaded with COPY in one transaction, with foreign key triggers off since the
+generator only writes keys it generated. Loading is then bound by how fast the
+host writes the CSV, not by the API.
+"""
+
+import csv
+import json
+import random
+import tarfile
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from testcontainers.postgres import PostgresContainer
+
+from robotics_integration_tests.custom_containers.postgres import (
+    FlotillaDatabase,
+    SaraDatabase,
+    run_sql,
+)
+
+# Rows generated for a table only because another generated table requires it.
+_SUPPORTING_ROWS = 10
+
+# Generated timestamps fall within this much history.
+_HISTORY = timedelta(days=365)
+
+# Where the CSV files go inside the database container.
+_CONTAINER_DIR = "/tmp"
+
+_NULL = r"\N"
+
+# Columns with this suffix, such as InstallationCode, take the value of the same
+# column of a referenced row, or of the rows it references.
+_SHARED_SUFFIX = "Code"
+
+_MISSION_STATUSES: Tuple[str, ...] = (
+    "Pending",
+    "Queued",
+    "Ongoing",
+    "Paused",
+    "Aborted",
+    "Cancelled",
+    "Failed",
+    "Successful",
+    "PartiallySuccessful",
+)
+_TASK_STATUSES: Tuple[str, ...] = (
+    "Successful",
+    "PartiallySuccessful",
+    "NotStarted",
+    "InProgress",
+    "Failed",
+    "Cancelled",
+    "Paused",
+)
+
+# Flotilla's enums by (table, column), with their members in the order declared.
+# EF stores an enum in a text column by name, and in an integer column by number,
+# which is the member's position here.
+_ENUMS: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("MissionRuns", "Status"): _MISSION_STATUSES,
+    ("MissionTasks", "Status"): _TASK_STATUSES,
+    ("MissionTasks", "Type"): ("Inspection", "ReturnHome"),
+    ("Inspections", "Status"): (
+        "Successful",
+        "InProgress",
+        "NotStarted",
+        "Failed",
+        "Cancelled",
+    ),
+    ("Inspections", "InspectionType"): (
+        "Image",
+        "ThermalImage",
+        "Video",
+        "ThermalVideo",
+        "Audio",
+        "CO2Measurement",
+    ),
+    ("Robots", "Status"): (
+        "Available",
+        "Busy",
+        "Offline",
+        "Blocked",
+        "BlockedProtectiveStop",
+        "Home",
+        "ReturningHome",
+        "InterventionNeeded",
+        "Recharging",
+        "Lockdown",
+        "GoingToLockdown",
+        "GoingToRecharging",
+        "Maintenance",
+        "UnknownStatus",
+    ),
+    ("RobotModels", "Type"): (
+        "TaurobInspector",
+        "TaurobOperator",
+        "ExR2",
+        "Robot",
+        "Turtlebot",
+        "AnymalX",
+        "AnymalD",
+        "NoneType",
+    ),
+}
+
+# The members drawn for an enum column, repeated to draw them more often; the
+# members of an enum not listed are drawn evenly.
+_DRAWS: Dict[Tuple[str, str], Tuple[str, ...]] = {
+    ("MissionRuns", "Status"): (
+        "Successful",
+        "Successful",
+        "Successful",
+        "PartiallySuccessful",
+        "Failed",
+        "Aborted",
+        "Cancelled",
+    ),
+    ("MissionTasks", "Status"): (
+        "Successful",
+        "Successful",
+        "Successful",
+        "PartiallySuccessful",
+        "Failed",
+        "Cancelled",
+    ),
+    ("MissionTasks", "Type"): ("Inspection",),
+    # Generated robots must never be picked for a mission.
+    ("Robots", "Status"): ("Offline",),
+}
+
+_COLUMNS_QUERY = """
+SELECT coalesce(json_agg(c ORDER BY c.table_name, c.ordinal_position), '[]')
+  FROM (
+    SELECT col.table_name,
+           col.column_name,
+           col.ordinal_position,
+           col.data_type,
+           col.character_maximum_length AS max_length,
+           col.is_nullable = 'YES' AS nullable,
+           col.column_default IS NOT NULL OR col.is_identity = 'YES' AS has_default,
+           EXISTS (
+             SELECT 1
+               FROM information_schema.table_constraints tc
+               JOIN information_schema.key_column_usage kcu
+                 ON kcu.constraint_name = tc.constraint_name
+                AND kcu.table_schema = tc.table_schema
+              WHERE tc.constraint_type = 'PRIMARY KEY'
+                AND tc.table_schema = col.table_schema
+                AND kcu.table_name = col.table_name
+                AND kcu.column_name = col.column_name
+           ) AS primary_key,
+           (
+             SELECT ccu.table_name
+               FROM information_schema.table_constraints tc
+               JOIN information_schema.key_column_usage kcu
+                 ON kcu.constraint_name = tc.constraint_name
+                AND kcu.table_schema = tc.table_schema
+               JOIN information_schema.constraint_column_usage ccu
+                 ON ccu.constraint_name = tc.constraint_name
+                AND ccu.table_schema = tc.table_schema
+              WHERE tc.constraint_type = 'FOREIGN KEY'
+                AND tc.table_schema = col.table_schema
+                AND kcu.table_name = col.table_name
+                AND kcu.column_name = col.column_name
+              LIMIT 1
+           ) AS references
+      FROM information_schema.columns col
+      JOIN information_schema.tables t
+        ON t.table_schema = col.table_schema
+       AND t.table_name = col.table_name
+     WHERE col.table_schema = 'public'
+       AND t.table_type = 'BASE TABLE'
+       AND col.table_name <> '__EFMigrationsHistory'
+  ) c;
+"""
+
+
+class _Column:
+    def __init__(self, description: Dict[str, Any]) -> None:
+        self.name: str = description["column_name"]
+        self.data_type: str = description["data_type"]
+        self.max_length: Optional[int] = description["max_length"]
+        self.nullable: bool = description["nullable"]
+        self.has_default: bool = description["has_default"]
+        self.primary_key: bool = description["primary_key"]
+        self.references: Optional[str] = description["references"]
+
+
+class _Table:
+    def __init__(self, name: str, columns: List[_Column]) -> None:
+        self.name: str = name
+        self.columns: List[_Column] = columns
+        self.column_names: Set[str] = {column.name for column in columns}
+
+    @property
+    def primary_key(self) -> str:
+        return next((c.name for c in self.columns if c.primary_key), "Id")
+
+    def required_parents(self) -> Set[str]:
+        return {
+            column.references
+            for column in self.columns
+            if column.references
+            and column.references != self.name
+            and not column.nullable
+        }
+
+
+def flotilla_dataset(
+    installations: int = 1_000,
+    inspection_areas_per_installation: int = 2,
+    robots: int = 50,
+    mission_runs: int = 100_000,
+    tasks_per_mission_run: int = 4,
+) -> Dict[str, int]:
+    """Rows per table for a Flotilla database of the given size."""
+    return {
+        "Installations": installations,
+        "Plants": installations,
+        "InspectionAreas": installations * inspection_areas_per_installation,
+        "Robots": robots,
+        "MissionRuns": mission_runs,
+        "MissionTasks": mission_runs * tasks_per_mission_run,
+    }
+
+
+def load_flotilla_dataset(
+    flotilla_database: FlotillaDatabase,
+    volumes: Optional[Dict[str, int]] = None,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """Bulk load flotilla_dataset(), or *volumes*; returns the rows per table."""
+    return load_dataset(
+        flotilla_database.database,
+        volumes or flotilla_dataset(),
+        dbname=flotilla_database.dbname,
+        seed=seed,
+    )
+
+
+def load_sara_dataset(
+    sara_database: SaraDatabase, volumes: Dict[str, int], seed: int = 0
+) -> Dict[str, int]:
+    """Bulk load *volumes*, rows per SARA table; returns the rows per table."""
+    return load_dataset(
+        sara_database.database, volumes, dbname=sara_database.dbname, seed=seed
+    )
+
+
+def load_dataset(
+    database: PostgresContainer,
+    volumes: Dict[str, int],
+    dbname: str = "",
+    seed: int = 0,
+) -> Dict[str, int]:
+    """Generate *volumes* rows per table and COPY them into the database.
+
+    The same *seed* draws the same values. Returns the rows loaded per table,
+    including tables generated because the requested ones reference them.
+    """
+    started: float = time.monotonic()
+    tables: Dict[str, _Table] = _describe_tables(database, dbname)
+    unknown: List[str] = [name for name in volumes if name not in tables]
+    if unknown:
+        raise ValueError(
+            f"No table {', '.join(unknown)} in {dbname or database.dbname}; "
+            f"it has {', '.join(sorted(tables))}"
+        )
+
+    counts: Dict[str, int] = _with_required_parents(tables, volumes)
+    generator = _Generator(tables, random.Random(seed))
+    with tempfile.TemporaryDirectory(prefix="armada-dataset-") as directory:
+        files: Dict[str, Tuple[Path, List[str]]] = {}
+        for name in _in_dependency_order(tables, counts):
+            path = Path(directory) / f"armada-dataset-{uuid.uuid4().hex}.csv"
+            files[name] = (path, generator.write(tables[name], counts[name], path))
+        generated: float = time.monotonic()
+
+        paths: List[Path] = [path for path, _ in files.values()]
+        _copy_into_container(database, paths)
+        try:
+            run_sql(database, _copy_statements(files), dbname=dbname)
+        finally:
+            database.exec(
+                ["rm", "-f", *(f"{_CONTAINER_DIR}/{path.name}" for path in paths)]
+            )
+
+    logger.info(
+        f"Loaded {sum(counts.values())} rows into {dbname or database.dbname} in "
+        f"{time.monotonic() - started:.1f}s ({generated - started:.1f}s generating): "
+        + ", ".join(f"{count} {name}" for name, count in counts.items())
+    )
+    return counts
+
+
+def _describe_tables(database: PostgresContainer, dbname: str) -> Dict[str, _Table]:
+    columns: Dict[str, List[_Column]] = {}
+    for description in json.loads(run_sql(database, _COLUMNS_QUERY, dbname=dbname)):
+        columns.setdefault(description["table_name"], []).append(_Column(description))
+    return {name: _Table(name, columns[name]) for name in columns}
+
+
+def _with_required_parents(
+    tables: Dict[str, _Table], volumes: Dict[str, int]
+) -> Dict[str, int]:
+    counts: Dict[str, int] = dict(volumes)
+    pending: List[str] = list(volumes)
+    while pending:
+        for parent in tables[pending.pop()].required_parents():
+            if parent not in counts:
+                counts[parent] = _SUPPORTING_ROWS
+                pending.append(parent)
+    return counts
+
+
+def _in_dependency_order(
+    tables: Dict[str, _Table], counts: Dict[str, int]
+) -> List[str]:
+    ordered: List[str] = []
+    remaining: Set[str] = set(counts)
+    while remaining:
+        ready: List[str] = sorted(
+            name
+            for name in remaining
+            if not any(
+                column.references in remaining and column.references != name
+                for column in tables[name].columns
+            )
+        )
+        if not ready:
+            raise ValueError(
+                f"Tables {', '.join(sorted(remaining))} reference each other"
+            )
+        ordered.extend(ready)
+        remaining.difference_update(ready)
+    return ordered
+
+
+class _Generator:
+    def __init__(self, tables: Dict[str, _Table], rng: random.Random) -> None:
+        self._tables: Dict[str, _Table] = tables
+        self._rng: random.Random = rng
+        self._now: datetime = datetime.now(timezone.utc)
+        # Table -> its generated rows, with only the values rows referencing
+        # them may take over.
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._rows_by_id: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+
+    def write(self, table: _Table, count: int, path: Path) -> List[str]:
+        """Write *count* rows of *table* to *path*; returns the columns written."""
+        columns: List[_Column] = [
+            column
+            for column in table.columns
+            if not column.has_default or column.primary_key
+        ]
+        # Foreign keys that another referenced row can supply come last, so that
+        # e.g. an inspection area's installation is its plant's.
+        foreign_keys: List[_Column] = sorted(
+            (
+                column
+                for column in columns
+                if column.references in self._rows and column.references != table.name
+            ),
+            key=lambda column: self._derivable(table, column),
+        )
+        shared: List[_Column] = [
+            column
+            for column in columns
+            if column.name.endswith(_SHARED_SUFFIX) and column not in foreign_keys
+        ]
+        generated: List[Tuple[_Column, Callable[[int], Any]]] = [
+            (column, self._value_for(table, column))
+            for column in columns
+            if column not in foreign_keys
+        ]
+        kept: Set[str] = self._kept_columns(table)
+
+        rows: List[Dict[str, Any]] = []
+        with path.open("w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(column.name for column in columns)
+            for index in range(count):
+                row: Dict[str, Any] = {
+                    column.name: value(index) for column, value in generated
+                }
+                parents: List[Dict[str, Any]] = []
+                for column in foreign_keys:
+                    parent: Optional[Dict[str, Any]] = self._shared_parent(
+                        column, parents
+                    )
+                    if parent is None:
+                        parent_rows = self._rows[column.references]
+                        parent = parent_rows[index % len(parent_rows)]
+                    row[column.name] = parent[
+                        self._tables[column.references].primary_key
+                    ]
+                    parents.append(parent)
+                codes: Dict[str, Any] = {
+                    name: value
+                    for parent in reversed(parents)
+                    for name, value in parent.items()
+                    if name.endswith(_SHARED_SUFFIX)
+                }
+                for column in shared:
+                    if column.name in codes:
+                        row[column.name] = codes[column.name]
+                writer.writerow(row[column.name] for column in columns)
+                if kept:
+                    codes.update((name, row[name]) for name in kept if name in row)
+                    rows.append(codes)
+
+        self._rows[table.name] = rows
+        return [column.name for column in columns]
+
+    def _shared_parent(
+        self, column: _Column, parents: List[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """The row *column* points to according to a row already referenced."""
+        for parent in parents:
+            if column.name in parent:
+                rows_by_id = self._rows_by_id.get(column.references)
+                if rows_by_id is None:
+                    key: str = self._tables[column.references].primary_key
+                    rows_by_id = self._rows_by_id[column.references] = {
+                        row[key]: row for row in self._rows[column.references]
+                    }
+                return rows_by_id.get(parent[column.name])
+        return None
+
+    def _derivable(self, table: _Table, column: _Column) -> bool:
+        return any(
+            other.references != column.references
+            and column.name in self._tables[other.references].column_names
+            for other in table.columns
+            if other.references in self._rows
+        )
+
+    def _kept_columns(self, table: _Table) -> Set[str]:
+        """What a row referencing one of *table* may take from it."""
+        if not any(
+            column.references == table.name
+            for other in self._tables.values()
+            for column in other.columns
+        ):
+            return set()
+        return {table.primary_key} | {
+            column.name
+            for column in table.columns
+            if column.references or column.name.endswith(_SHARED_SUFFIX)
+        }
+
+    def _value_for(self, table: _Table, column: _Column) -> Callable[[int], Any]:
+        rng: random.Random = self._rng
+        members: Optional[Tuple[str, ...]] = _ENUMS.get((table.name, column.name))
+        data_type: str = column.data_type
+
+        if column.primary_key and data_type in ("text", "character varying", "uuid"):
+            return lambda index: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if members is not None:
+            drawn: Tuple[Any, ...] = _DRAWS.get((table.name, column.name), members)
+            if data_type in ("integer", "smallint", "bigint"):
+                drawn = tuple(members.index(member) for member in drawn)
+            return lambda index: rng.choice(drawn)
+        if column.nullable:
+            return lambda index: _NULL
+        if data_type in ("text", "character varying", "character"):
+            return _unique_text(column)
+        if data_type == "uuid":
+            return lambda index: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if data_type in ("integer", "smallint", "bigint"):
+            return lambda index: index if column.primary_key else 0
+        if data_type in ("double precision", "real", "numeric"):
+            return lambda index: round(rng.uniform(0, 100), 3)
+        if data_type == "boolean":
+            return lambda index: "false"
+        if data_type.startswith("timestamp"):
+            history_seconds: float = _HISTORY.total_seconds()
+            return lambda index: (
+                self._now - timedelta(seconds=rng.uniform(0, history_seconds))
+            ).isoformat()
+        if data_type == "interval":
+            return lambda index: "00:00:00"
+        if data_type in ("json", "jsonb", "ARRAY"):
+            return lambda index: "{}"
+        raise ValueError(
+            f"Cannot generate {table.name}.{column.name} of type {data_type}"
+        )
+
+
+def _unique_text(column: _Column) -> Callable[[int], str]:
+    def value(index: int) -> str:
+        suffix: str = _base36(index)
+        text: str = f"{column.name}-{suffix}"
+        if column.max_length is not None and len(text) > column.max_length:
+            # Starts with a digit, so it never equals a seeded code such as HUA.
+            return f"0{suffix}"
+        return text
+
+    return value
+
+
+def _base36(number: int) -> str:
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    encoded: str = ""
+    while True:
+        number, digit = divmod(number, 36)
+        encoded = digits[digit] + encoded
+        if not number:
+            return encoded
+
+
+def _copy_into_container(database: PostgresContainer, paths: List[Path]) -> None:
+    with tempfile.TemporaryFile() as archive:
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            for path in paths:
+                tar.add(path, arcname=path.name)
+        archive.seek(0)
+        database.get_wrapped_container().put_archive(_CONTAINER_DIR, archive)
+
+
+def _copy_statements(files: Dict[str, Tuple[Path, List[str]]]) -> str:
+    statements: List[str] = [
+        "BEGIN;",
+        # Every key written references a row loaded in this transaction.
+        "SET LOCAL session_replication_role = replica;",
+    ]
+    for name, (path, columns) in files.items():
+        column_list: str = ", ".join(f'"{column}"' for column in columns)
+        statements.append(
+            f"COPY \"{name}\" ({column_list}) FROM '{_CONTAINER_DIR}/{path.name}' "
+            f"WITH (FORMAT csv, HEADER true, NULL '{_NULL}');"
+        )
+    statements.append("COMMIT;")
+    statements.extend(f'ANALYZE "{name}";' for name in files)
+    return "\n".join(statements)
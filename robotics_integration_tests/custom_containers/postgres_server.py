@@ -0,0 +1,179 @@
+"""One Postgres server per xdist worker, hosting the databases of every test.
+
+The server keeps a migrated template database per service, built the first time
+a test on the worker needs it. Each test then gets its own clone, made with
+CREATE DATABASE ... TEMPLATE, which copies files instead of replaying migrations.
+The server joins each test's network under the usual database aliases, so the
+services connect exactly as they would to a server of their own.
+"""
+
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import docker
+from loguru import logger
+from testcontainers.core.network import Network
+from testcontainers.postgres import PostgresContainer
+
+from robotics_integration_tests.custom_containers.migrations_runner import (
+    run_migrations_to_completion,
+)
+from robotics_integration_tests.custom_containers.postgres import (
+    create_postgres_container,
+    run_sql,
+)
+from robotics_integration_tests.custom_containers.postgres_snapshots import (
+    SnapshotSpec,
+)
+from robotics_integration_tests.settings.settings import settings
+
+
+class PostgresServer:
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._network: Optional[Network] = None
+        self._container: Optional[PostgresContainer] = None
+        # Per service, so that both templates are built side by side.
+        self._template_locks: Dict[str, threading.Lock] = {}
+        self._templates: Dict[str, str] = {}
+        # Tests attached per network; the last one to leave disconnects.
+        self._attachments: Dict[str, int] = {}
+
+    @contextmanager
+    def database(
+        self, spec: SnapshotSpec, network: Network, test_id: str
+    ) -> Iterator[str]:
+        """A fresh, migrated database for *spec*, reachable on *network*."""
+        container: PostgresContainer = self._start()
+        template: str = self._template(spec)
+        name: str = _identifier(f"{spec.service}_{test_id}")
+
+        run_sql(
+            container,
+            f'CREATE DATABASE "{name}" TEMPLATE "{template}" OWNER "{spec.username}"',
+        )
+        try:
+            with self._attached(network):
+                yield name
+        finally:
+            run_sql(container, f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+
+    @property
+    def container(self) -> PostgresContainer:
+        return self._start()
+
+    def close(self) -> None:
+        with self._lock:
+            container, self._container = self._container, None
+            network, self._network = self._network, None
+        if container is not None:
+            container.stop()
+        if network is not None:
+            network.remove()
+
+    def _start(self) -> PostgresContainer:
+        with self._lock:
+            if self._container is None:
+                network: Network = Network().create()
+                # Under both aliases, here and on every test network, so that
+                # each service finds the server where it expects its own.
+                container: PostgresContainer = create_postgres_container(
+                    network, name="shared_postgres", test_id=uuid.uuid4().hex[:8]
+                ).with_network_aliases(settings.DB_ALIAS, settings.SARA_DB_ALIAS)
+                container.start()
+                self._network, self._container = network, container
+                logger.info(
+                    f"Shared Postgres server started as {container.get_wrapped_container().name}"
+                )
+            return self._container
+
+    def _template(self, spec: SnapshotSpec) -> str:
+        with self._lock:
+            lock = self._template_locks.setdefault(spec.service, threading.Lock())
+
+        with lock:
+            if spec.service not in self._templates:
+                self._templates[spec.service] = self._build_template(spec)
+            return self._templates[spec.service]
+
+    def _build_template(self, spec: SnapshotSpec) -> str:
+        container: PostgresContainer = self._start()
+        template: str = f"{spec.service}_template"
+
+        if spec.username != container.username:
+            # A superuser, as it would be on a server of its own.
+            run_sql(
+                container,
+                f"CREATE ROLE \"{spec.username}\" SUPERUSER LOGIN PASSWORD '{spec.password}'",
+            )
+        run_sql(container, f'CREATE DATABASE "{template}" OWNER "{spec.username}"')
+
+        run_migrations_to_completion(
+            spec.create_migrations_runner(
+                network=self._network,
+                postgres_connection_string=spec.connection_string(database=template),
+                name=f"{spec.service}_template_migrations",
+                test_id=uuid.uuid4().hex[:8],
+                git_commit=spec.source.git_commit,
+            ),
+            description=f"{spec.service.capitalize()} template migrations",
+        )
+
+        # Cloning fails while anyone is connected to the template, so nobody may
+        # connect to it from here on.
+        run_sql(
+            container,
+            f'ALTER DATABASE "{template}" WITH IS_TEMPLATE true ALLOW_CONNECTIONS false',
+        )
+        logger.info(f"Built template database {template}")
+        return template
+
+    @contextmanager
+    def _attached(self, network: Network) -> Iterator[None]:
+        container_id: str = self.container.get_wrapped_container().id
+        with self._lock:
+            count: int = self._attachments.get(network.id, 0)
+            if count == 0:
+                network.connect(
+                    container_id,
+                    network_aliases=[settings.DB_ALIAS, settings.SARA_DB_ALIAS],
+                )
+            self._attachments[network.id] = count + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._attachments[network.id] -= 1
+                if self._attachments[network.id] == 0:
+                    del self._attachments[network.id]
+                    docker.from_env().networks.get(network.id).disconnect(
+                        container_id
+                    )
+
+
+def _identifier(name: str) -> str:
+    return re.sub(r"\W", "_", name).lower()[:63]
+
+
+_server: Optional[PostgresServer] = None
+_server_lock: threading.Lock = threading.Lock()
+
+
+def shared_postgres_server() -> PostgresServer:
+    """The server of this worker, which is a process of its own under xdist."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = PostgresServer()
+        return _server
+
+
+def close_shared_postgres_server() -> None:
+    global _server
+    with _server_lock:
+        server, _server = _server, None
+    if server is not None:
+        server.close()
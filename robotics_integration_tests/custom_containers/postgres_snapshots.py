@@ -0,0 +1,233 @@
+"""Postgres images that are already migrated, so a test need not run the migrations.
+
+A snapshot is a committed Postgres container, tagged by a hash of the migration
+files it was migrated with. The image declares its data directory a VOLUME, which
+`docker commit` leaves out, so snapshots keep their data in a directory of their
+own instead.
+
+When no snapshot matches, the closest older one is used as the starting point:
+one whose migrations, with identical content, are a strict subset of the ones
+wanted. EF then applies only what is missing.
+"""
+
+import hashlib
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import docker
+from docker.errors import ImageNotFound
+from docker.models.images import Image
+from loguru import logger
+from testcontainers.core.network import Network
+from testcontainers.postgres import PostgresContainer
+
+from robotics_integration_tests.custom_containers.image_builder import host_lock
+from robotics_integration_tests.custom_containers.migration_sources import (
+    FLOTILLA_MIGRATIONS,
+    RESOLUTION_ERRORS,
+    SARA_MIGRATIONS,
+    MigrationSource,
+)
+from robotics_integration_tests.custom_containers.migrations_runner import (
+    create_migrations_runner_container,
+    create_sara_migrations_runner_container,
+    run_migrations_to_completion,
+)
+from robotics_integration_tests.custom_containers.postgres import (
+    create_postgres_container,
+    create_sara_postgres_container,
+    flotilla_connection_string,
+    run_sql,
+    sara_connection_string,
+)
+from robotics_integration_tests.custom_containers.stream_logging_docker_container import (
+    StreamLoggingDockerContainer,
+)
+from robotics_integration_tests.settings.settings import settings
+
+_REPOSITORY = "armada-postgres-snapshot"
+_SNAPSHOT_PGDATA = "/var/lib/postgresql/armada-data"
+
+# What a snapshot was built from. The lineage covers everything but the
+# migrations, so only snapshots of the same lineage can be built upon.
+_LINEAGE_LABEL = "armada.snapshot.lineage"
+_MIGRATIONS_LABEL = "armada.snapshot.migrations"
+
+
+class SnapshotSpec:
+    def __init__(
+        self,
+        service: str,
+        source: MigrationSource,
+        create_database: Callable[..., PostgresContainer],
+        create_migrations_runner: Callable[..., StreamLoggingDockerContainer],
+        connection_string: Callable[..., str],
+        username: str,
+        password: str,
+        dbname: str,
+    ) -> None:
+        self.service: str = service
+        self.source: MigrationSource = source
+        self.create_database: Callable[..., PostgresContainer] = create_database
+        self.create_migrations_runner: Callable[..., StreamLoggingDockerContainer] = (
+            create_migrations_runner
+        )
+        # Takes the database name, defaulting to the service's own.
+        self.connection_string: Callable[..., str] = connection_string
+        self.username: str = username
+        self.password: str = password
+        self.dbname: str = dbname
+
+    def lineage(self) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            self.service,
+            settings.POSTGRESQL_IMAGE,
+            self.username,
+            self.password,
+            self.dbname,
+            _SNAPSHOT_PGDATA,
+        ):
+            digest.update(f"{part}\0".encode())
+        return digest.hexdigest()[:24]
+
+
+FLOTILLA_SNAPSHOT: SnapshotSpec = SnapshotSpec(
+    service="flotilla",
+    source=FLOTILLA_MIGRATIONS,
+    create_database=create_postgres_container,
+    create_migrations_runner=create_migrations_runner_container,
+    connection_string=flotilla_connection_string,
+    username=settings.DB_USER,
+    password=settings.DB_PASSWORD,
+    dbname=settings.DB_ALIAS,
+)
+
+SARA_SNAPSHOT: SnapshotSpec = SnapshotSpec(
+    service="sara",
+    source=SARA_MIGRATIONS,
+    create_database=create_sara_postgres_container,
+    create_migrations_runner=create_sara_migrations_runner_container,
+    connection_string=sara_connection_string,
+    username=settings.SARA_DB_USER,
+    password=settings.SARA_DB_PASSWORD,
+    dbname=settings.SARA_DB_ALIAS,
+)
+
+
+def migrated_postgres_image(spec: SnapshotSpec) -> Optional[str]:
+    """The tag of a Postgres image with every migration of *spec* applied.
+
+    Built on first use and shared by every worker on the host. Returns None when
+    snapshots are disabled or the migrations cannot be resolved, in which case
+    the caller migrates an empty database as before.
+    """
+    if not settings.POSTGRES_SNAPSHOTS_ENABLED:
+        return None
+
+    try:
+        migrations: Dict[str, str] = spec.source.migrations()
+        content_key: str = spec.source.content_key()
+    except RESOLUTION_ERRORS as e:
+        logger.warning(
+            f"Could not resolve the {spec.service} migrations, migrating from "
+            f"scratch instead of using a snapshot: {e}"
+        )
+        return None
+
+    lineage: str = spec.lineage()
+    key: str = hashlib.sha256(f"{lineage}\0{content_key}".encode()).hexdigest()[:24]
+    tag: str = f"{_REPOSITORY}:{spec.service}-{key}"
+
+    client = docker.from_env()
+    if _image_exists(client, tag):
+        logger.info(f"Using {spec.service} database snapshot {tag}")
+        return tag
+
+    with host_lock(f"snapshot-{spec.service}-{key}"):
+        # Another worker may have built it while this one waited.
+        if _image_exists(client, tag):
+            return tag
+
+        base_image: str = _closest_snapshot(client, lineage, migrations)
+        logger.info(f"Building {spec.service} database snapshot {tag} from {base_image}")
+        _build_snapshot(spec, base_image, tag, lineage, migrations)
+
+    return tag
+
+
+def _image_exists(client: docker.DockerClient, tag: str) -> bool:
+    try:
+        client.images.get(tag)
+        return True
+    except ImageNotFound:
+        return False
+
+
+def _closest_snapshot(
+    client: docker.DockerClient, lineage: str, migrations: Dict[str, str]
+) -> str:
+    wanted = set(_encode_migrations(migrations).split(","))
+    best: Tuple[int, str] = (0, settings.POSTGRESQL_IMAGE)
+    for image in client.images.list(filters={"label": f"{_LINEAGE_LABEL}={lineage}"}):
+        applied = set(image.labels.get(_MIGRATIONS_LABEL, "").split(",")) - {""}
+        if applied < wanted and len(applied) > best[0]:
+            best = (len(applied), _reference(image))
+    return best[1]
+
+
+def _reference(image: Image) -> str:
+    return image.tags[0] if image.tags else image.id
+
+
+def _encode_migrations(migrations: Dict[str, str]) -> str:
+    # Content hashes shortened to keep the label small; a collision would have to
+    # happen within one migration ID to matter.
+    return ",".join(
+        f"{migration_id}:{content_hash[:12]}"
+        for migration_id, content_hash in sorted(migrations.items())
+    )
+
+
+def _build_snapshot(
+    spec: SnapshotSpec,
+    base_image: str,
+    tag: str,
+    lineage: str,
+    migrations: Dict[str, str],
+) -> None:
+    build_id: str = uuid.uuid4().hex[:8]
+    with Network() as network:
+        database: PostgresContainer = spec.create_database(
+            network,
+            name=f"{spec.service}_postgres_snapshot",
+            test_id=build_id,
+            image=base_image,
+        ).with_env("PGDATA", _SNAPSHOT_PGDATA)
+
+        with database:
+            run_migrations_to_completion(
+                spec.create_migrations_runner(
+                    network=network,
+                    postgres_connection_string=spec.connection_string(),
+                    name=f"{spec.service}_snapshot_migrations",
+                    test_id=build_id,
+                    git_commit=spec.source.git_commit,
+                ),
+                description=f"{spec.service.capitalize()} snapshot migrations",
+            )
+            # Flush everything to the data files, so the committed image needs no
+            # crash recovery when it starts.
+            run_sql(database, "CHECKPOINT")
+
+            repository, image_tag = tag.split(":", 1)
+            changes: List[str] = [
+                f"ENV PGDATA={_SNAPSHOT_PGDATA}",
+                f'LABEL {_LINEAGE_LABEL}="{lineage}"',
+                f'LABEL {_MIGRATIONS_LABEL}="{_encode_migrations(migrations)}"',
+            ]
+            database.get_wrapped_container().commit(
+                repository=repository, tag=image_tag, changes=changes
+            )
+
+    logger.info(f"Built {spec.service} database snapshot {tag}")
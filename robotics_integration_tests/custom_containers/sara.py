@@ -5,6 +5,9 @@ from robotics_integration_tests.custom_containers.stream_logging_docker_containe
     StreamLoggingDockerContainer,
 )
 from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.container_readiness import bash_tcp_healthcheck
+from robotics_integration_tests.utilities.image_prefetch import wait_for_image
+from robotics_integration_tests.utilities.log_events import SARA
 
 
 class Sara:
@@ -34,18 +37,22 @@ def create_sara_container(
     alias: str = "sara",
     test_id: str = "",
 ) -> StreamLoggingDockerContainer:
+    wait_for_image(image)
     container: StreamLoggingDockerContainer = (
         StreamLoggingDockerContainer(image=image)
         .with_name(f"{name}-{test_id}")
+        .with_log_events(SARA)
         .with_exposed_ports(port)
         .with_network(network)
         .with_network_aliases(alias)
-        .with_kwargs(platform="linux/amd64")
+        .with_kwargs(platform="linux/amd64", healthcheck=bash_tcp_healthcheck(port))
         .with_env("Mqtt__Host", settings.FLOTILLA_BROKER_ALIAS)
         .with_env("Mqtt__Port", settings.FLOTILLA_BROKER_PORT)
         .with_env("Mqtt__Password", settings.SARA_MQTT_PASSWORD)
         .with_env("Mqtt__Username", "sara")
         .with_env("ASPNETCORE_ENVIRONMENT", settings.ASPNETCORE_ENVIRONMENT)
+        # "Request finished" lines, for the http_request log events.
+        .with_env("Logging__LogLevel__Microsoft.AspNetCore.Hosting", "Information")
         .with_env("Authentication__Provider", "Oidc")
         .with_env("AzureAd__Authority", keycloak.internal_url)
         .with_env("AzureAd__ClientId", settings.SARA_AUDIENCE)
@@ -1,13 +1,25 @@
-import time
-from threading import Thread
-from typing import Optional, Any
+from typing import Any, List, Optional
 
-from loguru import logger
 from testcontainers.core.container import DockerContainer
 from testcontainers.core.waiting_utils import WaitStrategy
 
+from robotics_integration_tests.utilities.log_collector import (
+    LogCursor,
+    LogPattern,
+    LogWatch,
+    attach_container_logs,
+    forget_container_logs,
+    log_cursor,
+    logged,
+    recent_container_logs,
+    watch_container_logs,
+)
+from robotics_integration_tests.utilities.wait_engine import Expectation, wait_for
+
 
 class StreamLoggingDockerContainer(DockerContainer):
+    """A container whose output goes to the test log; see utilities/log_collector.py."""
+
     def __init__(
         self,
         image: str = "",
@@ -21,12 +33,57 @@ class StreamLoggingDockerContainer(DockerContainer):
             _wait_strategy=_wait_strategy,
             **kwargs,
         )
+        self._log_service: Optional[str] = None
+
+    def with_log_events(self, service: str) -> "StreamLoggingDockerContainer":
+        """Recognise *service*'s log events in the output; see log_events.py."""
+        self._log_service = service
+        return self
+
+    def start(self) -> "StreamLoggingDockerContainer":
+        super().start()
+        attach_container_logs(
+            self._name, self.get_wrapped_container().id, self._log_service
+        )
+        return self
+
+    def stop(self, force: bool = True, delete_volume: bool = True) -> None:
+        container = self.get_wrapped_container()
+        super().stop(force=force, delete_volume=delete_volume)
+        if container is not None:
+            forget_container_logs(container.id)
 
-        self.logging_thread: Thread = Thread(target=self._stream_logs)
-        self.logging_thread.start()
+    def recent_logs(self, count: Optional[int] = None) -> List[str]:
+        """The last *count* lines of output, or as many as are kept."""
+        container = self.get_wrapped_container()
+        return recent_container_logs(container.id, count) if container else []
+
+    def log_cursor(self, from_start: bool = False) -> LogCursor:
+        """Reads the output printed from now on, or from the first line kept."""
+        return log_cursor(self.get_wrapped_container().id, from_start)
+
+    def watch_logs(self, pattern: LogPattern, from_start: bool = True) -> LogWatch:
+        container_id: str = self.get_wrapped_container().id
+        return watch_container_logs(container_id, pattern, from_start)
+
+    def logged(
+        self,
+        pattern: LogPattern,
+        from_start: bool = True,
+        description: Optional[str] = None,
+    ) -> Expectation:
+        """Met once a line of output contains *pattern*, or matches it as a regex."""
+        return logged(
+            self._name or self.image,
+            self.get_wrapped_container().id,
+            pattern,
+            from_start=from_start,
+            description=description,
+        )
 
-    def _stream_logs(self) -> None:
-        while not self.get_wrapped_container():
-            time.sleep(0.1)
-        for line in self.get_wrapped_container().logs(stream=True, follow=True):
-            logger.info(f"{self._name}: {line.decode().rstrip()}")
+    def wait_for_log(
+        self, pattern: LogPattern, timeout: float = 60, from_start: bool = True
+    ) -> str:
+        """The first line of output matching *pattern*, once it has been printed."""
+        expectation: Expectation = self.logged(pattern, from_start)
+        return wait_for([expectation], timeout=timeout)[expectation]
@@ -8,6 +8,7 @@ from robotics_integration_tests.custom_containers.image_builder import build_ima
 from robotics_integration_tests.custom_containers.stream_logging_docker_container import (
     StreamLoggingDockerContainer,
 )
+from robotics_integration_tests.utilities.container_readiness import python_tcp_healthcheck
 
 _IMAGE_DIR = Path(__file__).resolve().parent.parent / "custom_images" / "teams_webhook_receiver"
 
@@ -43,6 +44,11 @@ class TeamsWebhookReceiver:
         resp.raise_for_status()
         return resp.json()
 
+    def clear_notifications(self) -> None:
+        """Forget all notifications received so far."""
+        resp = requests.delete(f"{self.host_url}/notifications", timeout=10)
+        resp.raise_for_status()
+
     def get_notification_messages(self) -> List[str]:
         """Extract message texts from all received adaptive card payloads.
 
@@ -77,6 +83,7 @@ def create_teams_webhook_receiver_container(
         .with_exposed_ports(port)
         .with_network(network)
         .with_network_aliases(alias)
+        .with_kwargs(healthcheck=python_tcp_healthcheck(port))
     )
 
     receiver = TeamsWebhookReceiver(container=container, port=port, alias=alias)
@@ -7,59 +7,193 @@ set -euo pipefail
 # Optional inputs
 GIT_REPO="${GIT_REPO:-equinor/flotilla}"
 GIT_REF="${GIT_REF:-latest}"
+GIT_COMMIT="${GIT_COMMIT:-}"
 EF_PROJECT_PATH="${EF_PROJECT_PATH:-backend/api}"
 EF_STARTUP_PATH="${EF_STARTUP_PATH:-$EF_PROJECT_PATH}"
 EF_CONTEXT="${EF_CONTEXT:-}"
 WAIT_FOR_DB_TIMEOUT="${WAIT_FOR_DB_TIMEOUT:-60}"
+# When set, migrations are applied with a self-contained bundle cached under
+# BUNDLE_DIR/BUNDLE_KEY, built only if no earlier run has built it already. The
+# caller derives the key from the migration source, so a cached bundle always
+# holds the migrations it is asked to apply.
+BUNDLE_KEY="${BUNDLE_KEY:-}"
+BUNDLE_DIR="${BUNDLE_DIR:-/bundles}"
+# Where restore output is cached across runs; empty disables the cache.
+OBJ_CACHE_DIR="${OBJ_CACHE_DIR:-}"
 
-rm -rf /work/repo
-mkdir -p /work/repo
-
-if [ -n "${LOCAL_REPO_PATH:-}" ]; then
-  # Migrations come from a local checkout mounted read-only, so that locally
-  # built service images and the database schema come from the same source.
-  # Copied rather than used in place: the build writes bin/ and obj/ into the
-  # project, and the mount is read-only precisely so the caller's working tree
-  # cannot be modified.
-  #
-  # bin and obj are excluded not to save space but for correctness: they are
-  # host-architecture build output, and obj/project.assets.json embeds absolute
-  # host paths, both of which break restore inside this container.
-  echo "Copying migrations source from $LOCAL_REPO_PATH ..."
-  [ -d "$LOCAL_REPO_PATH" ] || { echo "LOCAL_REPO_PATH '$LOCAL_REPO_PATH' is not a directory."; exit 1; }
-  tar -C "$LOCAL_REPO_PATH" \
-      --exclude=bin \
-      --exclude=obj \
-      --exclude=node_modules \
-      --exclude=.git \
-      --exclude=TestResults \
-      -cf - . | tar -C /work/repo -xf -
-else
-  echo "Cloning $GIT_REPO @ $GIT_REF ..."
-  if [ "$GIT_REF" = "latest" ]; then
-    BRANCH=$(curl -s ${GITHUB_TOKEN:+-H "Authorization: token $GITHUB_TOKEN"} \
-      "https://api.github.com/repos/$GIT_REPO/releases/latest" | jq -r .tag_name)
-    echo "Resolved latest to $BRANCH"
-  else
-    BRANCH="main"
+# DATABASE_URL is an Npgsql connection string: "Host=...; Port=...; ...".
+connection_value() {
+  printf '%s' "$DATABASE_URL" | tr ';' '\n' | sed -n "s/^[[:space:]]*$1[[:space:]]*=[[:space:]]*//Ip" | head -n 1
+}
+
+wait_for_db() {
+  local host port end
+  host=$(connection_value Host)
+  port=$(connection_value Port)
+  if [ -z "$host" ]; then
+    echo "No Host in DATABASE_URL; not waiting for the database."
+    return
   fi
+
+  echo "Waiting for $host:${port:-5432} (timeout: ${WAIT_FOR_DB_TIMEOUT}s)..."
+  end=$((SECONDS + WAIT_FOR_DB_TIMEOUT))
+  until pg_isready --quiet --host "$host" --port "${port:-5432}"; do
+    if (( SECONDS >= end )); then
+      echo "Timed out waiting for $host:${port:-5432}."
+      exit 1
+    fi
+    sleep 0.5
+  done
+}
+
+# The files that decide what restore produces; obj/ is cached per hash of them.
+restore_key() {
+  find . \( -name '*.csproj' -o -name 'Directory.*.props' -o -name 'Directory.*.targets' \
+      -o -name 'packages.lock.json' -o -name 'global.json' -o -iname 'nuget.config' \) \
+      -not -path '*/obj/*' -not -path '*/bin/*' -print0 \
+    | sort -z | xargs -0 sha256sum | sha256sum | cut -c1-24
+}
+
+restore_projects() {
+  local key archive packages_dir
+  key=$(restore_key)
+  archive="$OBJ_CACHE_DIR/$key.tar"
+  packages_dir="${NUGET_PACKAGES:-$HOME/.nuget/packages}"
+  mkdir -p "$packages_dir"
+
+  # The package cache and the restore output cache are shared by runners on
+  # every xdist worker; NuGet only guards the former against processes in the
+  # same container. The lock covers reading, restoring and writing the archive.
+  echo "Restoring projects for EF design-time..."
+  (
+    flock 8
+    # obj/ holds the restore output with absolute paths, which are the same in
+    # every runner; with it in place restore only checks the package cache.
+    if [ -n "$OBJ_CACHE_DIR" ] && [ -f "$archive" ]; then
+      echo "Using cached restore output $key ..."
+      tar -xf "$archive"
+    fi
+
+    if dotnet restore "$EF_STARTUP_PATH" || dotnet restore "$EF_PROJECT_PATH"; then
+      if [ -n "$OBJ_CACHE_DIR" ] && [ ! -f "$archive" ]; then
+        # Every runner is PID 1 in its own container, so $$ is no unique name.
+        tmp=$(mktemp "$OBJ_CACHE_DIR/.$key.XXXXXX")
+        if find . -type d -name obj -not -path '*/obj/*' -print0 \
+            | tar --null -cf "$tmp" -T -; then
+          mv "$tmp" "$archive"
+        else
+          rm -f "$tmp"
+        fi
+      fi
+    else
+      # Left to the build to report; a failed restore is never cached.
+      echo "Restore failed; not caching its output."
+    fi
+  ) 8>"$packages_dir/.armada-restore.lock"
+}
+
+fetch_source() {
   rm -rf /work/repo
-  git clone --depth 1 --branch "$BRANCH" "https://github.com/$GIT_REPO" /work/repo
-fi
+  mkdir -p /work/repo
 
-cd /work/repo
+  if [ -n "${LOCAL_REPO_PATH:-}" ]; then
+    # Migrations come from a local checkout mounted read-only, so that locally
+    # built service images and the database schema come from the same source.
+    # Copied rather than used in place: the build writes bin/ and obj/ into the
+    # project, and the mount is read-only precisely so the caller's working tree
+    # cannot be modified.
+    #
+    # bin and obj are excluded not to save space but for correctness: they are
+    # host-architecture build output, and obj/project.assets.json embeds absolute
+    # host paths, both of which break restore inside this container.
+    echo "Copying migrations source from $LOCAL_REPO_PATH ..."
+    [ -d "$LOCAL_REPO_PATH" ] || { echo "LOCAL_REPO_PATH '$LOCAL_REPO_PATH' is not a directory."; exit 1; }
+    tar -C "$LOCAL_REPO_PATH" \
+        --exclude=bin \
+        --exclude=obj \
+        --exclude=node_modules \
+        --exclude=.git \
+        --exclude=TestResults \
+        -cf - . | tar -C /work/repo -xf -
+  else
+    echo "Cloning $GIT_REPO @ $GIT_REF ..."
+    if [ "$GIT_REF" = "latest" ]; then
+      BRANCH=$(curl -s ${GITHUB_TOKEN:+-H "Authorization: token $GITHUB_TOKEN"} \
+        "https://api.github.com/repos/$GIT_REPO/releases/latest" | jq -r .tag_name)
+      echo "Resolved latest to $BRANCH"
+    else
+      BRANCH="main"
+    fi
+    rm -rf /work/repo
+    git clone --depth 1 --branch "$BRANCH" "https://github.com/$GIT_REPO" /work/repo
+
+    # The caller may have keyed a snapshot on a specific commit; apply exactly that
+    # one even if the branch has moved on since.
+    if [ -n "${GIT_COMMIT:-}" ] && [ "$(git -C /work/repo rev-parse HEAD)" != "$GIT_COMMIT" ]; then
+      echo "Checking out $GIT_COMMIT ..."
+      git -C /work/repo fetch --depth 1 origin "$GIT_COMMIT"
+      git -C /work/repo checkout --detach FETCH_HEAD
+    fi
+  fi
+
+  cd /work/repo
+
+  # Guard against a source that does not contain what we expect, rather than
+  # letting it surface later as an opaque dotnet-ef failure.
+  if ! ls "$EF_PROJECT_PATH"/*.csproj >/dev/null 2>&1; then
+    echo "No .csproj found at '$EF_PROJECT_PATH' in the migrations source."
+    exit 1
+  fi
+
+  restore_projects
+}
+
+# Nothing below is worth doing before the database accepts connections.
+wait_for_db
+
+if [ -n "$BUNDLE_KEY" ]; then
+  BUNDLE="$BUNDLE_DIR/$BUNDLE_KEY/efbundle"
+
+  if [ ! -x "$BUNDLE" ]; then
+    # Runners for the same source on other xdist workers share the volume;
+    # one builds while the rest wait for it, then find the bundle in place.
+    exec 9>"$BUNDLE_DIR/$BUNDLE_KEY.lock"
+    flock 9
+    if [ ! -x "$BUNDLE" ]; then
+      fetch_source
+
+      case "$(uname -m)" in
+        aarch64|arm64) RUNTIME=linux-arm64 ;;
+        *) RUNTIME=linux-x64 ;;
+      esac
+
+      echo "Building migrations bundle $BUNDLE_KEY ..."
+      BUILD_DIR="$BUNDLE_DIR/.build-$BUNDLE_KEY-$$"
+      rm -rf "$BUILD_DIR"
+      mkdir -p "$BUILD_DIR"
+      dotnet ef migrations bundle \
+          --self-contained \
+          --runtime "$RUNTIME" \
+          --project "$EF_PROJECT_PATH" \
+          --startup-project "$EF_STARTUP_PATH" \
+          ${EF_CONTEXT:+--context "$EF_CONTEXT"} \
+          --output "$BUILD_DIR/efbundle"
+      # Moved into place whole, so a bundle that exists is a complete one.
+      rm -rf "$BUNDLE_DIR/$BUNDLE_KEY"
+      mv "$BUILD_DIR" "$BUNDLE_DIR/$BUNDLE_KEY"
+    fi
+    flock --unlock 9
+  fi
 
-# Guard against a source that does not contain what we expect, rather than
-# letting it surface later as an opaque dotnet-ef failure.
-if ! ls "$EF_PROJECT_PATH"/*.csproj >/dev/null 2>&1; then
-  echo "No .csproj found at '$EF_PROJECT_PATH' in the migrations source."
-  exit 1
+  echo "Applying migrations with bundle $BUNDLE_KEY ..."
+  "$BUNDLE" --connection "$DATABASE_URL"
+  echo "Migrations complete."
+  exit 0
 fi
 
-echo "Restoring projects for EF design-time..."
-dotnet restore "$EF_STARTUP_PATH" || dotnet restore "$EF_PROJECT_PATH" || true
+fetch_source
 
-echo "Waiting for DB and applying migrations (timeout: ${WAIT_FOR_DB_TIMEOUT}s)..."
+echo "Applying migrations (timeout: ${WAIT_FOR_DB_TIMEOUT}s)..."
 end=$((SECONDS + WAIT_FOR_DB_TIMEOUT))
 
 # Loop until dotnet ef database update succeeds; when it does, migrations are applied
@@ -3,6 +3,7 @@
 Endpoints:
     POST /webhook       – Accepts an adaptive card JSON payload, stores it.
     GET  /notifications – Returns all captured payloads as a JSON array.
+    DELETE /notifications – Forgets all captured payloads.
     GET  /health        – Returns 200 OK (used for readiness checks).
 """
 
@@ -48,6 +49,16 @@ class Handler(BaseHTTPRequestHandler):
             self.send_response(404)
             self.end_headers()
 
+    def do_DELETE(self) -> None:
+        if self.path == "/notifications":
+            with _lock:
+                _notifications.clear()
+            self.send_response(204)
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.end_headers()
+
     # Suppress per-request log lines
     def log_message(self, format, *args) -> None:  # noqa: A002
         pass
@@ -6,6 +6,18 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
+    # Keep one Armada stack per xdist worker for the whole session instead of one
+    # per test. Between tests the databases are truncated and re-seeded, the blob
+    # containers and the webhook receiver are emptied, and robots are started
+    # afresh. Opt-in: a test that leaves state behind outside of those can leak
+    # into the next one.
+    ARMADA_REUSE_STACK: bool = Field(default=False)
+
+    # Keep this many fully started stacks per robot profile warm on each xdist
+    # worker and lease one to every test; 0 disables the pool. Takes precedence
+    # over ARMADA_REUSE_STACK.
+    ARMADA_POOL_SIZE: int = Field(default=0)
+
     # Local Keycloak realm standing in for Azure Entra ID. See
     # custom_realms/robotics-realm.json for the clients, scopes and roles.
     KEYCLOAK_IMAGE: str = Field(default="quay.io/keycloak/keycloak:26.4")
@@ -46,6 +58,15 @@ class Settings(BaseSettings):
         default="ghcr.io/equinor/flotilla-backend:latest"
     )
     FLOTILLA_BACKEND_PORT: int = Field(default=8000)
+    # Requests the asyncio Flotilla client keeps in flight at once, across all the
+    # robots of a fleet operation.
+    FLOTILLA_API_CONCURRENCY: int = Field(default=8)
+    # Follow the updates Flotilla pushes to its frontend, so waits on mission runs
+    # and robots fetch again as soon as one is pushed. The hub is at this path.
+    FLOTILLA_SIGNALR_ENABLED: bool = Field(default=True)
+    FLOTILLA_SIGNALR_HUB_PATH: str = Field(default="hub")
+    # The reference data to seed Flotilla with; custom_seeds/flotilla.json if empty.
+    FLOTILLA_SEED_FILE: str = Field(default="")
 
     # MQTT Broker environment
     # TLS private key for the test broker; see the note on FLOTILLA_MQTT_PASSWORD.
@@ -54,6 +75,9 @@ class Settings(BaseSettings):
     FLOTILLA_BROKER_ALIAS: str = Field(default="broker")
     FLOTILLA_BROKER_IMAGE: str = Field(default="ghcr.io/equinor/flotilla-broker:latest")
     FLOTILLA_BROKER_PORT: int = Field(default=1883)
+    # Subscribe to the robots' reports from the host, so waits on the Flotilla API
+    # look again as soon as a robot reports a change rather than polling for it.
+    MQTT_OBSERVER_ENABLED: bool = Field(default=True)
 
     # PostgreSQL Flotilla Database environment
     POSTGRESQL_IMAGE: str = Field(default="postgres:16")
@@ -87,6 +111,36 @@ class Settings(BaseSettings):
     # See FLOTILLA_MIGRATIONS_SOURCE_DIR.
     SARA_MIGRATIONS_SOURCE_DIR: str = Field(default="")
 
+    # Start the databases from a committed Postgres image that is already migrated,
+    # tagged by a hash of the migration files, instead of running the migrations
+    # runner for every test. When a source only adds migrations, the new snapshot
+    # is built on top of the previous one. Falls back to migrating from scratch if
+    # the source cannot be resolved, e.g. when the GitHub API is rate limited.
+    POSTGRES_SNAPSHOTS_ENABLED: bool = Field(default=True)
+
+    # Host the Flotilla and SARA databases of every test on one Postgres server per
+    # xdist worker, each test getting clones of migrated template databases. The
+    # templates are migrated once per worker, without snapshots.
+    POSTGRES_SHARED_SERVER: bool = Field(default=False)
+
+    # Apply migrations with a self-contained `dotnet ef migrations bundle`, built once
+    # per migration source and kept in the MIGRATION_BUNDLES_VOLUME Docker volume,
+    # rather than building the project with `dotnet ef database update` every run.
+    MIGRATION_BUNDLES_ENABLED: bool = Field(default=True)
+    MIGRATION_BUNDLES_VOLUME: str = Field(default="armada-migration-bundles")
+
+    # Docker volumes that keep the migrations runner's NuGet packages and restore
+    # output across containers and runs.
+    MIGRATIONS_NUGET_VOLUME: str = Field(default="armada-nuget-packages")
+    MIGRATIONS_RESTORE_CACHE_VOLUME: str = Field(default="armada-restore-cache")
+
+    # How long after pulling an image this host trusts its copy without asking the
+    # registry whether the tag has moved.
+    IMAGE_PULL_FRESHNESS_SECONDS: int = Field(default=900)
+
+    # Optional; raises the GitHub API rate limit when resolving migration sources.
+    GITHUB_TOKEN: str = Field(default="")
+
     # Migrations runner environment
     RELATIVE_PATH_TO_DOCKERFILE: str = Field(
         default="./robotics_integration_tests/custom_images/migrations_runner/"
@@ -126,6 +180,16 @@ class Settings(BaseSettings):
         default="Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw=="
     )  # This is a default Azurite key for a development container and not a secret
 
+    # Container output: the lines kept per container, and how many per second of
+    # each container are passed on to the test log when that is enabled.
+    LOG_BUFFER_LINES: int = Field(default=10_000)
+    LOG_FORWARD_LINES_PER_SECOND: int = Field(default=200)
+    LOG_CONTAINERS_TO_CONSOLE: bool = Field(default=False)
+    # Where each test's container output is archived, and how many of the last
+    # lines of each container a failing test's report shows.
+    LOG_ARCHIVE_DIR: str = Field(default="container_logs")
+    LOG_FAILURE_TAIL_LINES: int = Field(default=100)
+
     model_config = SettingsConfigDict(
         env_prefix="",
         env_file_encoding="utf-8",
@@ -0,0 +1,72 @@
+from typing import Iterator, List
+
+import pytest
+from azure.storage.blob import BlobServiceClient
+
+from robotics_integration_tests.utilities import blob_storage
+from robotics_integration_tests.utilities.blob_storage import (
+    BlobIndex,
+    blob_service_client,
+    close_blob_service_clients,
+)
+
+
+def _connection_string(port: int) -> str:
+    return (
+        "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+        "AccountKey=a2V5;"
+        f"BlobEndpoint=http://localhost:{port}/devstoreaccount1;"
+    )
+
+
+class _Listing:
+    def __init__(self, names: List[str]) -> None:
+        self._names: List[str] = names
+
+    def list_blob_names(self) -> Iterator[str]:
+        return iter(self._names)
+
+
+def test_stopped_storage_has_its_client_and_folders_forgotten(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    stopped, running = _connection_string(10000), _connection_string(10001)
+    monkeypatch.setattr(
+        blob_storage,
+        "_container_client",
+        lambda container_name, connection_string: _Listing(
+            ["2024-10-01__HUA__Mission__run-1/image.jpg"]
+        ),
+    )
+    for connection_string in (stopped, running):
+        blob_storage.blob_index("hua", connection_string)
+    client: BlobServiceClient = blob_service_client(stopped)
+    assert blob_service_client(stopped) is client
+
+    close_blob_service_clients(stopped)
+
+    assert blob_service_client(stopped) is not client
+    assert list(blob_storage._mission_folders) == [(running, "hua", "run-1")]
+    close_blob_service_clients(stopped)
+    close_blob_service_clients(running)
+    assert blob_storage._clients == {}
+    assert blob_storage._mission_folders == {}
+
+
+def test_blobs_are_filed_by_the_mission_run_ending_their_folder() -> None:
+    index = BlobIndex(
+        [
+            "2024-10-01__HUA__Mission__run-1/a.jpg",
+            "2024-10-01__HUA__Mission__run-1/b.jpg",
+            "2024-10-01__HUA__Other__run-2/a.jpg",
+            "not-a-mission/a.jpg",
+        ]
+    )
+
+    assert len(index) == 4
+    assert index.count_for_mission("run-1") == 2
+    assert index.count_for_mission("run-3") == 0
+    assert index.folders == {
+        "run-1": "2024-10-01__HUA__Mission__run-1",
+        "run-2": "2024-10-01__HUA__Other__run-2",
+    }
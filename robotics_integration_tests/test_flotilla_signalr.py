@@ -0,0 +1,131 @@
+import json
+from types import SimpleNamespace
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+import pytest
+
+from robotics_integration_tests.utilities import flotilla_signalr
+from robotics_integration_tests.utilities.flotilla_signalr import (
+    FlotillaSignalR,
+    mission_runs_activity,
+    robots_activity,
+    status_pushed_at,
+)
+
+BACKEND_URL = "http://localhost:8000/"
+
+
+class _EventStream:
+    def __init__(self, lines: List[str]) -> None:
+        self._lines: List[str] = lines
+
+    def iter_lines(self, chunk_size=None, decode_unicode=False) -> Iterator[str]:
+        return iter(self._lines)
+
+
+@pytest.fixture
+def reported(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[Hashable, ...]]:
+    reports: List[Tuple[Hashable, ...]] = []
+    monkeypatch.setattr(
+        flotilla_signalr, "report_activity", lambda *keys: reports.append(keys)
+    )
+    return reports
+
+
+def test_messages_are_read_from_server_sent_events() -> None:
+    stream = _EventStream(
+        [
+            "data: {}\x1e",
+            "",
+            'data: {"type": 6}\x1e{"type": 1,',
+            'data:  "target": "Robot updated"}\x1e',
+            "",
+            ": a comment between events",
+            "",
+        ]
+    )
+
+    assert list(flotilla_signalr._messages(stream)) == [
+        {},
+        {"type": 6},
+        {"type": 1, "target": "Robot updated"},
+    ]
+
+
+def test_mission_run_push_is_reported_on_that_mission_run(reported) -> None:
+    subscriber = FlotillaSignalR(BACKEND_URL)
+
+    subscriber._on_invocation(
+        {
+            "type": 1,
+            "target": "Mission run updated",
+            "arguments": ["user", json.dumps({"id": "run-1", "status": "Ongoing"})],
+        }
+    )
+
+    assert reported == [(mission_runs_activity(BACKEND_URL, "run-1"),)]
+    assert mission_runs_activity(BACKEND_URL, "run-1") != mission_runs_activity(
+        BACKEND_URL
+    )
+
+
+def test_robot_push_is_reported_on_the_robots(reported) -> None:
+    subscriber = FlotillaSignalR(BACKEND_URL)
+
+    subscriber._on_invocation(
+        {"type": 1, "target": "Robot updated", "arguments": [{"id": "robot-1"}]}
+    )
+
+    assert reported == [(robots_activity("http://localhost:8000"),)]
+
+
+def test_other_pushes_are_not_reported(reported) -> None:
+    subscriber = FlotillaSignalR(BACKEND_URL)
+
+    subscriber._on_invocation(
+        {"type": 1, "target": "Alert", "arguments": [{"id": "alert-1"}]}
+    )
+    subscriber._on_invocation({"type": 1, "target": "Robot updated"})
+
+    assert reported == []
+
+
+def _mission_run_updated(status: str) -> Dict:
+    return {
+        "type": 1,
+        "target": "Mission run updated",
+        "arguments": ["user", json.dumps({"id": "run-1", "status": status})],
+    }
+
+
+def test_each_status_keeps_the_time_it_was_first_pushed(
+    monkeypatch: pytest.MonkeyPatch, reported
+) -> None:
+    subscriber = FlotillaSignalR(BACKEND_URL)
+    monkeypatch.setattr(flotilla_signalr, "time", SimpleNamespace(time=lambda: 100.0))
+    subscriber._on_invocation(_mission_run_updated("Ongoing"))
+    monkeypatch.setattr(flotilla_signalr, "time", SimpleNamespace(time=lambda: 105.0))
+    subscriber._on_invocation(_mission_run_updated("Ongoing"))
+    subscriber._on_invocation(_mission_run_updated("Successful"))
+
+    assert subscriber.status_pushed_at("run-1", "Ongoing") == 100.0
+    assert subscriber.status_pushed_at("run-1", "Successful") == 105.0
+    assert subscriber.status_pushed_at("run-1", "Failed") is None
+    assert subscriber.status_pushed_at("run-2", "Ongoing") is None
+
+    subscriber.forget_pushed_statuses()
+
+    assert subscriber.status_pushed_at("run-1", "Ongoing") is None
+
+
+def test_pushed_statuses_are_looked_up_by_backend(
+    monkeypatch: pytest.MonkeyPatch, reported
+) -> None:
+    subscriber = FlotillaSignalR(BACKEND_URL)
+    monkeypatch.setitem(
+        flotilla_signalr._subscribers, "http://localhost:8000", subscriber
+    )
+    subscriber._on_invocation(_mission_run_updated("Ongoing"))
+
+    assert status_pushed_at(BACKEND_URL, "run-1", "Ongoing") is not None
+    assert status_pushed_at("http://localhost:9000", "run-1", "Ongoing") is None
@@ -0,0 +1,132 @@
+from typing import Iterator, List
+
+import pytest
+from loguru import logger
+
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities import log_collector
+from robotics_integration_tests.utilities.log_collector import (
+    _LogCollector,
+    _Stream,
+    logged,
+)
+from robotics_integration_tests.utilities.wait_engine import wait_for
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    return bytes([kind, 0, 0, 0]) + len(payload).to_bytes(4, "big") + payload
+
+
+def _feed_in_chunks(stream: _Stream, data: bytes, size: int) -> List[str]:
+    lines: List[str] = []
+    for start in range(0, len(data), size):
+        lines += stream.feed(data[start : start + size])
+    return lines
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(log_collector, "time", clock)
+    monkeypatch.setattr(settings, "LOG_FORWARD_LINES_PER_SECOND", 3)
+    return clock
+
+
+@pytest.fixture
+def logged_messages() -> Iterator[List[str]]:
+    messages: List[str] = []
+    sink: int = logger.add(messages.append, format="{message}")
+    yield messages
+    logger.remove(sink)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 8, 9, 1000])
+def test_multiplexed_frames_are_split_into_lines_across_chunks(chunk_size) -> None:
+    data: bytes = (
+        _frame(1, b"first line\nsecond ")
+        + _frame(2, b"an error ")
+        + _frame(1, b"line\n")
+        + _frame(2, b"in two frames\n")
+        + _frame(1, b"")
+        + _frame(1, "Ω unicode\r\nlast".encode())
+    )
+    stream = _Stream("isar", "container", handle=None)
+
+    lines: List[str] = _feed_in_chunks(stream, data, chunk_size)
+
+    assert lines == [
+        "first line",
+        "second line",
+        "an error in two frames",
+        "Ω unicode",
+    ]
+    assert stream.flush() == ["last"]
+
+
+def test_a_tty_stream_is_split_into_lines_without_headers() -> None:
+    stream = _Stream("sara", "container", handle=None)
+
+    lines: List[str] = _feed_in_chunks(stream, b"Starting\nListening on 8100\n", 5)
+
+    assert lines == ["Starting", "Listening on 8100"]
+    assert stream.flush() == []
+
+
+def test_output_too_short_to_tell_is_flushed_as_a_line() -> None:
+    stream = _Stream("sara", "container", handle=None)
+
+    assert stream.feed(b"ok") == []
+    assert stream.flush() == ["ok"]
+
+
+def test_forwarding_is_limited_to_the_rate_per_second(clock: _Clock) -> None:
+    stream = _Stream("flotilla", "container", handle=None)
+
+    assert [stream.may_forward() for _ in range(5)] == [True] * 3 + [False] * 2
+    clock.now += 0.5
+    assert [stream.may_forward() for _ in range(3)] == [True, False, False]
+    clock.now += 10
+    # The bucket holds at most a second's worth.
+    assert [stream.may_forward() for _ in range(4)] == [True] * 3 + [False]
+
+
+def test_lines_over_the_rate_are_counted_then_reported(
+    clock: _Clock, logged_messages: List[str]
+) -> None:
+    collector = _LogCollector()
+    stream = _Stream("flotilla", "container", handle=None)
+
+    for number in range(5):
+        collector._to_console(stream, f"line {number}")
+    clock.now += 1
+    collector._to_console(stream, "line 5")
+
+    assert [message.strip() for message in logged_messages] == [
+        "flotilla: line 0",
+        "flotilla: line 1",
+        "flotilla: line 2",
+        "flotilla: [2 lines not logged, over the rate limit]",
+        "flotilla: line 5",
+    ]
+
+
+def test_a_logged_expectation_stops_watching_when_the_wait_ends(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    stream = _Stream("sara", "container", handle=None)
+    monkeypatch.setitem(log_collector._collector._streams, "container", stream)
+    never = logged("sara", "container", "never printed")
+    assert len(stream.watches) == 1
+
+    with pytest.raises(TimeoutError):
+        wait_for([never], timeout=0.1)
+
+    assert stream.watches == []
@@ -0,0 +1,133 @@
+from typing import List, Tuple
+
+import pytest
+
+from robotics_integration_tests.utilities import log_events
+from robotics_integration_tests.utilities.log_events import (
+    FLOTILLA,
+    ISAR,
+    SARA,
+    LogEvent,
+    _EventTable,
+    latency,
+)
+
+MISSION_RUN_ID = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+ISAR_MISSION_ID = "01J9ZK4Q7F3M2X8W5T6R1B0C9D"
+
+
+def _events(service: str, lines: List[str]) -> List[Tuple]:
+    table = _EventTable()
+    table.parse(service, "container", 0.0, lines)
+    return [(event.kind, event.key, event.fields) for event in table.select()]
+
+
+@pytest.fixture
+def table(monkeypatch: pytest.MonkeyPatch) -> _EventTable:
+    table = _EventTable()
+    monkeypatch.setattr(log_events, "_table", table)
+    return table
+
+
+def test_isar_events() -> None:
+    assert _events(
+        ISAR,
+        [
+            f"2024-10-01 12:00:00 INFO state_machine Initialization successful. "
+            f"Starting new mission: {ISAR_MISSION_ID}",
+            "2024-10-01 12:00:05 INFO state_machine TakeImage task: 01J9ZK4R was "
+            "reported as partially_successful",
+            "2024-10-01 12:00:06 INFO state_machine TakeImage task: 01J9ZK4S was "
+            "reported as in_progress",
+            "2024-10-01 12:00:07 INFO uploader Storage successfully uploaded "
+            "inspection - 01J9ZK4T",
+            "2024-10-01 12:00:07 WARNING uploader Failed to upload inspection - "
+            "01J9ZK4T",
+            f"2024-10-01 12:00:09 INFO state_machine Mission {ISAR_MISSION_ID} "
+            "finished with status: successful",
+        ],
+    ) == [
+        ("mission_started", ISAR_MISSION_ID, {}),
+        ("task_finished", "01J9ZK4R", {"status": "partially_successful"}),
+        ("inspection_uploaded", "01J9ZK4T", {}),
+        ("mission_finished", ISAR_MISSION_ID, {"status": "successful"}),
+    ]
+
+
+def test_flotilla_events() -> None:
+    assert _events(
+        FLOTILLA,
+        [
+            "info: Microsoft.AspNetCore.Hosting.Diagnostics[2]",
+            "      Request finished HTTP/1.1 POST "
+            "http://flotilla_backend:8000/missions/schedule - 201 null "
+            "application/json; charset=utf-8 48.2913ms",
+            "dbug: Api.Mqtt.MqttService[0]",
+            "      Topic: isar/Robot/mission - Message received: ",
+            "info: Api.EventHandlers.MqttEventHandler[0]",
+            f"      Mission '{MISSION_RUN_ID}' (ISARMissionID='{ISAR_MISSION_ID}') "
+            "status updated to 'Ongoing' for robot 'Robot'",
+            "      Robot 'Robot' status updated to 'Busy'",
+        ],
+    ) == [
+        (
+            "http_request",
+            "http://flotilla_backend:8000/missions/schedule",
+            {"method": "POST", "status": "201", "milliseconds": "48.2913"},
+        ),
+        ("mqtt_message", "isar/Robot/mission", {}),
+        ("mission_run_updated", MISSION_RUN_ID, {"status": "Ongoing"}),
+    ]
+
+
+def test_sara_events() -> None:
+    assert _events(
+        SARA,
+        [
+            "      Request finished HTTP/1.1 GET http://sara:8100/health - 200 - "
+            "text/plain 0.8123ms",
+            "      Message received on topic isar/Robot/inspection_result",
+            "      Received ISAR inspection result for inspection 01J9ZK4T",
+            "      Failed to trigger workflow anonymizer",
+            "      Triggered workflow constant-level-oiler",
+        ],
+    ) == [
+        (
+            "http_request",
+            "http://sara:8100/health",
+            {"method": "GET", "status": "200", "milliseconds": "0.8123"},
+        ),
+        ("mqtt_message", "isar/Robot/inspection_result", {}),
+        ("inspection_received", "01J9ZK4T", {}),
+        ("workflow_failed", "anonymizer", {}),
+        ("workflow_triggered", "constant-level-oiler", {}),
+    ]
+
+
+def test_lines_of_other_services_or_without_events_are_ignored() -> None:
+    assert _events(SARA, ["Starting new mission: 01J9ZK4Q"]) == []
+    assert _events("keycloak", ["Request finished HTTP/1.1 GET / - 200 - 1ms"]) == []
+    assert _events(ISAR, ["Starting new mission: pending", ""]) == []
+
+
+def test_shortened_ids_select_their_events(table: _EventTable) -> None:
+    table.parse(ISAR, "isar", 1.0, [f"Mission {ISAR_MISSION_ID} finished"])
+
+    found: List[LogEvent] = log_events.log_events(key="01j9zk4q")
+
+    assert [event.kind for event in found] == ["mission_finished"]
+    assert log_events.log_events(key="01J9ZK4R") == []
+
+
+def test_latency_is_from_the_first_event_to_the_first_after_it(
+    table: _EventTable,
+) -> None:
+    table.parse(SARA, "sara", 1.0, ["Received inspection 01J9ZK40"])
+    table.parse(ISAR, "isar", 2.0, ["Image task: 01J9ZK41 was reported as failed"])
+    table.parse(ISAR, "isar", 3.0, ["Image task: 01J9ZK42 was reported as failed"])
+    assert latency("task_finished", "inspection_received") is None
+
+    table.parse(SARA, "sara", 4.5, ["Received inspection 01J9ZK41"])
+
+    assert latency("task_finished", "inspection_received") == 2.5
+    assert latency("task_finished", "inspection_received", from_key="01J9ZK42") == 1.5
@@ -0,0 +1,70 @@
+from typing import Hashable, List, Tuple
+
+import paho.mqtt.client as mqtt
+import pytest
+
+from robotics_integration_tests.utilities import mqtt_observer
+from robotics_integration_tests.utilities.flotilla_signalr import (
+    mission_runs_activity,
+    robots_activity,
+)
+from robotics_integration_tests.utilities.mqtt_observer import MqttObserver
+
+BACKEND_URL = "http://localhost:8000"
+
+
+def _message(topic: str, payload: bytes = b"{}") -> mqtt.MQTTMessage:
+    message = mqtt.MQTTMessage(topic=topic.encode())
+    message.payload = payload
+    return message
+
+
+@pytest.fixture
+def reported(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[Hashable, ...]]:
+    reports: List[Tuple[Hashable, ...]] = []
+    monkeypatch.setattr(
+        mqtt_observer, "report_activity", lambda *keys: reports.append(keys)
+    )
+    return reports
+
+
+@pytest.fixture
+def observer() -> MqttObserver:
+    observer = MqttObserver("localhost", 1883, "observer", "password")
+    observer.report("status", robots_activity(BACKEND_URL))
+    for topic in ("mission", "task"):
+        observer.report(topic, mission_runs_activity(BACKEND_URL))
+    return observer
+
+
+def test_messages_are_reported_on_the_activity_of_their_topic(
+    observer: MqttObserver, reported
+) -> None:
+    observer._on_message(None, None, _message("isar/robot-1/status"))
+    observer._on_message(None, None, _message("isar/robot-2/task", b"not json"))
+
+    assert reported == [
+        (robots_activity(BACKEND_URL),),
+        (mission_runs_activity(BACKEND_URL),),
+    ]
+
+
+def test_a_topic_reported_on_twice_is_reported_on_both(
+    observer: MqttObserver, reported
+) -> None:
+    observer.report("status", "other backend's robots")
+
+    observer._on_message(None, None, _message("isar/robot-1/status"))
+
+    assert reported == [(robots_activity(BACKEND_URL), "other backend's robots")]
+
+
+def test_messages_on_topics_without_activity_are_not_reported(
+    observer: MqttObserver, reported
+) -> None:
+    observer._on_message(None, None, _message("isar/robot-1/inspection_result"))
+    MqttObserver("localhost", 1883, "observer", "password")._on_message(
+        None, None, _message("isar/robot-1/status")
+    )
+
+    assert reported == []
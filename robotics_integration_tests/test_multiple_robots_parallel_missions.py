@@ -1,4 +1,5 @@
-from typing import Dict
+import asyncio
+from typing import Dict, List
 
 from loguru import logger
 
@@ -8,18 +9,27 @@ from robotics_integration_tests.utilities.authentication_assertions import (
     assert_cannot_interfere_with_running_mission,
 )
 from robotics_integration_tests.utilities.teams_notifications import (
-    wait_for_all_teams_notifications,
+    no_teams_notification,
+    teams_notification_received,
 )
 from robotics_integration_tests.settings.settings import settings
 from robotics_integration_tests.utilities.blob_storage import (
-    wait_for_all_mission_blobs,
+    mission_has_blobs,
+    mission_has_no_blobs,
+)
+from robotics_integration_tests.utilities.flotilla_async_api import (
+    AsyncFlotillaClient,
 )
 from robotics_integration_tests.utilities.flotilla_backend_api import (
-    create_mission,
     get_dummy_mission_payload_with_installation,
-    schedule_mission,
-    wait_for_all_mission_run_statuses,
-    wait_for_all_robot_statuses,
+    mission_run_has_status,
+    mission_runs_source,
+    robot_has_status,
+)
+from robotics_integration_tests.utilities.wait_engine import (
+    Expectation,
+    Source,
+    wait_for,
 )
 
 
@@ -68,22 +78,24 @@ def test_multiple_robots_with_different_outcomes(
         settings.SARA_RAW_STORAGE_CONTAINER
     ).host_connection_string
 
-    # Schedule all missions — they execute in parallel on the robots.
+    # Schedule all missions at once — they execute in parallel on the robots.
+    flotilla = AsyncFlotillaClient(backend_url)
+    mission_runs_by_robot_id: Dict[str, Dict] = asyncio.run(
+        flotilla.schedule_missions(
+            {
+                armada.robots[robot_name].robot_id: get_dummy_mission_payload_with_installation(
+                    armada.robots[robot_name].installation_code
+                )
+                for robot_name in robot_expectations
+            }
+        )
+    )
     mission_runs: Dict[str, Dict] = {}
     for robot_name in robot_expectations:
         robot: IsarRobot = armada.robots[robot_name]
-        mission_payload: Dict = get_dummy_mission_payload_with_installation(robot.installation_code)
-        mission: Dict = create_mission(backend_url=backend_url, payload=mission_payload)
-        mission_run: Dict = schedule_mission(
-            backend_url=backend_url,
-            robot_id=robot.robot_id,
-            mission_id=mission["id"],
-        )
+        mission_run: Dict = mission_runs_by_robot_id[robot.robot_id]
         mission_runs[robot_name] = mission_run
-        logger.info(
-            f"Scheduled mission {mission['id']} with id {mission_run['id']} "
-            f"on robot {robot_name}"
-        )
+        logger.info(f"Scheduled mission run {mission_run['id']} on robot {robot_name}")
 
     # With four missions in flight. The status assertions below prove the
     # unauthorised calls had no effect.
@@ -91,47 +103,53 @@ def test_multiple_robots_with_different_outcomes(
         armada=armada, robot=armada.robots["MissionOkThenHome"]
     )
 
-    wait_for_all_mission_run_statuses(
-        backend_url=backend_url,
-        mission_run_expectations={
-            mission_runs[name]["id"]: exp["mission_status"]
-            for name, exp in robot_expectations.items()
-        },
-    )
+    receiver = armada.teams_webhook_receiver
+    assert receiver is not None, "Teams webhook receiver was not started"
 
-    # All robots share the same installation and blob container. The blob
-    # folder path contains the mission run ID, so we can verify per-robot
-    # blob counts: successful missions should have blobs, failed ones should not.
+    # Wait for every outcome at once. All robots share the same installation and
+    # blob container. The blob folder path contains the mission run ID, so we can
+    # verify per-robot blob counts: successful missions should have blobs, failed
+    # ones should not. A robot's status and notification only count once its
+    # mission run has finished, since the robots start at home.
     blob_container_name: str = next(
         iter(armada.robots.values())
     ).installation_code.lower()
 
-    wait_for_all_mission_blobs(
-        container_name=blob_container_name,
-        connection_string=raw_storage_conn,
-        mission_blob_expectations={
-            mission_runs[name]["id"]: len(mission_runs[name].get("tasks", []))
-            if exp["expect_blobs"]
-            else 0
-            for name, exp in robot_expectations.items()
-        },
+    # One source for all the runs, so each tick fetches them together.
+    runs: Source = mission_runs_source(
+        backend_url, [mission_run["id"] for mission_run in mission_runs.values()]
     )
+    expectations: List[Expectation] = []
+    for name, exp in robot_expectations.items():
+        mission_run_id: str = mission_runs[name]["id"]
+        mission_finished: Expectation = mission_run_has_status(
+            backend_url, mission_run_id, exp["mission_status"], source=runs
+        )
+        robot_settled: Expectation = robot_has_status(
+            backend_url, name, exp["robot_status"], after=mission_finished
+        )
+        expectations += [mission_finished, robot_settled]
 
-    _ = wait_for_all_robot_statuses(
-        backend_url=backend_url,
-        robot_status_expectations={
-            name: exp["robot_status"]
-            for name, exp in robot_expectations.items()
-        },
-    )
+        if exp["expect_blobs"]:
+            expectations.append(
+                mission_has_blobs(
+                    blob_container_name,
+                    raw_storage_conn,
+                    mission_run_id,
+                    len(mission_runs[name].get("tasks", [])),
+                    after=mission_finished,
+                )
+            )
+        else:
+            expectations.append(
+                mission_has_no_blobs(blob_container_name, raw_storage_conn, mission_run_id)
+            )
 
-    receiver = armada.teams_webhook_receiver
-    assert receiver is not None, "Teams webhook receiver was not started"
+        if exp["robot_status"] == "InterventionNeeded":
+            expectations.append(
+                teams_notification_received(receiver, name, after=robot_settled)
+            )
+        else:
+            expectations.append(no_teams_notification(receiver, name))
 
-    wait_for_all_teams_notifications(
-        receiver=receiver,
-        notification_expectations={
-            name: exp["robot_status"] == "InterventionNeeded"
-            for name, exp in robot_expectations.items()
-        },
-    )
+    wait_for(expectations, timeout=120)
@@ -0,0 +1,111 @@
+import csv
+import random
+from pathlib import Path
+from typing import Any, Dict, List
+
+from robotics_integration_tests.custom_containers.flotilla_backend import (
+    FlotillaBackend,
+)
+from robotics_integration_tests.custom_containers.postgres import FlotillaDatabase
+from robotics_integration_tests.custom_containers.postgres_datasets import (
+    _DRAWS,
+    _ENUMS,
+    _Column,
+    _Generator,
+    _Table,
+    flotilla_dataset,
+    load_flotilla_dataset,
+)
+from robotics_integration_tests.utilities.backend_client import BackendClient
+from robotics_integration_tests.utilities.flotilla_backend_api import flotilla_client
+from robotics_integration_tests.utilities.flotilla_seed import (
+    FlotillaSeed,
+    load_flotilla_seed,
+)
+
+
+def _column(name: str, data_type: str, **description: Any) -> _Column:
+    return _Column(
+        {
+            "column_name": name,
+            "data_type": data_type,
+            "max_length": None,
+            "nullable": False,
+            "has_default": False,
+            "primary_key": False,
+            "references": None,
+            **description,
+        }
+    )
+
+
+def _generate(table: _Table, count: int, path: Path) -> List[Dict[str, str]]:
+    _Generator({table.name: table}, random.Random(0)).write(table, count, path)
+    with path.open(newline="", encoding="utf-8") as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def test_drawn_enum_members_are_members() -> None:
+    for column, drawn in _DRAWS.items():
+        assert set(drawn) <= set(_ENUMS[column]), column
+
+
+def test_enum_columns_get_members_by_name_or_number(tmp_path: Path) -> None:
+    table = _Table(
+        "MissionRuns",
+        [
+            _column("Id", "text", primary_key=True),
+            _column("Status", "integer"),
+        ],
+    )
+    statuses = {int(row["Status"]) for row in _generate(table, 200, tmp_path / "a")}
+    assert statuses == {
+        _ENUMS[("MissionRuns", "Status")].index(member)
+        for member in _DRAWS[("MissionRuns", "Status")]
+    }
+
+    table = _Table(
+        "MissionTasks",
+        [
+            _column("Id", "text", primary_key=True),
+            _column("Status", "text"),
+            _column("Type", "text"),
+            _column("Description", "text"),
+        ],
+    )
+    rows = _generate(table, 200, tmp_path / "b")
+    assert {row["Status"] for row in rows} == set(_DRAWS[("MissionTasks", "Status")])
+    assert {row["Type"] for row in rows} == {"Inspection"}
+    assert rows[1]["Description"] == "Description-1"
+
+
+def test_flotilla_serves_a_loaded_dataset(
+    flotilla_database: FlotillaDatabase, flotilla_backend: FlotillaBackend
+) -> None:
+    counts: Dict[str, int] = load_flotilla_dataset(
+        flotilla_database,
+        flotilla_dataset(
+            installations=4,
+            inspection_areas_per_installation=2,
+            robots=3,
+            mission_runs=30,
+            tasks_per_mission_run=2,
+        ),
+    )
+    client: BackendClient = flotilla_client(flotilla_backend.backend_url)
+    seed: FlotillaSeed = load_flotilla_seed()
+
+    # Each listing is answered, with the seeded entries and the loaded rows.
+    expected: Dict[str, int] = {
+        "installations": counts["Installations"] + seed.count("installations"),
+        "plants": counts["Plants"] + seed.count("plants"),
+        "inspectionAreas": counts["InspectionAreas"] + seed.count("inspectionAreas"),
+        "robots": counts["Robots"],
+        "missions/runs?PageSize=100": counts["MissionRuns"],
+    }
+    listed: Dict[str, List[Dict]] = {path: client.get(path) for path in expected}
+    assert {path: len(entries) for path, entries in listed.items()} == expected
+
+    mission_run_id: str = listed["missions/runs?PageSize=100"][0]["id"]
+    mission_run: Dict = client.get(f"missions/runs/{mission_run_id}")
+    assert len(mission_run["tasks"]) == 2
@@ -1,20 +1,20 @@
-from typing import Dict
+from typing import Dict, Optional
 
 from loguru import logger
 
 from robotics_integration_tests.armada import Armada
 from robotics_integration_tests.settings.settings import settings
-from robotics_integration_tests.utilities.blob_storage import (
-    wait_until_all_expected_files_uploaded,
-)
+from robotics_integration_tests.utilities.blob_storage import container_has_files
 from robotics_integration_tests.utilities.flotilla_backend_api import (
     create_mission,
     get_dummy_mission_payload_with_installation,
+    mission_run_has_status,
+    robot_has_status,
     schedule_mission,
-    wait_for_mission_run_status,
-    wait_for_robot_status,
 )
-from robotics_integration_tests.utilities.sara_backend_api import wait_for_sara_logs
+from robotics_integration_tests.utilities.log_events import latency
+from robotics_integration_tests.utilities.sara_backend_api import sara_log_contains
+from robotics_integration_tests.utilities.wait_engine import Expectation, wait_for
 
 
 def test_simple_mission_with_three_tags_is_successful(
@@ -36,27 +36,34 @@ def test_simple_mission_with_three_tags_is_successful(
         f"on robot {robot_name}"
         )
 
-    _ = wait_for_mission_run_status(
-        backend_url=armada.flotilla_backend.backend_url,
-        mission_run_id=mission_run_id,
-        expected_status="Successful",
+    mission_successful: Expectation = mission_run_has_status(
+        armada.flotilla_backend.backend_url, mission_run_id, "Successful"
     )
-
-    wait_until_all_expected_files_uploaded(
-        container_name=robot.installation_code.lower(),
-        connection_string=armada.armada_storage.azurite_containers.get(
-            settings.SARA_RAW_STORAGE_CONTAINER
-        ).host_connection_string,
-        expected_file_count=len(mission_run.get("tasks")),
-    )
-
-    _ = wait_for_robot_status(
-        backend_url=armada.flotilla_backend.backend_url,
-        robot_name=robot_name,
-        expected_status="Home",
-    )
-
-    wait_for_sara_logs(
-        container=armada.sara.container,
-        log_message="Failed to trigger workflow anonymizer",
+    wait_for(
+        [
+            mission_successful,
+            container_has_files(
+                robot.installation_code.lower(),
+                armada.armada_storage.azurite_containers.get(
+                    settings.SARA_RAW_STORAGE_CONTAINER
+                ).host_connection_string,
+                len(mission_run.get("tasks")),
+            ),
+            robot_has_status(
+                armada.flotilla_backend.backend_url,
+                robot_name,
+                "Home",
+                after=mission_successful,
+            ),
+            sara_log_contains(
+                armada.sara.container, "Failed to trigger workflow anonymizer"
+            ),
+        ],
+        timeout=120,
     )
+    # Only a measurement: the first task of any robot to the next inspection.
+    seconds: Optional[float] = latency("task_finished", "inspection_received")
+    if seconds is not None:
+        logger.info(
+            f"SARA received an inspection {seconds:.2f}s after ISAR finished a task"
+        )
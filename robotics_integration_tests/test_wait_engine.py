@@ -0,0 +1,215 @@
+import threading
+import time
+from typing import Any, Callable, List
+
+import pytest
+
+from robotics_integration_tests.utilities import wait_engine
+from robotics_integration_tests.utilities.wait_engine import (
+    Expectation,
+    Source,
+    report_activity,
+    wait_for,
+)
+
+
+class _Counter:
+    """A source value that counts how often it was fetched."""
+
+    def __init__(self, value: Callable[[int], Any] = lambda fetches: fetches) -> None:
+        self.fetches: int = 0
+        self._value: Callable[[int], Any] = value
+
+    def __call__(self) -> Any:
+        self.fetches += 1
+        return self._value(self.fetches)
+
+
+@pytest.fixture
+def fast_ticks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(wait_engine, "_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(wait_engine, "_MAX_INTERVAL", 0.02)
+
+
+@pytest.fixture
+def slow_ticks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Ticks far apart, so that only a report of activity makes one come soon."""
+    monkeypatch.setattr(wait_engine, "_MIN_INTERVAL", 10.0)
+    monkeypatch.setattr(wait_engine, "_MAX_INTERVAL", 10.0)
+
+
+def _later(delay: float, action: Callable[[], None]) -> threading.Thread:
+    def run() -> None:
+        time.sleep(delay)
+        action()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_interval_backs_off_and_resets_on_progress() -> None:
+    interval = wait_engine._Interval()
+
+    assert [interval.next() for _ in range(6)] == [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+    interval.reset()
+    assert interval.next() == 0.1
+
+
+def test_sources_are_fetched_once_per_tick(fast_ticks) -> None:
+    counter = _Counter()
+    source = Source("counter", counter, "counter")
+
+    met = wait_for(
+        [
+            Expectation("at least 2", source, lambda n: n >= 2),
+            Expectation(
+                "at least 3", Source("counter", counter, "same"), lambda n: n >= 3
+            ),
+        ],
+        timeout=5,
+    )
+
+    assert counter.fetches == 3
+    assert list(met.values()) == [2, 3]
+
+
+def test_activity_wakes_the_waits_on_its_sources(slow_ticks) -> None:
+    ready = threading.Event()
+    source = Source("ready", ready.is_set, "ready", activity=["ready changed"])
+
+    def change() -> None:
+        ready.set()
+        report_activity("ready changed")
+
+    _later(0.2, change)
+    started: float = time.monotonic()
+    wait_for([Expectation("ready", source, bool)], timeout=5)
+
+    assert time.monotonic() - started < 2
+
+
+def test_activity_on_other_keys_does_not_wake_a_wait(slow_ticks) -> None:
+    counter = _Counter(lambda fetches: False)
+    source = Source("counter", counter, "counter", activity=["mine"])
+    _later(0.2, lambda: report_activity("someone else's"))
+
+    started: float = time.monotonic()
+    with pytest.raises(TimeoutError):
+        wait_for([Expectation("never", source, bool)], timeout=0.5)
+
+    # The first tick, and the one at the timeout; none in between.
+    assert counter.fetches == 2
+    assert time.monotonic() - started < 2
+
+
+def test_after_is_only_evaluated_once_its_expectation_is_met(fast_ticks) -> None:
+    first = _Counter()
+    second = _Counter()
+    first_met = Expectation("first", Source("first", first, "first"), lambda n: n >= 3)
+    second_met = Expectation(
+        "second", Source("second", second, "second"), bool, after=first_met
+    )
+
+    # Only second_met is passed; what it waits for is waited for too.
+    met = wait_for([second_met], timeout=5)
+
+    assert first.fetches == 3
+    assert second.fetches == 1
+    assert met == {first_met: 3, second_met: 1}
+
+
+def test_final_is_checked_once_after_the_others(fast_ticks) -> None:
+    waited = _Counter()
+    final = _Counter(lambda fetches: "nothing sent")
+    nothing_sent = Expectation(
+        "nothing sent",
+        Source("final", final, "final"),
+        lambda value: value == "nothing sent",
+        final=True,
+    )
+
+    wait_for(
+        [
+            Expectation("third", Source("waited", waited, "waited"), lambda n: n >= 3),
+            nothing_sent,
+        ],
+        timeout=5,
+    )
+
+    assert waited.fetches == 3
+    assert final.fetches == 1
+
+
+def test_final_that_does_not_hold_fails_the_wait(fast_ticks) -> None:
+    something_sent = Expectation(
+        "nothing sent",
+        Source("final", lambda: "a message", "final"),
+        lambda value: value is None,
+        final=True,
+    )
+
+    with pytest.raises(
+        AssertionError, match="nothing sent does not hold, found: a message"
+    ):
+        wait_for([something_sent], timeout=5)
+
+
+def test_timeout_lists_what_is_unmet_and_last_seen(fast_ticks) -> None:
+    status = Source("status", lambda: "Ongoing", "status")
+
+    with pytest.raises(TimeoutError) as raised:
+        wait_for(
+            [
+                Expectation("status is Ongoing", status, lambda s: s == "Ongoing"),
+                Expectation(
+                    "status is Successful", status, lambda s: s == "Successful"
+                ),
+            ],
+            timeout=0.1,
+        )
+
+    assert "status is Successful (last seen: Ongoing)" in str(raised.value)
+    assert "status is Ongoing" not in str(raised.value)
+
+
+def test_failing_fetch_is_retried(fast_ticks) -> None:
+    def flaky(fetches: int) -> int:
+        if fetches < 3:
+            raise ConnectionError("not yet")
+        return fetches
+
+    counter = _Counter(flaky)
+
+    met = wait_for(
+        [Expectation("fetched", Source("flaky", counter, "flaky"), bool)], timeout=5
+    )
+
+    assert list(met.values()) == [3]
+
+
+def test_sources_are_closed_once_no_expectation_needs_them(fast_ticks) -> None:
+    closed: List[str] = []
+    early = Source("early", lambda: True, "early", close=lambda: closed.append("early"))
+    late = Source("late", _Counter(), "late", close=lambda: closed.append("late"))
+
+    wait_for(
+        [
+            Expectation("early", early, bool),
+            Expectation("late", late, lambda n: n >= 3),
+            Expectation("late again", late, lambda n: n >= 2),
+        ],
+        timeout=5,
+    )
+
+    assert closed == ["early", "late"]
+
+
+def test_sources_are_closed_when_the_wait_fails(fast_ticks) -> None:
+    closed: List[str] = []
+    never = Source("never", lambda: False, "never", close=lambda: closed.append("x"))
+
+    with pytest.raises(TimeoutError):
+        wait_for([Expectation("never", never, bool)], timeout=0.1)
+
+    assert closed == ["x"]
@@ -3,11 +3,22 @@
 Unlike Entra, Keycloak does not derive ``aud`` from the requested scope: each API
 has a client scope carrying a single audience mapper. Request exactly one per
 token -- two make Keycloak emit ``aud`` as an array, which ISAR rejects.
+
+Tokens are cached per issuer, keyed by client and scope, until shortly before
+they expire. Every client and scope the helpers use is fetched in the background
+as soon as the issuer is configured, so the wait loops find a token ready
+rather than making a round trip to Keycloak before every poll.
 """
 
-from typing import Optional
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
 
 import requests
+from loguru import logger
 
 from robotics_integration_tests.custom_containers.keycloak import (
     INTEGRATION_TESTS_CLIENT,
@@ -15,35 +26,129 @@ from robotics_integration_tests.custom_containers.keycloak import (
     LIMITED_ROLE_CLIENT,
     LIMITED_ROLE_SECRET,
 )
-
-# Set by the `keycloak` fixture. A global because the API helpers build their auth
-# headers from plain module functions with no access to fixtures; each xdist worker
-# is a separate process with its own container.
-_issuer_url: Optional[str] = None
+from robotics_integration_tests.settings.settings import settings
+
+# Refresh a cached token this long before Keycloak says it expires, so that it
+# does not lapse between leaving the cache and reaching the service.
+_EXPIRY_MARGIN_SECONDS = 30
+
+_CLIENT_SECRETS: Dict[str, str] = {
+    INTEGRATION_TESTS_CLIENT: INTEGRATION_TESTS_SECRET,
+    LIMITED_ROLE_CLIENT: LIMITED_ROLE_SECRET,
+}
+
+
+def _prefetched_tokens() -> Tuple[Tuple[str, str], ...]:
+    scopes = (settings.FLOTILLA_SCOPE, settings.SARA_SCOPE, settings.ISAR_SCOPE)
+    return tuple((client_id, scope) for client_id in _CLIENT_SECRETS for scope in scopes)
+
+
+class _Issuer:
+    def __init__(self) -> None:
+        self.url: Optional[str] = None
+        self._lock: threading.Lock = threading.Lock()
+        # (client_id, scope) -> (access token, monotonic expiry). A Future, so
+        # that concurrent callers wait for a single request instead of each
+        # making their own.
+        self._tokens: Dict[Tuple[str, str], Future] = {}
+
+    def configure(self, url: Optional[str]) -> None:
+        with self._lock:
+            self.url = url
+            self._tokens.clear()
+        if url is None:
+            return
+        for client_id, scope in _prefetched_tokens():
+            threading.Thread(
+                target=self._prefetch,
+                args=(client_id, scope),
+                name="token-prefetch",
+                daemon=True,
+            ).start()
+
+    def token(self, scope: str, client_id: str) -> str:
+        key: Tuple[str, str] = (client_id, scope)
+        with self._lock:
+            url: str = _require_issuer_url(self.url)
+            future: Optional[Future] = self._tokens.get(key)
+            fetch: bool = future is None or not _is_usable(future)
+            if fetch:
+                future = self._tokens[key] = Future()
+
+        if fetch:
+            try:
+                future.set_result(
+                    _request_token(url, scope, client_id, _CLIENT_SECRETS[client_id])
+                )
+            except BaseException as e:
+                future.set_exception(e)
+        return future.result()[0]
+
+    def _prefetch(self, client_id: str, scope: str) -> None:
+        try:
+            self.token(scope=scope, client_id=client_id)
+        except Exception as e:
+            # The first caller that needs this token retries and reports it.
+            logger.debug(f"Prefetching a token for {client_id} ({scope}) failed: {e}")
+
+
+# Set by the `keycloak` fixture. Module state because the API helpers build their
+# auth headers from plain module functions with no access to fixtures; each
+# xdist worker is a separate process with its own container. A stack built
+# alongside the test's own, as the stack pool does, gets an issuer of its own
+# through separate_issuer().
+_process_issuer: _Issuer = _Issuer()
+_issuer: ContextVar[_Issuer] = ContextVar("issuer", default=_process_issuer)
 
 
 def configure_issuer(host_url: str) -> None:
-    global _issuer_url
-    _issuer_url = host_url
+    _issuer.get().configure(host_url)
 
 
 def reset_issuer() -> None:
-    global _issuer_url
-    _issuer_url = None
+    _issuer.get().configure(None)
+
+
+@contextmanager
+def separate_issuer() -> Iterator[None]:
+    """Give the current context an issuer of its own.
+
+    Shared with every thread that runs a copy of this context, as the
+    StackLauncher's do, so a stack's components all see the issuer its
+    `keycloak` component configures.
+    """
+    token = _issuer.set(_Issuer())
+    try:
+        yield
+    finally:
+        _issuer.reset(token)
 
 
-def _require_issuer_url() -> str:
-    if _issuer_url is None:
+def _require_issuer_url(url: Optional[str]) -> str:
+    if url is None:
         raise RuntimeError(
             "The issuer has not been configured. Depend on the `keycloak` "
             "fixture, which calls configure_issuer()."
         )
-    return _issuer_url
+    return url
 
 
-def _request_token(scope: str, client_id: str, client_secret: str) -> str:
+def _is_usable(future: Future) -> bool:
+    """Whether a cached token can be handed out: in flight, or valid for a while."""
+    if not future.done():
+        return True
+    if future.exception() is not None:
+        return False
+    _, expires_at = future.result()
+    return time.monotonic() < expires_at
+
+
+def _request_token(
+    url: str, scope: str, client_id: str, client_secret: str
+) -> Tuple[str, float]:
+    requested_at: float = time.monotonic()
     response = requests.post(
-        f"{_require_issuer_url()}/protocol/openid-connect/token",
+        f"{url}/protocol/openid-connect/token",
         data={
             "grant_type": "client_credentials",
             "scope": scope,
@@ -56,15 +161,14 @@ def _request_token(scope: str, client_id: str, client_secret: str) -> str:
     result = response.json()
     if "access_token" not in result:
         raise RuntimeError(f"Unable to retrieve access token for {scope}: {result}")
-    return result["access_token"]
+    expires_at: float = (
+        requested_at + result.get("expires_in", 0) - _EXPIRY_MARGIN_SECONDS
+    )
+    return result["access_token"], expires_at
 
 
 def retrieve_access_token_for_integration_tests_app(scope: str) -> str:
-    return _request_token(
-        scope=scope,
-        client_id=INTEGRATION_TESTS_CLIENT,
-        client_secret=INTEGRATION_TESTS_SECRET,
-    )
+    return _issuer.get().token(scope=scope, client_id=INTEGRATION_TESTS_CLIENT)
 
 
 def retrieve_access_token_with_insufficient_role(scope: str) -> str:
@@ -73,8 +177,4 @@ def retrieve_access_token_with_insufficient_role(scope: str) -> str:
     Flotilla recognises the principal and refuses it with 403; ISAR refuses it for
     lacking Mission.Control.
     """
-    return _request_token(
-        scope=scope,
-        client_id=LIMITED_ROLE_CLIENT,
-        client_secret=LIMITED_ROLE_SECRET,
-    )
+    return _issuer.get().token(scope=scope, client_id=LIMITED_ROLE_CLIENT)
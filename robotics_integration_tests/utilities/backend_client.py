@@ -0,0 +1,146 @@
+"""Keep-alive HTTP clients for the Flotilla and SARA APIs.
+
+The wait loops issue a request every second or so for the whole run, and a bare
+requests.get() opens a new connection each time. A client holds one pooled
+session per backend URL instead, with the retry policy, timeouts and error
+reporting shared by every helper in flotilla_backend_api.py and
+sara_backend_api.py.
+
+Tokens are looked up per call, in the cache of whichever issuer the calling thread
+sees, so a client is safe to share between a stack's components and its test.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
+from urllib3.util.retry import Retry
+
+from robotics_integration_tests.utilities.authentication import (
+    retrieve_access_token_for_integration_tests_app,
+)
+
+# (connect, read) in seconds. The backends answer within milliseconds when up;
+# a connect that takes longer than this is a container that is not listening.
+_TIMEOUT: Tuple[float, float] = (3.05, 30)
+
+# Connection errors are retried for every method, since nothing reached the
+# backend. Gateway-style statuses only for idempotent ones: a POST that got as
+# far as a 503 may have been applied.
+_RETRY: Retry = Retry(
+    total=3,
+    backoff_factor=0.1,
+    status_forcelist=(502, 503, 504),
+    raise_on_status=False,
+)
+
+# Parallel robots and the stack pool's builders share a client.
+_POOL_SIZE = 16
+
+
+class BackendRequestError(AssertionError):
+    """A non-2xx response, reported with its problem details.
+
+    An AssertionError so that a failing call reads in pytest's output as the
+    failed expectation it is.
+    """
+
+    def __init__(
+        self, method: str, url: str, response: Response, payload: Optional[Any]
+    ) -> None:
+        try:
+            problem: Optional[Any] = response.json()
+        except ValueError:
+            problem = None
+        self.response: Response = response
+        self.problem: Optional[Any] = problem
+
+        lines = [f"{method} {url} returned {response.status_code}"]
+        if payload is not None:
+            lines.append(f"Request payload:\n{payload}")
+        lines += [
+            f"Response headers: {dict(response.headers)}",
+            f"Response body:\n{response.text}",
+            f"Parsed JSON (if any):\n{problem}",
+        ]
+        super().__init__("\n".join(lines))
+
+
+class _BearerAuth(AuthBase):
+    def __init__(self, scope: str) -> None:
+        self.scope: str = scope
+
+    def __call__(self, request: PreparedRequest) -> PreparedRequest:
+        access_token: str = retrieve_access_token_for_integration_tests_app(
+            self.scope
+        )
+        request.headers["Authorization"] = f"Bearer {access_token}"
+        return request
+
+
+class BackendClient:
+    def __init__(self, backend_url: str, scope: str) -> None:
+        self.backend_url: str = backend_url.rstrip("/")
+        self._session: requests.Session = requests.Session()
+        self._session.auth = _BearerAuth(scope)
+        adapter = HTTPAdapter(
+            max_retries=_RETRY, pool_connections=1, pool_maxsize=_POOL_SIZE
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def request(
+        self, method: str, path: str, json: Optional[Any] = None
+    ) -> Optional[Any]:
+        """Send *method* to *path* and return the decoded body, if there is one."""
+        url: str = f"{self.backend_url}/{path.lstrip('/')}"
+        response: Response = self._session.request(
+            method, url, json=json, timeout=_TIMEOUT
+        )
+        if not response.ok:
+            raise BackendRequestError(method, url, response, json)
+        if not response.content:
+            return None
+        return response.json()
+
+    def get(self, path: str) -> Any:
+        return self.request("GET", path)
+
+    def post(self, path: str, json: Optional[Any] = None) -> Any:
+        return self.request("POST", path, json=json)
+
+    def patch(self, path: str, json: Optional[Any] = None) -> Any:
+        return self.request("PATCH", path, json=json)
+
+    def close(self) -> None:
+        self._session.close()
+
+
+_lock: threading.Lock = threading.Lock()
+_clients: Dict[Tuple[str, str], BackendClient] = {}
+
+
+def backend_client(backend_url: str, scope: str) -> BackendClient:
+    """The client for *backend_url*, created on first use."""
+    key: Tuple[str, str] = (backend_url.rstrip("/"), scope)
+    with _lock:
+        client: Optional[BackendClient] = _clients.get(key)
+        if client is None:
+            client = _clients[key] = BackendClient(backend_url, scope)
+        return client
+
+
+def close_backend_clients(backend_url: str) -> None:
+    """Drop the clients for a backend that is going away.
+
+    Its host port is handed to some later container, which must not be sent
+    requests over this one's kept-alive connections.
+    """
+    with _lock:
+        keys = [key for key in _clients if key[0] == backend_url.rstrip("/")]
+        clients = [_clients.pop(key) for key in keys]
+    for client in clients:
+        client.close()
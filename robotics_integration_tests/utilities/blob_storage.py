@@ -1,99 +1,204 @@
-import time
-from datetime import datetime, timedelta
-from typing import Dict, List
+"""Blobs uploaded by the robots, as the tests wait for them.
 
-from azure.storage.blob import BlobServiceClient
-from loguru import logger
+Blob paths follow the pattern ``{date}__{plant}__{name}__{mission_run_id}/...``.
+A wait lists its container once per tick, with one client per connection
+string, and files the names by mission run as it goes. Each expectation then
+looks up its own mission run, however many missions and blobs there are.
 
+The mission runs' folders are remembered from those listings. A one-off count
+for a mission run whose folder is known lists only that folder.
+"""
 
-def wait_until_all_expected_files_uploaded(
-    container_name: str,
-    connection_string: str,
-    expected_file_count: int,
-    timeout: int = 60,
-) -> None:
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from azure.storage.blob import BlobServiceClient, ContainerClient
 
-    start_time = datetime.now()
-    while True:
-        current_count: int = count_files_in_container(container_name, connection_string)
-        if current_count >= expected_file_count:
-            return
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise TimeoutError(
-                f"Timeout waiting for {expected_file_count} files in container '{container_name}'. "
-                f"Only {current_count} files found."
+from robotics_integration_tests.utilities.wait_engine import (
+    Expectation,
+    Source,
+    wait_for,
+)
+
+_lock: threading.Lock = threading.Lock()
+_clients: Dict[str, BlobServiceClient] = {}
+# (connection string, container name, mission run ID) -> its folder
+_mission_folders: Dict[Tuple[str, str, str], str] = {}
+
+
+def blob_service_client(connection_string: str) -> BlobServiceClient:
+    """The client for *connection_string*, created on first use."""
+    with _lock:
+        client: Optional[BlobServiceClient] = _clients.get(connection_string)
+        if client is None:
+            client = _clients[connection_string] = (
+                BlobServiceClient.from_connection_string(connection_string)
             )
-        time.sleep(1)
+        return client
 
 
-def wait_for_all_mission_blobs(
+def close_blob_service_clients(connection_string: str) -> None:
+    """Drop the client and the mission folders for a storage that is going away.
+
+    Its host port is handed to some later container, which must not be sent
+    requests over this one's kept-alive connections, nor be assumed to hold
+    its folders.
+    """
+    with _lock:
+        client: Optional[BlobServiceClient] = _clients.pop(connection_string, None)
+        for key in [key for key in _mission_folders if key[0] == connection_string]:
+            del _mission_folders[key]
+    if client is not None:
+        client.close()
+
+
+def _container_client(container_name: str, connection_string: str) -> ContainerClient:
+    return blob_service_client(connection_string).get_container_client(container_name)
+
+
+class BlobIndex:
+    """The names of a container's blobs, by the mission run they belong to."""
+
+    def __init__(self, names: List[str]) -> None:
+        self.count: int = len(names)
+        self.by_mission: Dict[str, List[str]] = {}
+        # Mission run ID -> the folder its blobs are in.
+        self.folders: Dict[str, str] = {}
+        for name in names:
+            folder: str = name.split("/", 1)[0]
+            mission_run_id: Optional[str] = _mission_run_id(folder)
+            if mission_run_id is None:
+                continue
+            self.by_mission.setdefault(mission_run_id, []).append(name)
+            self.folders[mission_run_id] = folder
+
+    def __len__(self) -> int:
+        return self.count
+
+    def count_for_mission(self, mission_run_id: str) -> int:
+        return len(self.by_mission.get(mission_run_id, ()))
+
+
+def _mission_run_id(folder: str) -> Optional[str]:
+    """The mission run ID of a ``{date}__{plant}__{name}__{mission_run_id}`` folder."""
+    parts: List[str] = folder.split("__")
+    return parts[-1] if len(parts) >= 4 and parts[-1] else None
+
+
+def blob_index(container_name: str, connection_string: str) -> BlobIndex:
+    """One listing of the container, by name only, filed by mission run."""
+    index = BlobIndex(
+        list(_container_client(container_name, connection_string).list_blob_names())
+    )
+    with _lock:
+        for mission_run_id, folder in index.folders.items():
+            _mission_folders[(connection_string, container_name, mission_run_id)] = (
+                folder
+            )
+    return index
+
+
+def blob_index_source(container_name: str, connection_string: str) -> Source:
+    """The container's BlobIndex, listed once per tick."""
+    return Source(
+        key=("blobs", connection_string, container_name),
+        fetch=lambda: blob_index(container_name, connection_string),
+        description=f"blobs in container '{container_name}'",
+    )
+
+
+def container_has_files(
+    container_name: str, connection_string: str, expected_file_count: int
+) -> Expectation:
+    """Met once the container holds at least *expected_file_count* blobs."""
+    return Expectation(
+        description=f"Container '{container_name}' has {expected_file_count} files",
+        source=blob_index_source(container_name, connection_string),
+        predicate=lambda index: len(index) >= expected_file_count,
+        show=len,
+    )
+
+
+def mission_has_blobs(
     container_name: str,
     connection_string: str,
-    mission_blob_expectations: Dict[str, int],
-    timeout: int = 60,
-) -> None:
-    """Poll a single blob container until each mission run has the expected
-    number of blobs, or *timeout* seconds have elapsed.
+    mission_run_id: str,
+    expected_count: int,
+    after: Optional[Expectation] = None,
+) -> Expectation:
+    """Met once at least *expected_count* blobs belong to the mission run.
 
-    Blob paths follow the pattern ``{date}__{plant}__{name}__{mission_run_id}/...``,
-    so each blob can be attributed to a mission run by checking whether its
-    path contains the mission run ID.
+    A blob belongs to the mission run whose ID ends the folder it is in.
+    """
+    return Expectation(
+        description=f"Mission run '{mission_run_id}' has {expected_count} blobs",
+        source=blob_index_source(container_name, connection_string),
+        predicate=lambda index: index.count_for_mission(mission_run_id)
+        >= expected_count,
+        show=lambda index: index.count_for_mission(mission_run_id),
+        after=after,
+    )
+
+
+def mission_has_no_blobs(
+    container_name: str, connection_string: str, mission_run_id: str
+) -> Expectation:
+    """Checked once everything else is met: no blob belongs to the mission run."""
+    return Expectation(
+        description=f"Mission run '{mission_run_id}' has no blobs",
+        source=blob_index_source(container_name, connection_string),
+        predicate=lambda index: index.count_for_mission(mission_run_id) == 0,
+        show=lambda index: index.count_for_mission(mission_run_id),
+        final=True,
+    )
+
+
+def blob_count_expectations(
+    container_name: str,
+    connection_string: str,
+    mission_blob_expectations: Dict[str, int],
+) -> List[Expectation]:
+    """Expectations for each mission run to have its expected number of blobs.
 
     *mission_blob_expectations* maps mission run IDs to their expected blob
     counts. Entries with expected count 0 are verified **after** all positive
     expectations are met, to ensure no unexpected blobs were uploaded.
     """
-    positive: Dict[str, int] = {
-        mid: count
-        for mid, count in mission_blob_expectations.items()
+    return [
+        mission_has_blobs(container_name, connection_string, mission_run_id, count)
         if count > 0
-    }
-    zero: List[str] = [
-        mid for mid, count in mission_blob_expectations.items() if count == 0
+        else mission_has_no_blobs(container_name, connection_string, mission_run_id)
+        for mission_run_id, count in mission_blob_expectations.items()
     ]
 
-    remaining: Dict[str, int] = dict(positive)
-    start_time: datetime = datetime.now()
-
-    while remaining:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            counts = {
-                mid: count_blobs_for_mission(container_name, connection_string, mid)
-                for mid in remaining
-            }
-            raise TimeoutError(
-                f"Timeout waiting for mission blobs within {timeout}s. "
-                f"Still waiting for: {remaining}. Current counts: {counts}"
-            )
 
-        for mission_run_id, expected_count in list(remaining.items()):
-            current_count: int = count_blobs_for_mission(
-                container_name, connection_string, mission_run_id
-            )
-            if current_count >= expected_count:
-                logger.info(
-                    f"Mission run '{mission_run_id}' has {current_count}/{expected_count} expected blobs"
-                )
-                del remaining[mission_run_id]
-            else:
-                logger.info(
-                    f"Mission run '{mission_run_id}' has {current_count}/{expected_count} blobs, waiting..."
-                )
-
-        if remaining:
-            time.sleep(1)
-
-    for mission_run_id in zero:
-        current_count = count_blobs_for_mission(
-            container_name, connection_string, mission_run_id
-        )
-        if current_count != 0:
-            raise AssertionError(
-                f"Mission run '{mission_run_id}' expected 0 blobs but found {current_count}"
-            )
-        logger.info(
-            f"Mission run '{mission_run_id}' correctly has 0 blobs"
-        )
+def wait_until_all_expected_files_uploaded(
+    container_name: str,
+    connection_string: str,
+    expected_file_count: int,
+    timeout: int = 60,
+) -> None:
+    wait_for(
+        [container_has_files(container_name, connection_string, expected_file_count)],
+        timeout=timeout,
+    )
+
+
+def wait_for_all_mission_blobs(
+    container_name: str,
+    connection_string: str,
+    mission_blob_expectations: Dict[str, int],
+    timeout: int = 60,
+) -> None:
+    """Wait until each mission run has the expected number of blobs, or
+    *timeout* seconds have elapsed; see blob_count_expectations().
+    """
+    wait_for(
+        blob_count_expectations(
+            container_name, connection_string, mission_blob_expectations
+        ),
+        timeout=timeout,
+    )
 
 
 def count_blobs_for_mission(
@@ -101,27 +206,23 @@ def count_blobs_for_mission(
     connection_string: str,
     mission_run_id: str,
 ) -> int:
-    """Count blobs in *container_name* whose path contains *mission_run_id*."""
-    service_client = BlobServiceClient.from_connection_string(connection_string)
-    container_client = service_client.get_container_client(container_name)
-
-    count = 0
-    for blob in container_client.list_blobs():
-        if mission_run_id in blob.name:
-            count += 1
-
-    return count
+    """Count the blobs in *container_name* that belong to *mission_run_id*."""
+    with _lock:
+        folder: Optional[str] = _mission_folders.get(
+            (connection_string, container_name, mission_run_id)
+        )
+    if folder is None:
+        return blob_index(container_name, connection_string).count_for_mission(
+            mission_run_id
+        )
+    container_client = _container_client(container_name, connection_string)
+    return sum(
+        1 for _ in container_client.list_blob_names(name_starts_with=f"{folder}/")
+    )
 
 
 def count_files_in_container(
     container_name: str,
     connection_string: str,
 ) -> int:
-    service_client = BlobServiceClient.from_connection_string(connection_string)
-    container_client = service_client.get_container_client(container_name)
-
-    count = 0
-    for _ in container_client.list_blobs():
-        count += 1
-
-    return count
+    return len(blob_index(container_name, connection_string))
@@ -0,0 +1,190 @@
+"""Wait for containers by listening to Docker rather than by sleeping.
+
+One thread per process follows the Docker events stream. Waiters block on a
+condition and re-inspect their container only when Docker reports something
+about it, so a port mapping or a healthcheck passing is noticed within
+milliseconds. Every wait also re-inspects at least once a second, in case the
+stream misses an event.
+
+Components declare healthchecks with the *_healthcheck() helpers; they are cheap
+probes of the service port, run by Docker inside the container. What a service
+means by ready, such as an authenticated request succeeding, is still checked by
+its own waiter, starting once the healthcheck passes.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import docker
+from loguru import logger
+from testcontainers.core.container import DockerContainer
+
+# Docker takes durations in nanoseconds.
+_SECOND = 1_000_000_000
+
+# Re-inspect at least this often, whether or not an event arrived.
+_SAFETY_INTERVAL = 1.0
+
+# Healthcheck exit codes for a probe that could not be started: not executable,
+# not found, or no shell to run it in.
+_PROBE_CANNOT_RUN = (-1, 126, 127)
+
+
+def _healthcheck(command: str) -> Dict[str, Any]:
+    return {
+        "test": ["CMD-SHELL", command],
+        "interval": _SECOND // 2,
+        "timeout": 2 * _SECOND,
+        "retries": 600,
+    }
+
+
+def bash_tcp_healthcheck(port: int) -> Dict[str, Any]:
+    """Healthy once something listens on *port*, for images with bash."""
+    return _healthcheck(f"bash -c '</dev/tcp/127.0.0.1/{port}'")
+
+
+def python_tcp_healthcheck(port: int) -> Dict[str, Any]:
+    """Healthy once something listens on *port*, for images with Python."""
+    return _healthcheck(
+        f"python -c \"import socket; socket.create_connection(('127.0.0.1', {port}), 1)\""
+    )
+
+
+def node_tcp_healthcheck(port: int) -> Dict[str, Any]:
+    """Healthy once something listens on *port*, for images with Node.js."""
+    return _healthcheck(
+        "node -e \"require('net').connect("
+        f"{port}, '127.0.0.1', () => process.exit(0)).on('error', () => process.exit(1))\""
+    )
+
+
+class Backoff:
+    """Sleeps that start short and grow, for checks no event can announce."""
+
+    def __init__(self, initial: float = 0.05, maximum: float = 1.0) -> None:
+        self._initial: float = initial
+        self._delay: float = initial
+        self._maximum: float = maximum
+
+    def sleep(self) -> None:
+        time.sleep(self._delay)
+        self._delay = min(self._delay * 2, self._maximum)
+
+    def reset(self) -> None:
+        """Start again from the shortest sleep, e.g. after progress was made."""
+        self._delay = self._initial
+
+
+class _DockerEventWatcher:
+    def __init__(self) -> None:
+        self._condition: threading.Condition = threading.Condition()
+        # Bumped for every event about a container; waiters compare before waiting.
+        self._generations: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def wait_until(
+        self,
+        container_id: str,
+        is_ready: Callable[[Dict[str, Any]], bool],
+        timeout: float,
+    ) -> bool:
+        """Block until is_ready(inspect output) holds; False on timeout."""
+        self._ensure_started()
+        client = docker.from_env()
+        deadline: float = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                generation: int = self._generations.get(container_id, 0)
+
+            attrs: Dict[str, Any] = client.api.inspect_container(container_id)
+            if is_ready(attrs):
+                return True
+            if not attrs["State"]["Running"] and attrs["State"]["Status"] != "created":
+                raise RuntimeError(
+                    f"Container {attrs['Name'].lstrip('/')} exited with code "
+                    f"{attrs['State']['ExitCode']} while being waited for"
+                )
+
+            remaining: float = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with self._condition:
+                if self._generations.get(container_id, 0) == generation:
+                    self._condition.wait(timeout=min(remaining, _SAFETY_INTERVAL))
+
+    def _ensure_started(self) -> None:
+        with self._condition:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._follow, name="docker-events", daemon=True
+                )
+                self._thread.start()
+
+    def _follow(self) -> None:
+        try:
+            for event in docker.from_env().events(
+                decode=True, filters={"type": "container"}
+            ):
+                container_id: Optional[str] = event.get("id")
+                if not container_id:
+                    continue
+                with self._condition:
+                    self._generations[container_id] = (
+                        self._generations.get(container_id, 0) + 1
+                    )
+                    self._condition.notify_all()
+        except Exception as e:
+            # Waiters fall back to re-inspecting once a second; the next wait
+            # starts a new watcher.
+            logger.warning(f"Stopped following Docker events: {e}")
+
+
+_watcher: _DockerEventWatcher = _DockerEventWatcher()
+
+
+def wait_for_published_port(
+    container: DockerContainer, port: int, timeout: float = 60
+) -> None:
+    def is_published(attrs: Dict[str, Any]) -> bool:
+        bindings = (attrs["NetworkSettings"].get("Ports") or {}).get(f"{port}/tcp")
+        return bool(bindings and bindings[0].get("HostPort"))
+
+    if not _watcher.wait_until(
+        container.get_wrapped_container().id, is_published, timeout
+    ):
+        raise ConnectionError(
+            f"Port mapping for container {container.image} on port {port} not available within timeout"
+        )
+
+
+def wait_for_healthy(container: DockerContainer, timeout: float = 180) -> None:
+    """Block until Docker reports the container's healthcheck as passing.
+
+    Returns at once for a container without a healthcheck. An unhealthy
+    container is logged rather than raised: the healthcheck is a shortcut, and
+    the caller's own readiness check has the final say.
+    """
+
+    def has_settled(attrs: Dict[str, Any]) -> bool:
+        health: Optional[Dict] = attrs["State"].get("Health")
+        if health is None or health["Status"] in ("healthy", "unhealthy"):
+            return True
+        # The probe cannot run at all, e.g. the image has no bash; waiting for
+        # the retries to run out would only add dead time.
+        log = health.get("Log") or []
+        return bool(log) and log[-1]["ExitCode"] in _PROBE_CANNOT_RUN
+
+    container_id: str = container.get_wrapped_container().id
+    if not _watcher.wait_until(container_id, has_settled, timeout):
+        logger.warning(f"{container.image} did not become healthy within {timeout}s")
+        return
+
+    health = docker.from_env().api.inspect_container(container_id)["State"].get(
+        "Health"
+    )
+    if health is not None and health["Status"] != "healthy":
+        logger.warning(
+            f"{container.image} has no passing healthcheck: {(health.get('Log') or [])[-1:]}"
+        )
@@ -0,0 +1,148 @@
+"""Asyncio access to the Flotilla API, for operations across a whole fleet.
+
+The calls run on worker threads over the same pooled client as the helpers in
+flotilla_backend_api.py, and a semaphore bounds how many are in flight, so a
+fleet of robots can be set up or sent missions through asyncio.gather() without
+flooding the backend. Each thread runs in a copy of the caller's context and so
+uses the caller's issuer.
+
+Waits, such as for the robots of a fleet to register, go through the wait
+engine on a worker thread, so the whole fleet shares one robot listing per tick.
+
+From synchronous code, such as the fixtures and tests, run a fleet operation
+with asyncio.run().
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.flotilla_backend_api import (
+    FleetSnapshot,
+    flotilla_client,
+    robot_has_inspection_area,
+    robot_is_registered,
+)
+from robotics_integration_tests.utilities.wait_engine import Expectation, wait_for
+
+
+class AsyncFlotillaClient:
+    def __init__(self, backend_url: str, concurrency: Optional[int] = None) -> None:
+        self.backend_url: str = backend_url
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(
+            concurrency or settings.FLOTILLA_API_CONCURRENCY
+        )
+
+    async def _request(self, method: str, path: str, json: Optional[Any] = None) -> Any:
+        async with self._semaphore:
+            return await asyncio.to_thread(
+                flotilla_client(self.backend_url).request, method, path, json
+            )
+
+    async def list_robots(self) -> List[Dict]:
+        return await self._request("GET", "robots")
+
+    async def get_robot(self, robot_id: str) -> Dict:
+        return await self._request("GET", f"robots/{robot_id}")
+
+    async def get_robot_by_name(self, name: str) -> Dict:
+        robot: Optional[Dict] = FleetSnapshot(await self.list_robots()).robot(name)
+        if robot is None:
+            raise RuntimeError(f"Robot with name '{name}' not found")
+        return robot
+
+    async def get_inspection_area_id_for_installation(
+        self, installation_code: str
+    ) -> str:
+        inspection_areas: List[Dict] = await self._request(
+            "GET", f"inspectionAreas/installation/{installation_code}"
+        )
+        return inspection_areas[0]["id"]
+
+    async def set_current_inspection_area(
+        self, robot_id: str, inspection_area_id: str
+    ) -> None:
+        await self._request(
+            "PATCH", f"robots/{robot_id}/currentInspectionArea/{inspection_area_id}"
+        )
+
+    async def create_mission(self, payload: Dict) -> Dict:
+        return await self._request("POST", "missions/definitions", json=payload)
+
+    async def schedule_mission(self, robot_id: str, mission_id: str) -> Dict:
+        return await self._request(
+            "POST", f"missions/schedule/{mission_id}", json={"robotId": robot_id}
+        )
+
+    async def get_mission_run(self, mission_run_id: str) -> Dict:
+        return await self._request("GET", f"missions/runs/{mission_run_id}")
+
+    async def pause_mission(self, robot_id: str) -> None:
+        await self._request("POST", f"robots/{robot_id}/pause")
+
+    async def resume_mission(self, robot_id: str) -> None:
+        await self._request("POST", f"robots/{robot_id}/resume")
+
+    async def create_and_schedule_mission(self, robot_id: str, payload: Dict) -> Dict:
+        """Create a mission definition and schedule it; returns the mission run."""
+        mission: Dict = await self.create_mission(payload)
+        return await self.schedule_mission(robot_id=robot_id, mission_id=mission["id"])
+
+    async def setup_robot(self, robot_name: str, timeout: int = 60) -> Tuple[str, str]:
+        """Wait for the robot to register and set its current inspection area;
+        returns (robot_id, installation_code)."""
+        return (await self.setup_robots([robot_name], timeout=timeout))[robot_name]
+
+    async def setup_robots(
+        self, robot_names: Iterable[str], timeout: int = 60
+    ) -> Dict[str, Tuple[str, str]]:
+        """Set up every robot at once; maps each name to (robot_id, installation_code)."""
+        names: List[str] = list(robot_names)
+        start_time: float = time.monotonic()
+        robots: List[Dict] = await self._wait_for(
+            [robot_is_registered(self.backend_url, name) for name in names], timeout
+        )
+        await asyncio.gather(*(self._set_inspection_area(robot) for robot in robots))
+        await self._wait_for(
+            [robot_has_inspection_area(self.backend_url, name) for name in names],
+            timeout,
+        )
+        logger.info(
+            f"Robots {', '.join(names)} set up in Flotilla in "
+            f"{time.monotonic() - start_time:.1f}s"
+        )
+        return {
+            name: (robot["id"], robot["currentInstallation"]["installationCode"])
+            for name, robot in zip(names, robots)
+        }
+
+    async def _set_inspection_area(self, robot: Dict) -> None:
+        inspection_area_id: str = await self.get_inspection_area_id_for_installation(
+            robot["currentInstallation"]["installationCode"]
+        )
+        await self.set_current_inspection_area(robot["id"], inspection_area_id)
+
+    async def _wait_for(
+        self, expectations: List[Expectation], timeout: float
+    ) -> List[Any]:
+        """What each expectation was met by, in order; see wait_engine.wait_for()."""
+        results = await asyncio.to_thread(wait_for, expectations, timeout)
+        return [results[expectation] for expectation in expectations]
+
+    async def schedule_missions(
+        self, payloads_by_robot_id: Dict[str, Dict]
+    ) -> Dict[str, Dict]:
+        """Create and schedule a mission per robot at once; maps robot ID to mission run."""
+        robot_ids: List[str] = list(payloads_by_robot_id)
+        mission_runs = await asyncio.gather(
+            *(
+                self.create_and_schedule_mission(
+                    robot_id, payloads_by_robot_id[robot_id]
+                )
+                for robot_id in robot_ids
+            )
+        )
+        return dict(zip(robot_ids, mission_runs))
@@ -1,41 +1,41 @@
-import time
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import requests
 from loguru import logger
-from requests import Response
 
 from robotics_integration_tests.settings.settings import settings
-from robotics_integration_tests.utilities.authentication import (
-    retrieve_access_token_for_integration_tests_app,
+from robotics_integration_tests.utilities.backend_client import (
+    BackendClient,
+    backend_client,
+)
+from robotics_integration_tests.utilities.container_readiness import Backoff
+from robotics_integration_tests.utilities.flotilla_seed import seed_flotilla
+from robotics_integration_tests.utilities.flotilla_signalr import (
+    mission_runs_activity,
+    robots_activity,
+)
+from robotics_integration_tests.utilities.wait_engine import (
+    Expectation,
+    Source,
+    wait_for,
 )
 
 
-def _add_headers() -> Dict[str, str]:
-    access_token: str = retrieve_access_token_for_integration_tests_app(
-        settings.FLOTILLA_SCOPE
-    )
-    headers = {"Authorization": f"Bearer {access_token}"}
-    return headers
+def flotilla_client(backend_url: str) -> BackendClient:
+    return backend_client(backend_url, settings.FLOTILLA_SCOPE)
 
 
 def _list_database_entries(backend_url: str, request_path: str) -> List[Dict]:
     logger.info(f"Listing database entries for path: {backend_url}/{request_path}")
-    headeers = _add_headers()
-    response: Response = requests.get(
-        f"{backend_url}/{request_path}", headers=_add_headers()
-    )
-    response.raise_for_status()
-    return response.json()
+    return flotilla_client(backend_url).get(request_path)
 
 
 def get_inspection_area_id_for_installation(backend_url: str, installation_code: str):
-    response: Response = requests.get(
-        f"{backend_url}/inspectionAreas/installation/{installation_code}",
-        headers=_add_headers(),
+    inspection_areas_for_installation: List[Dict] = flotilla_client(backend_url).get(
+        f"inspectionAreas/installation/{installation_code}"
     )
-    inspection_areas_for_installation: List[Dict] = response.json()
     inspection_area_id: str = inspection_areas_for_installation[0]["id"]
     return inspection_area_id
 
@@ -43,9 +43,8 @@ def get_inspection_area_id_for_installation(backend_url: str, installation_code:
 def set_current_inspection_area_for_robot(
     backend_url: str, inspection_area_id: str, robot_id: str
 ):
-    response: Response = requests.patch(
-        f"{backend_url}/robots/{robot_id}/currentInspectionArea/{inspection_area_id}",
-        headers=_add_headers(),
+    flotilla_client(backend_url).patch(
+        f"robots/{robot_id}/currentInspectionArea/{inspection_area_id}"
     )
 
 
@@ -106,27 +105,7 @@ def create_mission(backend_url: str, payload: Dict) -> Dict:
 
 
 def call_create_mission(backend_url: str, payload: Dict) -> Dict:
-    url: str = f"{backend_url}/missions/definitions"
-    response: Response = requests.post(
-        url,
-        json=payload,
-        headers=_add_headers(),
-    )
-    if not response.ok:
-        body = response.text
-        try:
-            problem = response.json()
-        except Exception:
-            problem = None
-        raise AssertionError(
-            f"POST {url} returned {response.status_code}\n"
-            f"Request payload:\n{payload}\n"
-            f"Response headers: {dict(response.headers)}\n"
-            f"Response body:\n{body}\n"
-            f"Parsed JSON (if any):\n{problem}"
-        )
-    response.raise_for_status()
-    return response.json()
+    return flotilla_client(backend_url).post("missions/definitions", json=payload)
 
 
 def schedule_mission(backend_url: str, robot_id: str, mission_id: str) -> Dict:
@@ -146,42 +125,16 @@ def call_schedule_mission(backend_url: str, robot_id: str, mission_id: str) -> D
     payload: Dict = {
         "robotId": robot_id,
     }
-    url: str = f"{backend_url}/missions/schedule/{mission_id}"
-    response: Response = requests.post(
-        url,
-        json=payload,
-        headers=_add_headers(),
+    return flotilla_client(backend_url).post(
+        f"missions/schedule/{mission_id}", json=payload
     )
-    if not response.ok:
-        body = response.text
-        try:
-            problem = response.json()
-        except Exception:
-            problem = None
-        raise AssertionError(
-            f"POST {url} returned {response.status_code}\n"
-            f"Request payload:\n{payload}\n"
-            f"Response headers: {dict(response.headers)}\n"
-            f"Response body:\n{body}\n"
-            f"Parsed JSON (if any):\n{problem}"
-        )
-    response.raise_for_status()
-    return response.json()
 
 
 def get_robot_by_name(backend_url: str, name: str) -> Dict:
-    response: Response = requests.get(
-        f"{backend_url}/robots",
-        headers=_add_headers(),
-    )
-    response.raise_for_status()
-
-    robots: List[Dict] = response.json()
-
-    for robot in robots:
-        if robot.get("name") == name:
-            return robot
-    raise RuntimeError(f"Robot with name '{name}' not found")
+    robot: Optional[Dict] = take_fleet_snapshot(backend_url).robot(name)
+    if robot is None:
+        raise RuntimeError(f"Robot with name '{name}' not found")
+    return robot
 
 
 def is_robot_status(backend_url: str, robot_name: str, expected_status: str) -> bool:
@@ -193,12 +146,67 @@ def is_robot_status(backend_url: str, robot_name: str, expected_status: str) ->
 
 
 def get_mission_run_by_id(backend_url: str, mission_run_id: str) -> Dict:
-    response: Response = requests.get(
-        f"{backend_url}/missions/runs/{mission_run_id}",
-        headers=_add_headers(),
-    )
-    response.raise_for_status()
-    return response.json()
+    return flotilla_client(backend_url).get(f"missions/runs/{mission_run_id}")
+
+
+class FleetSnapshot:
+    """The robots and mission runs as of one moment, indexed for lookups."""
+
+    def __init__(
+        self, robots: Iterable[Dict] = (), mission_runs: Iterable[Dict] = ()
+    ) -> None:
+        self.robots: List[Dict] = list(robots)
+        self._robots_by_name: Dict[str, Dict] = {r["name"]: r for r in self.robots}
+        self._robots_by_id: Dict[str, Dict] = {r["id"]: r for r in self.robots}
+        self._mission_runs: Dict[str, Dict] = {m["id"]: m for m in mission_runs}
+
+    def robot(self, name: str) -> Optional[Dict]:
+        return self._robots_by_name.get(name)
+
+    def robot_by_id(self, robot_id: str) -> Optional[Dict]:
+        return self._robots_by_id.get(robot_id)
+
+    def mission_run(self, mission_run_id: str) -> Optional[Dict]:
+        """None for a run that could not be fetched, e.g. one not yet written."""
+        return self._mission_runs.get(mission_run_id)
+
+
+def take_fleet_snapshot(
+    backend_url: str,
+    mission_run_ids: Iterable[str] = (),
+    include_robots: bool = True,
+) -> FleetSnapshot:
+    """List the robots once and fetch the given mission runs.
+
+    Flotilla has no endpoint returning mission runs by ID in bulk, so they are
+    fetched FLOTILLA_API_CONCURRENCY at a time.
+    """
+    client: BackendClient = flotilla_client(backend_url)
+    robots: List[Dict] = client.get("robots") if include_robots else []
+
+    ids: List[str] = list(mission_run_ids)
+    mission_runs: List[Dict] = []
+    if ids:
+        with ThreadPoolExecutor(
+            max_workers=min(len(ids), settings.FLOTILLA_API_CONCURRENCY),
+            thread_name_prefix="fleet-snapshot",
+        ) as executor:
+            # Each fetch authenticates with the issuer of the calling thread.
+            futures: Dict[str, Future] = {
+                mission_run_id: executor.submit(
+                    contextvars.copy_context().run,
+                    client.get,
+                    f"missions/runs/{mission_run_id}",
+                )
+                for mission_run_id in ids
+            }
+        for mission_run_id, future in futures.items():
+            try:
+                mission_runs.append(future.result())
+            except Exception as e:
+                logger.debug(f"Could not fetch mission run {mission_run_id}: {e}")
+
+    return FleetSnapshot(robots=robots, mission_runs=mission_runs)
 
 
 def is_mission_run_status(
@@ -213,65 +221,9 @@ def is_mission_run_status(
     return True
 
 
-def add_access_role_to_database(
-    backend_url: str, access_level: str, installation_code: str, role_name: str
-):
-    response: Response = requests.post(
-        f"{backend_url}/access-roles",
-        json={
-            "installationCode": installation_code,
-            "roleName": role_name,
-            "accessLevel": access_level,
-        },
-        headers=_add_headers(),
-    )
-    response.raise_for_status()
-
-
-def add_plant_to_database(
-    backend_url: str, installation_code: str, name: str, plant_code: str
-):
-    response: Response = requests.post(
-        f"{backend_url}/plants",
-        json={
-            "installationCode": installation_code,
-            "plantCode": plant_code,
-            "name": name,
-        },
-        headers=_add_headers(),
-    )
-    response.raise_for_status()
-
-
-def add_inspection_area_to_database(
-    backend_url: str, installation_code: str, name: str, plant_code: str, polygon: Dict
-):
-    response: Response = requests.post(
-        f"{backend_url}/inspectionAreas",
-        json={
-            "installationCode": installation_code,
-            "plantCode": plant_code,
-            "name": name,
-            "areaPolygon": polygon,
-        },
-        headers=_add_headers(),
-    )
-    response.raise_for_status()
-
-
-def add_installation_to_database(
-    backend_url: str, installation_code: str, name: str
-) -> None:
-    response: Response = requests.post(
-        f"{backend_url}/installations",
-        json={"installationCode": installation_code, "name": name},
-        headers=_add_headers(),
-    )
-    response.raise_for_status()
-
-
 def wait_for_backend_to_be_responsive(backend_url: str, timeout: int = 60) -> None:
     start_time: datetime = datetime.now()
+    backoff: Backoff = Backoff()
     while True:
         if datetime.now() - start_time > timedelta(seconds=timeout):
             raise RuntimeError(
@@ -286,7 +238,7 @@ def wait_for_backend_to_be_responsive(backend_url: str, timeout: int = 60) -> No
             logger.warning(
                 f"Backend is not responsive yet, will retry until timeout... Exception: {e}"
             )
-            time.sleep(1)
+            backoff.sleep()
             continue
 
         if len(installations) >= 0:
@@ -294,332 +246,150 @@ def wait_for_backend_to_be_responsive(backend_url: str, timeout: int = 60) -> No
             return
 
 
-# Populate default installations
-default_installations: List[Tuple[str, str]] = [
-    ("HUA", "Huldra"),
-    ("KAA", "Kårstø"),
-    ("NLS", "Northern Lights"),
-]
-
-# Populate default plants
-default_plants: List[Tuple[str, str, str]] = [
-    ("HUA", "HUA", "Huldra"),
-    ("KAA", "KAA", "Kårstø"),
-    ("NLS", "NLS", "Northern Lights"),
-]
-
-default_area_polygon = {
-    "zmin": 0,
-    "zmax": 10000000,
-    "positions": [
-        {
-            "x": 0,
-            "y": 0,
-        },
-        {
-            "x": 0,
-            "y": 10000000,
-        },
-        {
-            "x": 10000000,
-            "y": 0,
-        },
-        {
-            "x": 10000000,
-            "y": 10000000,
-        },
-    ],
-}
-
-# Populate default inspection areas
-default_inspection_areas: List[Tuple[str, str, str, Dict]] = [
-    ("HUA", "HUA", "Huldra Area", default_area_polygon),
-    ("KAA", "KAA", "Kårstø Area", default_area_polygon),
-    ("NLS", "NLS", "Northern Lights Area", default_area_polygon),
-]
-
-# Populate default access roles
-default_access_roles: List[Tuple[str, str, str]] = [
-    ("HUA", "Role.User.HUA", "USER"),
-    ("KAA", "Role.User.KAA", "USER"),
-    ("NLS", "Role.User.NLS", "USER"),
-]
-
-
 def populate_database_with_minimum_models(backend_url: str) -> None:
-    for installation_code, name in default_installations:
-        add_installation_to_database(
-            backend_url=backend_url, installation_code=installation_code, name=name
-        )
-
-    for plant_code, installation_code, name in default_plants:
-        add_plant_to_database(
-            backend_url=backend_url,
-            installation_code=installation_code,
-            name=name,
-            plant_code=plant_code,
-        )
-
-    for installation_code, plant_code, name, polygon in default_inspection_areas:
-        add_inspection_area_to_database(
-            backend_url=backend_url,
-            installation_code=installation_code,
-            name=name,
-            plant_code=plant_code,
-            polygon=polygon,
-        )
-
-    for installation_code, role_name, access_level in default_access_roles:
-        add_access_role_to_database(
-            backend_url=backend_url,
-            access_level=access_level,
-            installation_code=installation_code,
-            role_name=role_name,
-        )
-
+    seed_flotilla(backend_url)
+
+
+def mission_runs_source(backend_url: str, mission_run_ids: Iterable[str]) -> Source:
+    """The mission runs, fetched together once per tick as a FleetSnapshot."""
+    ids: Tuple[str, ...] = tuple(sorted(set(mission_run_ids)))
+    return Source(
+        key=("mission_runs", backend_url, ids),
+        fetch=lambda: take_fleet_snapshot(
+            backend_url, mission_run_ids=ids, include_robots=False
+        ),
+        description=f"mission runs {', '.join(ids)}",
+        activity=[mission_runs_activity(backend_url)]
+        + [
+            mission_runs_activity(backend_url, mission_run_id) for mission_run_id in ids
+        ],
+    )
 
-def wait_for_database_to_be_populated(backend_url: str, timeout: int = 60) -> None:
-    start_time: datetime = datetime.now()
-    while True:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Database is not populated within the given timeout {timeout} seconds"
-            )
 
-        try:
-            installations: List[Dict] = _list_database_entries(
-                backend_url=backend_url, request_path="installations"
-            )
-            plants: List[Dict] = _list_database_entries(
-                backend_url=backend_url, request_path="plants"
-            )
-            inspection_areas: List[Dict] = _list_database_entries(
-                backend_url=backend_url, request_path="inspectionAreas"
-            )
-            access_roles: List[Dict] = _list_database_entries(
-                backend_url=backend_url, request_path="access-roles"
-            )
-        except Exception:
-            logger.warning(
-                "Database has not been populated yet, will retry until timeout..."
-            )
-            time.sleep(1)
-            continue
+def robots_source(backend_url: str) -> Source:
+    """Every robot, listed once per tick however many robots are waited on."""
+    return Source(
+        key=("robots", backend_url),
+        fetch=lambda: take_fleet_snapshot(backend_url),
+        description="robots",
+        activity=[robots_activity(backend_url)],
+    )
 
-        if (
-            len(installations) == len(default_installations)
-            and len(plants) == len(default_plants)
-            and len(inspection_areas) == len(default_inspection_areas)
-            and len(access_roles) == len(default_access_roles)
-        ):
-            logger.info(
-                "Database has been populated with default installations, plants, inspection areas and access roles"
-            )
-            return
 
+def mission_run_has_status(
+    backend_url: str,
+    mission_run_id: str,
+    expected_status: str,
+    source: Optional[Source] = None,
+) -> Expectation:
+    """Met by the mission run, once it has *expected_status*.
+
+    Pass a mission_runs_source() shared by the expectations on several runs to
+    fetch them together.
+    """
 
-def setup_robot_in_flotilla(backend_url: str, robot_name: str) -> Tuple[str, str]:
+    def mission_run(snapshot: FleetSnapshot) -> Dict:
+        return snapshot.mission_run(mission_run_id) or {}
 
-    wait_for_robot_to_be_populated_in_database(
-        backend_url=backend_url,
-        robot_name=robot_name,
-    )
-    robot: Dict = get_robot_by_name(
-        backend_url=backend_url,
-        name=robot_name,
-    )
-    installation_code_for_robot: str = robot.get("currentInstallation").get(
-        "installationCode"
+    return Expectation(
+        description=f"Mission run '{mission_run_id}' has status '{expected_status}'",
+        source=source or mission_runs_source(backend_url, [mission_run_id]),
+        predicate=lambda snapshot: mission_run(snapshot).get("status")
+        == expected_status,
+        result=mission_run,
+        show=lambda snapshot: mission_run(snapshot).get("status"),
     )
-    robot_id: str = robot.get("id")
 
-    inspection_area_id: str = get_inspection_area_id_for_installation(
-        backend_url=backend_url,
-        installation_code=installation_code_for_robot,
-    )
 
-    set_current_inspection_area_for_robot(
-        backend_url=backend_url,
-        inspection_area_id=inspection_area_id,
-        robot_id=robot_id,
-    )
-    wait_for_inspection_area_to_be_updated_on_robot(
-        backend_url=backend_url, robot_id=robot_id
+def second_task_has_status(
+    backend_url: str, mission_run_id: str, expected_status: str
+) -> Expectation:
+    """Met by the second task of the mission run, once it has *expected_status*."""
+
+    def second_task(snapshot: FleetSnapshot) -> Dict:
+        mission_run: Dict = snapshot.mission_run(mission_run_id) or {}
+        tasks: List[Dict] = mission_run.get("tasks") or []
+        return tasks[1] if len(tasks) > 1 else {}
+
+    return Expectation(
+        description=(
+            f"Second task in mission run '{mission_run_id}' has status '{expected_status}'"
+        ),
+        source=mission_runs_source(backend_url, [mission_run_id]),
+        predicate=lambda snapshot: second_task(snapshot).get("status")
+        == expected_status,
+        result=second_task,
+        show=lambda snapshot: second_task(snapshot).get("status"),
     )
-    return robot_id, installation_code_for_robot
 
 
-def wait_for_inspection_area_to_be_updated_on_robot(
-    backend_url: str, robot_id: str, timeout: int = 60
-) -> None:
-    start_time: datetime = datetime.now()
-    while True:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Inspection area on robot {robot_id} is not updated within the given timeout {timeout} seconds"
-            )
-
-        try:
-            robot: Dict = requests.get(
-                f"{backend_url}/robots/{robot_id}",
-                headers=_add_headers(),
-            ).json()
-        except Exception:
-            logger.warning(
-                f"Failed to retrieve robot with ID {robot_id}, will retry until timeout..."
-            )
-            time.sleep(1)
-            continue
+def robot_has_status(
+    backend_url: str,
+    robot_name: str,
+    expected_status: str,
+    after: Optional[Expectation] = None,
+) -> Expectation:
+    """Met by the robot, once it has *expected_status*."""
+
+    def robot(snapshot: FleetSnapshot) -> Dict:
+        return snapshot.robot(robot_name) or {}
+
+    return Expectation(
+        description=f"Robot '{robot_name}' has status '{expected_status}'",
+        source=robots_source(backend_url),
+        predicate=lambda snapshot: robot(snapshot).get("status") == expected_status,
+        result=robot,
+        show=lambda snapshot: robot(snapshot).get("status"),
+        after=after,
+    )
 
-        if robot.get("currentInspectionAreaId") is not None:
-            logger.info(
-                f"Inspection area on robot {robot_id} has been updated to {robot.get('currentInspectionArea')}"
-            )
-            return
-        else:
-            logger.info(f"Inspection area on robot {robot_id} is not updated yet")
-            time.sleep(1)
-            continue
 
+def robot_is_registered(backend_url: str, robot_name: str) -> Expectation:
+    """Met by the robot, once it has registered itself with Flotilla."""
+    return Expectation(
+        description=f"Robot '{robot_name}' is populated in the database",
+        source=robots_source(backend_url),
+        predicate=lambda snapshot: snapshot.robot(robot_name) is not None,
+        result=lambda snapshot: snapshot.robot(robot_name),
+        show=lambda snapshot: (snapshot.robot(robot_name) or {}).get("status"),
+    )
 
-def wait_for_robot_to_be_populated_in_database(
-    backend_url: str, robot_name: str, timeout: int = 60
-) -> None:
-    start_time: datetime = datetime.now()
-    while True:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Robot '{robot_name}' was not populated in the database within the given timeout {timeout} seconds"
-            )
 
-        try:
-            robot: Dict = get_robot_by_name(backend_url=backend_url, name=robot_name)
-        except Exception:
-            logger.warning(f"Failed to retrieve robot {robot_name} from the database")
-            time.sleep(1)
-            continue
+def robot_has_inspection_area(backend_url: str, robot_name: str) -> Expectation:
+    """Met by the robot, once it has a current inspection area."""
 
-        if robot.get("name") == robot_name:
-            logger.info(
-                f"Robot with name '{robot_name}' has been populated in the database"
-            )
-            return
+    def robot(snapshot: FleetSnapshot) -> Dict:
+        return snapshot.robot(robot_name) or {}
 
-        logger.info(
-            f"Robot with name '{robot_name}' is not populated in the database yet"
-        )
-        time.sleep(1)
-        continue
+    return Expectation(
+        description=f"Inspection area on robot '{robot_name}' is updated",
+        source=robots_source(backend_url),
+        predicate=lambda snapshot: robot(snapshot).get("currentInspectionAreaId")
+        is not None,
+        result=robot,
+        show=lambda snapshot: robot(snapshot).get("currentInspectionAreaId"),
+    )
 
 
 def wait_for_mission_run_status(
     backend_url: str, mission_run_id: str, expected_status: str, timeout: int = 60
 ) -> Dict:
-    start_time: datetime = datetime.now()
-    while True:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Mission run '{mission_run_id}' did not reach status '{expected_status}' within the given timeout "
-                f"{timeout} seconds"
-            )
-
-        try:
-            mission_run: Dict = get_mission_run_by_id(
-                backend_url=backend_url, mission_run_id=mission_run_id
-            )
-        except Exception:
-            logger.warning(
-                f"Failed to retrieve mission run with ID {mission_run_id}, most likely because it has not been written "
-                f"to the database yet, will retry..."
-            )
-            time.sleep(1)
-            continue
-
-        current_status: str = mission_run.get("status")
-        if current_status == expected_status:
-            logger.info(
-                f"Mission run with ID '{mission_run_id}' has reached expected status '{expected_status}'"
-            )
-            return mission_run
-        else:
-            logger.info(
-                f"Mission run with ID '{mission_run_id}' is in status '{current_status}', "
-                f"waiting for status '{expected_status}'"
-            )
-            time.sleep(1)
-            continue
+    expectation = mission_run_has_status(backend_url, mission_run_id, expected_status)
+    return wait_for([expectation], timeout=timeout)[expectation]
 
 
 def wait_for_second_task_status_of_mission_run(
     backend_url: str, mission_run_id: str, expected_status: str, timeout: int = 60
 ) -> Dict:
-    start_time: datetime = datetime.now()
-    while True:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Second task in mission with ID '{mission_run_id}' did not reach status '{expected_status}' within the given timeout "
-                f"{timeout} seconds"
-            )
-
-        try:
-            mission_run: Dict = get_mission_run_by_id(
-                backend_url=backend_url, mission_run_id=mission_run_id
-            )
-        except Exception:
-            logger.warning(
-                f"Failed to retrieve mission run with ID {mission_run_id}, most likely because it has not been written "
-                f"to the database yet, will retry..."
-            )
-            time.sleep(1)
-            continue
-
-        tasks: List = mission_run.get("tasks")
-        first_task_status: str = tasks[1].get("status")
-        if first_task_status == expected_status:
-            logger.info(
-                f"Second task in mission with ID '{mission_run_id}' has reached expected status '{expected_status}'"
-            )
-            return tasks[1]
-        else:
-            logger.info(
-                f"Second task in mission run with ID '{mission_run_id}' is in status '{first_task_status}', "
-                f"waiting for status '{expected_status}'"
-            )
-            time.sleep(1)
-            continue
+    expectation = second_task_has_status(backend_url, mission_run_id, expected_status)
+    return wait_for([expectation], timeout=timeout)[expectation]
 
 
 def wait_for_robot_status(
     backend_url: str, robot_name: str, expected_status: str, timeout: int = 60
 ) -> Dict:
-    start_time: datetime = datetime.now()
-    while True:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Robot '{robot_name}' did not reach status '{expected_status}' within the given timeout {timeout} seconds"
-            )
-
-        try:
-            robot: Dict = get_robot_by_name(backend_url=backend_url, name=robot_name)
-        except Exception:
-            logger.warning(
-                f"Failed to retrieve robot with name {robot_name}, will retry until timeout..."
-            )
-            time.sleep(1)
-            continue
-
-        current_status: str = robot.get("status")
-        if current_status == expected_status:
-            logger.info(
-                f"Robot with name '{robot_name}' has reached expected status '{expected_status}'"
-            )
-            return robot
-        else:
-            logger.info(
-                f"Robot with name '{robot_name}' is in status '{current_status}', waiting for status '{expected_status}'"
-            )
-            time.sleep(1)
-            continue
+    expectation = robot_has_status(backend_url, robot_name, expected_status)
+    return wait_for([expectation], timeout=timeout)[expectation]
 
 
 def wait_for_all_mission_run_statuses(
@@ -627,53 +397,26 @@ def wait_for_all_mission_run_statuses(
     mission_run_expectations: Dict[str, str],
     timeout: int = 60,
 ) -> Dict[str, Dict]:
-    """Poll all mission runs in a single loop until each reaches its expected
-    status, or *timeout* seconds have elapsed.
+    """Wait until each mission run reaches its expected status, or *timeout*
+    seconds have elapsed.
 
     *mission_run_expectations* maps mission-run IDs to their expected status
     strings, e.g. ``{"run-1": "Successful", "run-2": "Failed"}``.
 
     Returns a dict mapping each mission-run ID to its final mission-run dict.
     """
-    remaining: Dict[str, str] = dict(mission_run_expectations)
-    results: Dict[str, Dict] = {}
-    start_time: datetime = datetime.now()
-
-    while remaining:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Mission runs did not reach expected statuses within {timeout}s. "
-                f"Still waiting for: {remaining}"
-            )
-
-        for mission_run_id, expected_status in list(remaining.items()):
-            try:
-                mission_run: Dict = get_mission_run_by_id(
-                    backend_url=backend_url, mission_run_id=mission_run_id
-                )
-            except Exception:
-                logger.warning(
-                    f"Failed to retrieve mission run {mission_run_id}, will retry..."
-                )
-                continue
-
-            current_status: str = mission_run.get("status")
-            if current_status == expected_status:
-                logger.info(
-                    f"Mission run '{mission_run_id}' reached expected status '{expected_status}'"
-                )
-                results[mission_run_id] = mission_run
-                del remaining[mission_run_id]
-            else:
-                logger.info(
-                    f"Mission run '{mission_run_id}' is in status '{current_status}', "
-                    f"waiting for '{expected_status}'"
-                )
-
-        if remaining:
-            time.sleep(1)
-
-    return results
+    source: Source = mission_runs_source(backend_url, mission_run_expectations)
+    expectations: Dict[str, Expectation] = {
+        mission_run_id: mission_run_has_status(
+            backend_url, mission_run_id, expected_status, source=source
+        )
+        for mission_run_id, expected_status in mission_run_expectations.items()
+    }
+    results = wait_for(expectations.values(), timeout=timeout)
+    return {
+        mission_run_id: results[expectation]
+        for mission_run_id, expectation in expectations.items()
+    }
 
 
 def wait_for_all_robot_statuses(
@@ -681,92 +424,28 @@ def wait_for_all_robot_statuses(
     robot_status_expectations: Dict[str, str],
     timeout: int = 60,
 ) -> Dict[str, Dict]:
-    """Poll all robots in a single loop until each reaches its expected status,
-    or *timeout* seconds have elapsed.
+    """Wait until each robot reaches its expected status, or *timeout* seconds
+    have elapsed.
 
     *robot_status_expectations* maps robot names to their expected status
     strings, e.g. ``{"RobotA": "Home", "RobotB": "InterventionNeeded"}``.
 
     Returns a dict mapping each robot name to its final robot dict.
     """
-    remaining: Dict[str, str] = dict(robot_status_expectations)
-    results: Dict[str, Dict] = {}
-    start_time: datetime = datetime.now()
-
-    while remaining:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            raise RuntimeError(
-                f"Robots did not reach expected statuses within {timeout}s. "
-                f"Still waiting for: {remaining}"
-            )
-
-        for robot_name, expected_status in list(remaining.items()):
-            try:
-                robot: Dict = get_robot_by_name(
-                    backend_url=backend_url, name=robot_name
-                )
-            except Exception:
-                logger.warning(
-                    f"Failed to retrieve robot '{robot_name}', will retry..."
-                )
-                continue
-
-            current_status: str = robot.get("status")
-            if current_status == expected_status:
-                logger.info(
-                    f"Robot '{robot_name}' reached expected status '{expected_status}'"
-                )
-                results[robot_name] = robot
-                del remaining[robot_name]
-            else:
-                logger.info(
-                    f"Robot '{robot_name}' is in status '{current_status}', "
-                    f"waiting for '{expected_status}'"
-                )
-
-        if remaining:
-            time.sleep(1)
-
-    return results
+    expectations: Dict[str, Expectation] = {
+        robot_name: robot_has_status(backend_url, robot_name, expected_status)
+        for robot_name, expected_status in robot_status_expectations.items()
+    }
+    results = wait_for(expectations.values(), timeout=timeout)
+    return {
+        robot_name: results[expectation]
+        for robot_name, expectation in expectations.items()
+    }
 
 
 def pause_mission(backend_url: str, robot_id: str) -> None:
-    url: str = f"{backend_url}/robots/{robot_id}/pause"
-    response: Response = requests.post(
-        url,
-        headers=_add_headers(),
-    )
-    if not response.ok:
-        body = response.text
-        try:
-            problem = response.json()
-        except Exception:
-            problem = None
-        raise AssertionError(
-            f"POST {url} returned {response.status_code}\n"
-            f"Response headers: {dict(response.headers)}\n"
-            f"Response body:\n{body}\n"
-            f"Parsed JSON (if any):\n{problem}"
-        )
-    response.raise_for_status()
+    flotilla_client(backend_url).post(f"robots/{robot_id}/pause")
 
 
 def resume_mission(backend_url: str, robot_id: str) -> None:
-    url = str(f"{backend_url}/robots/{robot_id}/resume")
-    response: Response = requests.post(
-        url,
-        headers=_add_headers(),
-    )
-    if not response.ok:
-        body = response.text
-        try:
-            problem = response.json()
-        except Exception:
-            problem = None
-        raise AssertionError(
-            f"POST {url} returned {response.status_code}\n"
-            f"Response headers: {dict(response.headers)}\n"
-            f"Response body:\n{body}\n"
-            f"Parsed JSON (if any):\n{problem}"
-        )
-    response.raise_for_status()
+    flotilla_client(backend_url).post(f"robots/{robot_id}/resume")
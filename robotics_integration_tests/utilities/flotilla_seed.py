@@ -0,0 +1,122 @@
+"""Seed Flotilla with the reference data the tests expect.
+
+What to create is declared in custom_seeds/flotilla.json, or the file named by
+FLOTILLA_SEED_FILE: installations, plants, inspection areas and access roles,
+each entry being the body of the matching create request. An inspection area
+without an areaPolygon gets the file's defaultAreaPolygon.
+
+Each collection only refers to collections in earlier levels, so the seeder
+creates a level's entries all at once, FLOTILLA_API_CONCURRENCY at a time, and
+checks every entry against what Flotilla answered with before starting the next
+level. Nothing is listed or polled afterwards.
+"""
+
+import contextvars
+import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.backend_client import (
+    BackendClient,
+    backend_client,
+)
+
+_SEED_DIR = Path(__file__).resolve().parent.parent / "custom_seeds"
+
+# (key in the seed file, path to POST to), in the order the levels are created.
+_LEVELS: Tuple[Tuple[Tuple[str, str], ...], ...] = (
+    (("installations", "installations"),),
+    (("plants", "plants"),),
+    (("inspectionAreas", "inspectionAreas"), ("accessRoles", "access-roles")),
+)
+
+
+class FlotillaSeed:
+    def __init__(self, collections: Dict[str, List[Dict]]) -> None:
+        self.collections: Dict[str, List[Dict]] = collections
+
+    def count(self, collection: str) -> int:
+        return len(self.collections.get(collection, []))
+
+
+def load_flotilla_seed(path: Optional[str] = None) -> FlotillaSeed:
+    seed_file: Path = Path(
+        path or settings.FLOTILLA_SEED_FILE or _SEED_DIR / "flotilla.json"
+    )
+    spec: Dict[str, Any] = json.loads(seed_file.read_text(encoding="utf-8"))
+
+    polygon: Optional[Dict] = spec.get("defaultAreaPolygon")
+    collections: Dict[str, List[Dict]] = {}
+    for level in _LEVELS:
+        for collection, _ in level:
+            collections[collection] = [
+                dict(entry) for entry in spec.get(collection, [])
+            ]
+    for inspection_area in collections["inspectionAreas"]:
+        if "areaPolygon" not in inspection_area:
+            if polygon is None:
+                raise ValueError(
+                    f"Inspection area '{inspection_area.get('name')}' in {seed_file} "
+                    "has no areaPolygon and the file no defaultAreaPolygon"
+                )
+            inspection_area["areaPolygon"] = polygon
+    return FlotillaSeed(collections)
+
+
+def seed_flotilla(backend_url: str, seed: Optional[FlotillaSeed] = None) -> None:
+    seed = seed or load_flotilla_seed()
+    client: BackendClient = backend_client(backend_url, settings.FLOTILLA_SCOPE)
+
+    with ThreadPoolExecutor(
+        max_workers=settings.FLOTILLA_API_CONCURRENCY,
+        thread_name_prefix="flotilla-seed",
+    ) as executor:
+        for level in _LEVELS:
+            # Each create authenticates with the issuer of the calling thread.
+            futures: List[Tuple[str, Dict, Future]] = [
+                (
+                    collection,
+                    entry,
+                    executor.submit(
+                        contextvars.copy_context().run, client.post, path, entry
+                    ),
+                )
+                for collection, path in level
+                for entry in seed.collections[collection]
+            ]
+            for collection, entry, future in futures:
+                _verify_created(collection, entry, future.result())
+
+    logger.info(
+        "Seeded Flotilla with "
+        + ", ".join(
+            f"{seed.count(collection)} {collection}"
+            for level in _LEVELS
+            for collection, _ in level
+        )
+    )
+
+
+def _verify_created(collection: str, entry: Dict, created: Optional[Any]) -> None:
+    """Check that Flotilla created what was asked for, as far as it echoes it."""
+    if not isinstance(created, dict) or "id" not in created:
+        raise RuntimeError(
+            f"Flotilla did not return the created entry for {collection} {entry}: "
+            f"{created}"
+        )
+    mismatched: List[str] = [
+        key
+        for key, value in entry.items()
+        if isinstance(value, str)
+        and isinstance(created.get(key), str)
+        and created[key].lower() != value.lower()
+    ]
+    if mismatched:
+        raise RuntimeError(
+            f"Flotilla created {collection} entry {created} "
+            f"differing from {entry} in {', '.join(mismatched)}"
+        )
@@ -0,0 +1,238 @@
+"""Wake the waits on Flotilla when it pushes a mission run or robot update.
+
+Flotilla sends every change to a mission run or robot to its frontend over
+SignalR. A subscriber follows that hub as the integration tests app and reports
+each push to the wait engine as activity on the mission run or the robots it
+is about, so the waits on them fetch again as soon as Flotilla announces a
+transition rather than at their next interval. The waits still fetch what they
+assert on from the REST API; a push only says when to look.
+
+The subscriber also notes when each mission run status was first pushed, by
+the host's clock. status_pushed_at() gives that time, which, compared with
+when ISAR reported the transition, e.g. a log event of it, is Flotilla's own
+notification latency.
+
+The client uses SignalR's Server-Sent Events transport with the JSON protocol,
+which needs nothing beyond requests; none of the dependencies is a SignalR or
+WebSocket client.
+"""
+
+import contextvars
+import json
+import threading
+import time
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import requests
+from loguru import logger
+
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.authentication import (
+    retrieve_access_token_for_integration_tests_app,
+)
+from robotics_integration_tests.utilities.wait_engine import report_activity
+
+# The hub methods Flotilla invokes on its clients, by what they carry.
+_MISSION_RUN_TARGETS: Tuple[str, ...] = ("Mission run created", "Mission run updated")
+_ROBOT_TARGETS: Tuple[str, ...] = ("Robot added", "Robot updated")
+
+# SignalR's record separator and message types.
+_RECORD_SEPARATOR = "\x1e"
+_INVOCATION = 1
+_PING = 6
+_CLOSE = 7
+
+# The server pings every 15 seconds; a stream silent for longer than this is dead.
+_READ_TIMEOUT = 35.0
+_RECONNECT_DELAY_SECONDS = 2.0
+
+
+class FlotillaSignalR:
+    def __init__(self, backend_url: str) -> None:
+        self.backend_url: str = backend_url.rstrip("/")
+        self.hub_url: str = f"{self.backend_url}/{settings.FLOTILLA_SIGNALR_HUB_PATH}"
+        self._stopped: threading.Event = threading.Event()
+        self._session: requests.Session = requests.Session()
+        self._thread: Optional[threading.Thread] = None
+        self._lock: threading.Lock = threading.Lock()
+        # (mission run ID, status) -> time.time() it was first pushed
+        self._pushed: Dict[Tuple[str, str], float] = {}
+
+    def status_pushed_at(self, mission_run_id: str, status: str) -> Optional[float]:
+        """The time.time() *status* of the mission run was first pushed, if it was."""
+        with self._lock:
+            return self._pushed.get((mission_run_id, status))
+
+    def forget_pushed_statuses(self) -> None:
+        with self._lock:
+            self._pushed.clear()
+
+    def start(self) -> "FlotillaSignalR":
+        # The subscription authenticates with the issuer of the starting thread.
+        context: contextvars.Context = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=context.run,
+            args=(self._run,),
+            name=f"flotilla-signalr-{self.backend_url}",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._session.close()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._connect_and_follow()
+            except Exception as e:
+                if self._stopped.is_set():
+                    return
+                logger.warning(f"Lost Flotilla's SignalR hub, reconnecting: {e}")
+            self._stopped.wait(_RECONNECT_DELAY_SECONDS)
+
+    def _connect_and_follow(self) -> None:
+        headers: Dict[str, str] = {
+            "Authorization": "Bearer "
+            + retrieve_access_token_for_integration_tests_app(settings.FLOTILLA_SCOPE)
+        }
+        negotiated: requests.Response = self._session.post(
+            f"{self.hub_url}/negotiate",
+            params={"negotiateVersion": 1},
+            headers=headers,
+            timeout=(3.05, 10),
+        )
+        negotiated.raise_for_status()
+        negotiation: Dict = negotiated.json()
+        connection: Dict[str, str] = {
+            "id": negotiation.get("connectionToken") or negotiation["connectionId"]
+        }
+
+        with self._session.get(
+            self.hub_url,
+            params=connection,
+            headers={**headers, "Accept": "text/event-stream"},
+            stream=True,
+            timeout=(3.05, _READ_TIMEOUT),
+        ) as stream:
+            stream.raise_for_status()
+            self._send(connection, headers, {"protocol": "json", "version": 1})
+            for message in _messages(stream):
+                if self._stopped.is_set():
+                    return
+                if "type" not in message:
+                    # The handshake response; an error in it ends the connection.
+                    if message.get("error"):
+                        raise ValueError(
+                            f"SignalR handshake failed: {message['error']}"
+                        )
+                    logger.debug(f"Subscribed to SignalR hub {self.hub_url}")
+                elif message["type"] == _PING:
+                    # Flotilla drops a client it has not heard from in 30 seconds.
+                    self._send(connection, headers, {"type": _PING})
+                elif message["type"] == _INVOCATION:
+                    self._on_invocation(message)
+                elif message["type"] == _CLOSE:
+                    raise ValueError(f"SignalR hub closed: {message.get('error')}")
+
+    def _send(self, connection: Dict[str, str], headers: Dict[str, str], message: Dict):
+        self._session.post(
+            self.hub_url,
+            params=connection,
+            headers=headers,
+            data=json.dumps(message) + _RECORD_SEPARATOR,
+            timeout=(3.05, 10),
+        ).raise_for_status()
+
+    def _on_invocation(self, message: Dict) -> None:
+        target: str = message.get("target", "")
+        if target not in _MISSION_RUN_TARGETS + _ROBOT_TARGETS:
+            return
+        # Flotilla sends the response model serialised as the last argument.
+        arguments: List[Any] = message.get("arguments") or []
+        payload: Any = arguments[-1] if arguments else None
+        if isinstance(payload, str):
+            payload = json.loads(payload)
+        if not isinstance(payload, dict) or "id" not in payload:
+            return
+
+        if target in _MISSION_RUN_TARGETS and payload.get("status"):
+            with self._lock:
+                self._pushed.setdefault((payload["id"], payload["status"]), time.time())
+        report_activity(
+            mission_runs_activity(self.backend_url, payload["id"])
+            if target in _MISSION_RUN_TARGETS
+            else robots_activity(self.backend_url)
+        )
+
+
+def _messages(stream: requests.Response) -> Iterator[Dict]:
+    """The SignalR messages in a Server-Sent Events stream."""
+    data: List[str] = []
+    # Kestrel sends each event as its own chunk; read them as they come.
+    for line in stream.iter_lines(chunk_size=None, decode_unicode=True):
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+            continue
+        if line or not data:
+            continue
+        for record in "\n".join(data).split(_RECORD_SEPARATOR):
+            if record.strip():
+                yield json.loads(record)
+        data = []
+
+
+def robots_activity(backend_url: str) -> Hashable:
+    """The key of report_activity() on the backend's robots."""
+    return ("flotilla robots", backend_url.rstrip("/"))
+
+
+def mission_runs_activity(
+    backend_url: str, mission_run_id: Optional[str] = None
+) -> Hashable:
+    """The key of report_activity() on one of the backend's mission runs, or on
+    any of them when it is not known which."""
+    return ("flotilla mission runs", backend_url.rstrip("/"), mission_run_id)
+
+
+_lock: threading.Lock = threading.Lock()
+_subscribers: Dict[str, FlotillaSignalR] = {}
+
+
+def start_signalr_subscriber(backend_url: str) -> FlotillaSignalR:
+    subscriber = FlotillaSignalR(backend_url).start()
+    with _lock:
+        _subscribers[subscriber.backend_url] = subscriber
+    return subscriber
+
+
+def stop_signalr_subscriber(backend_url: str) -> None:
+    with _lock:
+        subscriber = _subscribers.pop(backend_url.rstrip("/"), None)
+    if subscriber is not None:
+        subscriber.stop()
+
+
+def signalr_subscriber(backend_url: str) -> Optional[FlotillaSignalR]:
+    """The subscriber following *backend_url*, if one was started."""
+    with _lock:
+        return _subscribers.get(backend_url.rstrip("/"))
+
+
+def status_pushed_at(
+    backend_url: str, mission_run_id: str, status: str
+) -> Optional[float]:
+    """When Flotilla pushed *status* of the mission run; see FlotillaSignalR.
+
+    None when it has not, or when no subscriber follows *backend_url*.
+    """
+    subscriber: Optional[FlotillaSignalR] = signalr_subscriber(backend_url)
+    if subscriber is None:
+        return None
+    return subscriber.status_pushed_at(mission_run_id, status)
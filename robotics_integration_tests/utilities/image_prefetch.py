@@ -0,0 +1,159 @@
+"""Pull the images of the stack in the background, all at once.
+
+The session does not wait for the pulls: each container waits only for its own
+image, with wait_for_image(), right before it is created. An image is not pulled
+when this host pulled it within IMAGE_PULL_FRESHNESS_SECONDS, nor when the local
+copy already has the registry's digest for its tag; a tag is only ever looked up,
+never downloaded, unless it has moved.
+"""
+
+import hashlib
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+import docker
+from docker.errors import APIError, ImageNotFound
+from loguru import logger
+
+from robotics_integration_tests.custom_containers.image_builder import host_lock
+from robotics_integration_tests.settings.settings import settings
+
+
+def stack_images() -> Dict[str, Optional[str]]:
+    """Every pulled image of the stack, with the platform it runs as.
+
+    Images that are run with platform="linux/amd64" are pulled for that platform
+    so that Docker fetches the correct manifest on Apple Silicon hosts instead of
+    silently falling back to a stale cached image.
+    """
+    return {
+        settings.FLOTILLA_BACKEND_IMAGE: "linux/amd64",
+        settings.FLOTILLA_BROKER_IMAGE: "linux/amd64",
+        settings.ISAR_ROBOT_IMAGE: "linux/amd64",
+        settings.SARA_IMAGE: "linux/amd64",
+        settings.POSTGRESQL_IMAGE: None,
+        settings.AZURITE_IMAGE: None,
+        settings.KEYCLOAK_IMAGE: None,
+    }
+
+
+class ImagePrefetcher:
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self, images: Dict[str, Optional[str]]) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(len(images), 1), thread_name_prefix="image-prefetch"
+                )
+            for image, platform in images.items():
+                if image not in self._futures:
+                    self._futures[image] = self._executor.submit(
+                        _pull_if_stale, image, platform
+                    )
+
+    def wait_for(self, image: str) -> None:
+        with self._lock:
+            future: Optional[Future] = self._futures.get(image)
+        if future is None:
+            return
+
+        start_time: float = time.monotonic()
+        error: Optional[BaseException] = future.exception()
+        waited: float = time.monotonic() - start_time
+        if error is not None:
+            logger.warning(f"Prefetching {image} failed: {error}")
+        if waited > 1:
+            logger.info(f"Waited {waited:.1f}s for {image} to be pulled")
+
+
+_prefetcher: ImagePrefetcher = ImagePrefetcher()
+
+
+def prefetch_images(images: Optional[Dict[str, Optional[str]]] = None) -> None:
+    """Start pulling *images*, or those of the whole stack, without blocking."""
+    _prefetcher.start(stack_images() if images is None else images)
+
+
+def wait_for_image(image: str) -> None:
+    """Block until a prefetch of *image*, if one was started, has finished.
+
+    Never raises: a failed pull has been logged, and starting the container with
+    whatever is cached fails as clearly as it did before prefetching.
+    """
+    _prefetcher.wait_for(image)
+
+
+def _pull_if_stale(image: str, platform: Optional[str]) -> None:
+    stamp: Path = _stamp_path(image, platform)
+
+    # One worker pulls while the rest wait, then find the stamp fresh.
+    with host_lock(f"pull-{stamp.stem}"):
+        client = docker.from_env()
+        if _is_fresh(stamp) and _local_digests(client, image):
+            logger.info(f"Not pulling {image}: pulled within the freshness window")
+            return
+
+        if _registry_digest(client, image, platform) in _local_digests(client, image):
+            logger.info(f"Not pulling {image}: the local copy is up to date")
+            stamp.touch()
+            return
+
+        logger.info(f"Pulling image{f' ({platform})' if platform else ''}: {image}")
+        platform_args = ["--platform", platform] if platform else []
+        result = subprocess.run(
+            ["docker", "pull", *platform_args, image],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            logger.warning(f"Failed to pull {image}: {result.stderr.strip()}")
+        else:
+            logger.info(f"Successfully pulled {image}")
+            stamp.touch()
+
+
+def _stamp_path(image: str, platform: Optional[str]) -> Path:
+    key: str = hashlib.sha256(f"{image}\0{platform or ''}".encode()).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / f"armada-pulled-{key}"
+
+
+def _is_fresh(stamp: Path) -> bool:
+    try:
+        age: float = time.time() - stamp.stat().st_mtime
+    except FileNotFoundError:
+        return False
+    return age < settings.IMAGE_PULL_FRESHNESS_SECONDS
+
+
+def _local_digests(client: docker.DockerClient, image: str) -> Set[str]:
+    try:
+        repo_digests = client.images.get(image).attrs.get("RepoDigests") or []
+    except ImageNotFound:
+        return set()
+    return {repo_digest.split("@", 1)[1] for repo_digest in repo_digests}
+
+
+def _registry_digest(
+    client: docker.DockerClient, image: str, platform: Optional[str]
+) -> Optional[str]:
+    """The digest the registry serves for *image*'s tag, or None if unknown.
+
+    The manifest list digest, which is what a pull by tag records locally.
+    """
+    try:
+        registry_data = client.images.get_registry_data(image)
+    except APIError as e:
+        logger.debug(f"Could not look up {image} in its registry: {e}")
+        return None
+    if platform and not registry_data.has_platform(platform):
+        return None
+    return registry_data.id
@@ -0,0 +1,109 @@
+"""Archive the output of the containers, one compressed file per test.
+
+Each test's archive is LOG_ARCHIVE_DIR/<test id>.log.gz: a line naming the test,
+then every line its containers printed while it ran, as
+
+    <time the line arrived> <container>: <line>
+
+Output printed outside of a test, such as by the stacks a pool builds between
+tests, goes to a session archive of the worker instead.
+
+The log collector's forwarder thread is the only writer. An archive is created
+on its first line and nothing is read back, unless a failure report asks for
+the tail of a test's output.
+"""
+
+import gzip
+import os
+import re
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable, Deque, Dict, List, Optional
+
+from robotics_integration_tests.settings.settings import settings
+
+# Cheap to write and still a tenth of the size: container output repeats itself.
+_COMPRESS_LEVEL = 1
+
+
+def archive_path(test_id: str, suffix: str = ".log.gz") -> Path:
+    file_name: str = re.sub(r"[^\w.-]+", "_", test_id)
+    return Path(settings.LOG_ARCHIVE_DIR) / f"{file_name}{suffix}"
+
+
+def session_test_id() -> str:
+    return f"session-{os.environ.get('PYTEST_XDIST_WORKER', 'main')}"
+
+
+class _Archive:
+    def __init__(self, test_id: str) -> None:
+        self.test_id: str = test_id
+        self.path: Path = archive_path(test_id)
+        self._file: Optional[IO[str]] = None
+        self._started: bool = False
+
+    def write(self, container: str, at: float, line: str) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Appending after close() adds a gzip member, which reads as one file.
+            self._file = gzip.open(
+                self.path,
+                "at" if self._started else "wt",
+                encoding="utf-8",
+                compresslevel=_COMPRESS_LEVEL,
+            )
+            if not self._started:
+                self._file.write(f"# Container output of {self.test_id}\n")
+                self._started = True
+        arrived: str = datetime.fromtimestamp(at).isoformat(timespec="milliseconds")
+        self._file.write(f"{arrived} {container}: {line}\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ArchiveSink:
+    """Where the collector writes each line: the running test's archive, if any."""
+
+    def __init__(self) -> None:
+        self._session: _Archive = _Archive(session_test_id())
+        self._test: Optional[_Archive] = None
+
+    def write(self, container: str, at: float, line: str) -> None:
+        (self._test or self._session).write(container, at, line)
+
+    def begin_test(self, test_id: str) -> None:
+        self.end_test()
+        self._test = _Archive(test_id)
+
+    def end_test(self) -> None:
+        if self._test is not None:
+            self._test.close()
+            self._test = None
+
+    def close(self, test_id: str) -> None:
+        """Complete the archive of *test_id* on disk, so that it can be read."""
+        for archive in (self._test, self._session):
+            if archive is not None and archive.test_id == test_id:
+                archive.close()
+
+
+def read_tail(
+    test_id: str, count: int, keep: Callable[[str], bool] = lambda container: True
+) -> Dict[str, List[str]]:
+    """The last *count* archived lines of each container that *keep* accepts."""
+    tails: Dict[str, Deque[str]] = {}
+    path: Path = archive_path(test_id)
+    if not path.exists():
+        return {}
+    with gzip.open(path, "rt", encoding="utf-8", errors="replace") as archive:
+        for line in archive:
+            _, _, rest = line.partition(" ")
+            container, separator, _ = rest.partition(": ")
+            if line.startswith("#") or not separator or not keep(container):
+                continue
+            tails.setdefault(container, deque(maxlen=count)).append(line.rstrip("\n"))
+    return {container: list(lines) for container, lines in tails.items()}
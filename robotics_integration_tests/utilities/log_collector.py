@@ -0,0 +1,507 @@
+"""Collect the output of every container through one thread per process.
+
+A container is attached as soon as it has started, with Docker replaying what
+it printed before. The collector thread reads every attached stream without
+blocking on any of them and splits Docker's multiplexed frames into lines. It
+keeps the last LOG_BUFFER_LINES of each container in a ring buffer, and puts the
+lines on a bounded queue that one forwarder thread drains into the compressed
+archive of the running test; see log_archive.py. A failing test's report gets
+the tail of its archive, from archived_output_tail().
+
+Only with LOG_CONTAINERS_TO_CONSOLE set do the lines also go to loguru, at up to
+LOG_FORWARD_LINES_PER_SECOND per container; beyond that, the number left out is
+logged instead.
+
+Lines are numbered from the container's start, which is what makes reading the
+output incremental:
+
+- A LogCursor returns only the lines printed since it last read.
+- A LogWatch is registered with a substring or regex. The collector tests each
+  line once against the watches of its container as it arrives, and on a match
+  wakes the wait engine; logged() turns a watch into an Expectation. Waiting on
+  a log line therefore never fetches nor rescans the output.
+
+Both only see what is still buffered: a line more than LOG_BUFFER_LINES back
+is gone by the time a cursor or watch starts from before it.
+"""
+
+import itertools
+import queue
+import selectors
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import docker
+from docker.errors import APIError
+from loguru import logger
+
+from robotics_integration_tests.settings.settings import settings
+from robotics_integration_tests.utilities.log_archive import ArchiveSink, read_tail
+from robotics_integration_tests.utilities.log_events import record_log_events
+from robotics_integration_tests.utilities.wait_engine import (
+    Expectation,
+    Source,
+    report_activity,
+)
+
+# Lines waiting for the forwarder, across all containers.
+_QUEUE_SIZE = 10_000
+
+_READ_SIZE = 64 * 1024
+
+# Docker prefixes each chunk of a non-TTY container's output with a header:
+# the stream (0 stdin, 1 stdout, 2 stderr), three zero bytes and the length.
+_HEADER_SIZE = 8
+
+_ATTACH_PARAMS: Dict[str, int] = {"stdout": 1, "stderr": 1, "stream": 1, "logs": 1}
+
+# A substring to look for, or a compiled regex to search with.
+LogPattern = Union[str, Pattern[str]]
+
+
+class LogWatch:
+    """The first line of a container's output to match a pattern, once it came."""
+
+    def __init__(self, pattern: LogPattern) -> None:
+        self.pattern: LogPattern = pattern
+        self.line: Optional[str] = None
+        self._matched: threading.Event = threading.Event()
+
+    def matches(self, line: str) -> bool:
+        if isinstance(self.pattern, str):
+            return self.pattern in line
+        return self.pattern.search(line) is not None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[str]:
+        """The matching line, or None if none came within *timeout*."""
+        self._matched.wait(timeout)
+        return self.line
+
+    def _match(self, line: str) -> None:
+        self.line = line
+        self._matched.set()
+
+
+class _Stream:
+    def __init__(
+        self, name: str, container_id: str, handle: Any, service: Optional[str] = None
+    ) -> None:
+        self.name: str = name
+        self.container_id: str = container_id
+        # Whose log events to recognise in the output; see log_events.py.
+        self.service: Optional[str] = service
+        # What docker-py returned; holds on to the response the socket belongs to.
+        self.handle: Any = handle
+        self.socket: socket.socket = getattr(handle, "_sock", handle)
+        self.lines: Deque[str] = deque(maxlen=settings.LOG_BUFFER_LINES)
+        # Lines received in all, so the number of the next one.
+        self.received: int = 0
+        self.watches: List[LogWatch] = []
+        self._frames: bytearray = bytearray()
+        self._partial: Dict[int, bytes] = {}
+        self._multiplexed: Optional[bool] = None
+        # Token bucket for forwarding, refilled per second.
+        self._tokens: float = settings.LOG_FORWARD_LINES_PER_SECOND
+        self._refilled_at: float = time.monotonic()
+        self.withheld: int = 0
+
+    def feed(self, data: bytes) -> List[str]:
+        """The complete lines in *data*, given what came before."""
+        if not data:
+            return []
+        if self._multiplexed is None:
+            # Tell by the first four bytes, which may come in more than one chunk.
+            self._frames += data
+            if len(self._frames) < 4:
+                return []
+            header: bytes = bytes(self._frames[:4])
+            self._multiplexed = header[0] in (0, 1, 2) and header[1:] == bytes(3)
+            data = bytes(self._frames)
+            self._frames.clear()
+        if not self._multiplexed:
+            return self._split(1, data)
+
+        self._frames += data
+        lines: List[str] = []
+        while len(self._frames) >= _HEADER_SIZE:
+            size: int = int.from_bytes(self._frames[4:_HEADER_SIZE], "big")
+            if len(self._frames) < _HEADER_SIZE + size:
+                break
+            kind: int = self._frames[0]
+            payload: bytes = bytes(self._frames[_HEADER_SIZE : _HEADER_SIZE + size])
+            del self._frames[: _HEADER_SIZE + size]
+            lines += self._split(kind, payload)
+        return lines
+
+    def flush(self) -> List[str]:
+        """Whatever is left of unterminated lines, once the stream has ended."""
+        if self._multiplexed is None and self._frames:
+            # Too little came to tell; it can only have been plain output.
+            self._split(1, bytes(self._frames))
+            self._frames.clear()
+        lines = [_decode(partial) for partial in self._partial.values() if partial]
+        self._partial.clear()
+        return lines
+
+    def since(self, position: int) -> List[str]:
+        """The buffered lines from number *position* on."""
+        skip: int = position - (self.received - len(self.lines))
+        if skip <= 0:
+            return list(self.lines)
+        return list(itertools.islice(self.lines, skip, None))
+
+    def may_forward(self) -> bool:
+        now: float = time.monotonic()
+        self._tokens = min(
+            settings.LOG_FORWARD_LINES_PER_SECOND,
+            self._tokens
+            + (now - self._refilled_at) * settings.LOG_FORWARD_LINES_PER_SECOND,
+        )
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _split(self, kind: int, data: bytes) -> List[str]:
+        *complete, rest = (self._partial.get(kind, b"") + data).split(b"\n")
+        self._partial[kind] = rest
+        return [_decode(line) for line in complete]
+
+
+def _decode(line: bytes) -> str:
+    return line.decode("utf-8", errors="replace").rstrip()
+
+
+class _LogCollector:
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wakeup: Tuple[socket.socket, socket.socket] = socket.socketpair()
+        self._to_register: List[_Stream] = []
+        # Container ID -> its stream; kept after the container stopped.
+        self._streams: Dict[str, _Stream] = {}
+        # (stream, time.time() it arrived, line), or (None, 0, task) to run in order.
+        self._queue: "queue.Queue[Tuple[Optional[_Stream], float, Any]]" = (
+            queue.Queue(_QUEUE_SIZE)
+        )
+        self._archive: ArchiveSink = ArchiveSink()
+
+    def attach(
+        self, name: str, container_id: str, service: Optional[str] = None
+    ) -> None:
+        api = docker.from_env().api
+        try:
+            handle: Any = api.attach_socket(container_id, params=_ATTACH_PARAMS)
+        except APIError:
+            # Already stopped; what it printed is all there is.
+            stream = _Stream(name, container_id, None, service)
+            output: bytes = api.logs(container_id, stdout=True, stderr=True)
+            with self._lock:
+                self._streams[container_id] = stream
+                self._ensure_started()
+            self._receive(stream, output)
+            self._end(stream)
+            return
+
+        stream = _Stream(name, container_id, handle, service)
+        stream.socket.setblocking(False)
+        with self._lock:
+            self._streams[container_id] = stream
+            self._to_register.append(stream)
+            self._ensure_started()
+        self._wakeup[1].send(b"\x00")
+
+    def recent_lines(
+        self, container_id: str, count: Optional[int] = None
+    ) -> List[str]:
+        """The last *count* lines the container printed, or all that are buffered."""
+        with self._lock:
+            stream: Optional[_Stream] = self._streams.get(container_id)
+            lines: List[str] = list(stream.lines) if stream is not None else []
+        return lines if count is None else lines[-count:]
+
+    def lines_since(self, container_id: str, position: int) -> Tuple[List[str], int]:
+        """The buffered lines from number *position* on, and the next line's number."""
+        with self._lock:
+            stream: Optional[_Stream] = self._streams.get(container_id)
+            if stream is None:
+                return [], position
+            return stream.since(position), stream.received
+
+    def position(self, container_id: str) -> int:
+        """The number of the next line the container prints."""
+        with self._lock:
+            stream: Optional[_Stream] = self._streams.get(container_id)
+            return stream.received if stream is not None else 0
+
+    def watch(self, container_id: str, watch: LogWatch, since: int) -> None:
+        """Match *watch* against the lines from number *since* on, and any to come."""
+        with self._lock:
+            stream: Optional[_Stream] = self._streams.get(container_id)
+            if stream is None:
+                raise ValueError(
+                    f"The output of container {container_id} is not being collected"
+                )
+            # Scanned once, under the lock, so that no line falls in between.
+            matched: Optional[str] = next(
+                (line for line in stream.since(since) if watch.matches(line)), None
+            )
+            if matched is None:
+                stream.watches.append(watch)
+        if matched is not None:
+            watch._match(matched)
+
+    def unwatch(self, container_id: str, watch: LogWatch) -> None:
+        with self._lock:
+            stream: Optional[_Stream] = self._streams.get(container_id)
+            if stream is not None and watch in stream.watches:
+                stream.watches.remove(watch)
+
+    def forget(self, container_id: str) -> None:
+        """Drop the buffer of a container that has been stopped."""
+        with self._lock:
+            self._streams.pop(container_id, None)
+
+    def _ensure_started(self) -> None:
+        if self._selector is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wakeup[0].setblocking(False)
+        self._selector.register(self._wakeup[0], selectors.EVENT_READ, None)
+        for target, name in (
+            (self._collect, "log-collector"),
+            (self._forward, "log-forwarder"),
+        ):
+            threading.Thread(target=target, name=name, daemon=True).start()
+
+    def _collect(self) -> None:
+        while True:
+            for key, _ in self._selector.select():
+                stream: Optional[_Stream] = key.data
+                if stream is None:
+                    self._register_new()
+                    continue
+                try:
+                    while True:
+                        data: bytes = stream.socket.recv(_READ_SIZE)
+                        if not data:
+                            self._end(stream)
+                            break
+                        self._receive(stream, data)
+                except (BlockingIOError, ssl.SSLWantReadError):
+                    continue
+                except OSError as e:
+                    logger.debug(f"Stopped reading the output of {stream.name}: {e}")
+                    self._end(stream)
+
+    def _register_new(self) -> None:
+        try:
+            while self._wakeup[0].recv(_READ_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            streams, self._to_register = self._to_register, []
+        for stream in streams:
+            self._selector.register(stream.socket, selectors.EVENT_READ, stream)
+
+    def _receive(self, stream: _Stream, data: bytes) -> None:
+        self._keep(stream, stream.feed(data))
+
+    def _end(self, stream: _Stream) -> None:
+        self._keep(stream, stream.flush())
+        if stream.handle is not None:
+            self._selector.unregister(stream.socket)
+            stream.handle.close()
+            stream.handle = None
+
+    def _keep(self, stream: _Stream, lines: List[str]) -> None:
+        matched: List[Tuple[LogWatch, str]] = []
+        with self._lock:
+            stream.lines.extend(lines)
+            stream.received += len(lines)
+            for line in lines:
+                if not stream.watches:
+                    break
+                for watch in [watch for watch in stream.watches if watch.matches(line)]:
+                    stream.watches.remove(watch)
+                    matched.append((watch, line))
+        for watch, line in matched:
+            watch._match(line)
+        if matched:
+            report_activity(*(watch for watch, _ in matched))
+        arrived: float = time.time()
+        if stream.service is not None:
+            record_log_events(stream.service, stream.name, arrived, lines)
+        for line in lines:
+            # Waits while the forwarder catches up, rather than lose lines.
+            self._queue.put((stream, arrived, line))
+
+    def in_order(self, task: Callable[[], Any]) -> None:
+        """Run *task* on the forwarder, after every line received so far."""
+        with self._lock:
+            started: bool = self._selector is not None
+        if not started:
+            task()
+            return
+        done: threading.Event = threading.Event()
+
+        def run() -> None:
+            try:
+                task()
+            finally:
+                done.set()
+
+        self._queue.put((None, 0.0, run))
+        done.wait()
+
+    def _forward(self) -> None:
+        while True:
+            stream, arrived, line = self._queue.get()
+            if stream is None:
+                line()
+                continue
+            try:
+                self._archive.write(stream.name, arrived, line)
+            except OSError as e:
+                logger.warning(f"Could not archive the output of {stream.name}: {e}")
+            if settings.LOG_CONTAINERS_TO_CONSOLE:
+                self._to_console(stream, line)
+
+    def _to_console(self, stream: _Stream, line: str) -> None:
+        if not stream.may_forward():
+            stream.withheld += 1
+            return
+        if stream.withheld:
+            logger.info(
+                f"{stream.name}: "
+                f"[{stream.withheld} lines not logged, over the rate limit]"
+            )
+            stream.withheld = 0
+        logger.info(f"{stream.name}: {line}")
+
+
+_collector: _LogCollector = _LogCollector()
+
+
+def attach_container_logs(
+    name: str, container_id: str, service: Optional[str] = None
+) -> None:
+    """Start collecting the output of a container that has just started."""
+    _collector.attach(name, container_id, service)
+
+
+def forget_container_logs(container_id: str) -> None:
+    _collector.forget(container_id)
+
+
+def recent_container_logs(container_id: str, count: Optional[int] = None) -> List[str]:
+    return _collector.recent_lines(container_id, count)
+
+
+class LogCursor:
+    """Reads a container's output a batch at a time, each line once."""
+
+    def __init__(self, container_id: str, position: int = 0) -> None:
+        self.container_id: str = container_id
+        # The number of the next line to read.
+        self.position: int = position
+
+    def read(self) -> List[str]:
+        """The lines printed since the last read, as far as they are still kept."""
+        lines, self.position = _collector.lines_since(self.container_id, self.position)
+        return lines
+
+
+def log_cursor(container_id: str, from_start: bool = False) -> LogCursor:
+    """A cursor at the container's next line, or at its first buffered one."""
+    return LogCursor(
+        container_id, 0 if from_start else _collector.position(container_id)
+    )
+
+
+def watch_container_logs(
+    container_id: str, pattern: LogPattern, from_start: bool = True
+) -> LogWatch:
+    """A watch for *pattern* in what the container printed, or only in what it
+    prints from now on."""
+    watch = LogWatch(pattern)
+    _collector.watch(
+        container_id, watch, 0 if from_start else _collector.position(container_id)
+    )
+    return watch
+
+
+def unwatch_container_logs(container_id: str, watch: LogWatch) -> None:
+    _collector.unwatch(container_id, watch)
+
+
+def logged(
+    name: str,
+    container_id: str,
+    pattern: LogPattern,
+    from_start: bool = True,
+    description: Optional[str] = None,
+) -> Expectation:
+    """Met once the container prints a line matching *pattern*; see LogWatch.
+
+    The watch is registered now, and unregistered once the wait_for() given the
+    expectation is done with it.
+    """
+    watch: LogWatch = watch_container_logs(container_id, pattern, from_start)
+    shown: str = pattern if isinstance(pattern, str) else pattern.pattern
+    return Expectation(
+        description=description or f"{name} logged: {shown}",
+        source=Source(
+            key=("log", container_id, id(watch)),
+            fetch=lambda: watch.line,
+            description=f"output of {name}",
+            activity=[watch],
+            close=lambda: unwatch_container_logs(container_id, watch),
+        ),
+        predicate=lambda line: line is not None,
+        show=lambda line: line if line is not None else "no matching line yet",
+    )
+
+
+def begin_test_output_archive(test_id: str) -> None:
+    """Archive the output of every container as that of *test_id*, until it ends."""
+    _collector.in_order(lambda: _collector._archive.begin_test(test_id))
+
+
+def end_test_output_archive() -> None:
+    _collector.in_order(_collector._archive.end_test)
+
+
+def archived_output_tail(test_id: str, stack_ids: Sequence[str] = ()) -> str:
+    """The last LOG_FAILURE_TAIL_LINES of each container archived for *test_id*.
+
+    With *stack_ids*, only the containers of those stacks, named <name>-<stack id>.
+    """
+    _collector.in_order(lambda: _collector._archive.close(test_id))
+    tails: Dict[str, List[str]] = read_tail(
+        test_id,
+        settings.LOG_FAILURE_TAIL_LINES,
+        keep=lambda container: not stack_ids
+        or any(container.endswith(f"-{stack_id}") for stack_id in stack_ids),
+    )
+    return "\n".join(
+        f"--- {container}, last {len(lines)} lines ---\n" + "\n".join(lines)
+        for container, lines in tails.items()
+    )
@@ -0,0 +1,260 @@
+"""Events of the services, as recognised in their output.
+
+Flotilla, SARA and ISAR log their state changes, MQTT messages and HTTP requests
+without being asked to. A container started with_log_events(<service>) has each
+line it prints tested against that service's rules below as the line arrives,
+and every match is kept as a LogEvent in one table per process: when the line
+arrived, the service and container, the kind of event, the ID it is about and
+the other named groups of the rule.
+
+The time is the host's clock when the collector received the line rather than
+the service's own, so events of different containers compare directly, e.g. in
+latency() from ISAR finishing a task to SARA receiving its inspection.
+
+Each test starts with an empty table and ends by exporting it next to its
+output archive, as LOG_ARCHIVE_DIR/<test id>.events.csv.
+
+The rules follow the wording of the services' log messages loosely, and are
+the place to adjust when a service rewords one; test_log_events.py holds a
+sample line for each. ASP.NET Core only logs "Request finished" with the
+Microsoft.AspNetCore.Hosting category at Information, which the Flotilla and
+SARA containers are started with.
+"""
+
+import csv
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from robotics_integration_tests.utilities.log_archive import archive_path
+
+FLOTILLA = "flotilla"
+SARA = "sara"
+ISAR = "isar"
+
+# An ID as the services print them, a GUID or ULID whole or shortened to its
+# first 8 characters; unlike a word, it has a digit in it.
+_ID = r"(?P<key>(?=[\w-]*\d)[0-9a-zA-Z][0-9a-zA-Z-]{7,35})"
+
+
+class EventRule:
+    def __init__(self, service: str, kind: str, keyword: str, pattern: str) -> None:
+        self.service: str = service
+        self.kind: str = kind
+        # Only lines containing this are matched against the pattern.
+        self.keyword: str = keyword.lower()
+        self.pattern: Pattern[str] = re.compile(pattern, re.IGNORECASE)
+
+
+# ASP.NET Core logs "Request finished HTTP/1.1 GET http://host/path - 200 null
+# application/json 12.3456ms", with "-" for an unknown length or content type.
+_REQUEST_FINISHED = (
+    r"Request finished \S+ (?P<method>[A-Z]+) (?P<key>\S+) - (?P<status>\d{3})"
+    r".*? (?P<milliseconds>[\d.]+)ms"
+)
+# Either "Topic: isar/robot/status - Message received" or the other way round.
+_MQTT_MESSAGE = r"^(?=.*\breceived\b).*?topic\W+(?P<key>[\w/+#-]+)"
+
+RULES: Tuple[EventRule, ...] = (
+    EventRule(
+        ISAR, "mission_started", "mission", r"start\w* (?:new )?mission\D*?" + _ID
+    ),
+    EventRule(
+        ISAR,
+        "task_finished",
+        "task",
+        r"task\W+"
+        + _ID
+        + r".*?\b(?P<status>partially_successful|successful|failed|cancelled)\b",
+    ),
+    EventRule(
+        ISAR,
+        "mission_finished",
+        "mission",
+        r"mission\W+"
+        + _ID
+        + r".*?(?:finished|completed)(?:.*?status\W+(?P<status>\w+))?",
+    ),
+    EventRule(ISAR, "inspection_uploaded", "uploaded", r"uploaded\W.*?" + _ID),
+    EventRule(FLOTILLA, "http_request", "request finished", _REQUEST_FINISHED),
+    EventRule(FLOTILLA, "mqtt_message", "topic", _MQTT_MESSAGE),
+    EventRule(
+        FLOTILLA,
+        "mission_run_updated",
+        "status",
+        r"mission(?: run)?\W+" + _ID + r".*?status\W+(?:updated to\W+)?(?P<status>\w+)",
+    ),
+    EventRule(SARA, "http_request", "request finished", _REQUEST_FINISHED),
+    EventRule(SARA, "mqtt_message", "topic", _MQTT_MESSAGE),
+    EventRule(
+        SARA,
+        "inspection_received",
+        "inspection",
+        r"(?:received|saved|ingest\w*)\W.*?inspection\D*?" + _ID,
+    ),
+    EventRule(
+        SARA, "workflow_failed", "workflow", r"failed to trigger workflow (?P<key>\S+)"
+    ),
+    EventRule(
+        SARA,
+        "workflow_triggered",
+        "workflow",
+        r"(?<!failed to )trigger(?:ed|ing)? workflow (?P<key>\S+)",
+    ),
+)
+
+
+class LogEvent:
+    __slots__ = ("at", "service", "container", "kind", "key", "fields")
+
+    def __init__(
+        self,
+        at: float,
+        service: str,
+        container: str,
+        kind: str,
+        key: Optional[str],
+        fields: Dict[str, str],
+    ) -> None:
+        # time.time() the line arrived.
+        self.at: float = at
+        self.service: str = service
+        self.container: str = container
+        self.kind: str = kind
+        self.key: Optional[str] = key
+        self.fields: Dict[str, str] = fields
+
+
+class _EventTable:
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._events: List[LogEvent] = []
+        self._rules: Dict[str, Tuple[EventRule, ...]] = {}
+        for rule in RULES:
+            self._rules[rule.service] = self._rules.get(rule.service, ()) + (rule,)
+
+    def parse(self, service: str, container: str, at: float, lines: List[str]) -> None:
+        rules: Tuple[EventRule, ...] = self._rules.get(service, ())
+        found: List[LogEvent] = []
+        for line in lines:
+            lowered: str = line.lower()
+            for rule in rules:
+                if rule.keyword not in lowered:
+                    continue
+                match = rule.pattern.search(line)
+                if match is None:
+                    continue
+                fields: Dict[str, str] = {
+                    name: value
+                    for name, value in match.groupdict().items()
+                    if value is not None and name != "key"
+                }
+                found.append(
+                    LogEvent(at, service, container, rule.kind, match["key"], fields)
+                )
+                # A line is one event, of the first rule it matches.
+                break
+        if found:
+            with self._lock:
+                self._events.extend(found)
+
+    def select(
+        self,
+        kind: Optional[str] = None,
+        service: Optional[str] = None,
+        key: Optional[str] = None,
+        since: Optional[float] = None,
+    ) -> List[LogEvent]:
+        with self._lock:
+            events: List[LogEvent] = list(self._events)
+        return [
+            event
+            for event in events
+            if (kind is None or event.kind == kind)
+            and (service is None or event.service == service)
+            and (key is None or _same_id(event.key, key))
+            and (since is None or event.at >= since)
+        ]
+
+    def clear(self) -> List[LogEvent]:
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+
+def _same_id(found: Optional[str], key: str) -> bool:
+    """IDs match when one is the other shortened, as the services print them."""
+    if found is None:
+        return False
+    found, key = found.lower(), key.lower()
+    return found.startswith(key) or key.startswith(found)
+
+
+_table: _EventTable = _EventTable()
+
+
+def record_log_events(
+    service: str, container: str, at: float, lines: List[str]
+) -> None:
+    _table.parse(service, container, at, lines)
+
+
+def log_events(
+    kind: Optional[str] = None,
+    service: Optional[str] = None,
+    key: Optional[str] = None,
+    since: Optional[float] = None,
+) -> List[LogEvent]:
+    """The events so far in this test, oldest first; *key* may be a shortened ID."""
+    return _table.select(kind, service, key, since)
+
+
+def latency(
+    from_kind: str,
+    to_kind: str,
+    from_key: Optional[str] = None,
+    to_key: Optional[str] = None,
+) -> Optional[float]:
+    """Seconds from the first *from_kind* event to the first *to_kind* after it.
+
+    None when either has not happened, e.g. latency("task_finished",
+    "inspection_received") before SARA has received the task's inspection.
+    """
+    started: List[LogEvent] = log_events(from_kind, key=from_key)
+    if not started:
+        return None
+    ended: List[LogEvent] = log_events(to_kind, key=to_key, since=started[0].at)
+    if not ended:
+        return None
+    return ended[0].at - started[0].at
+
+
+def begin_test_log_events() -> None:
+    _table.clear()
+
+
+def export_test_log_events(test_id: str) -> Optional[Path]:
+    """Write the test's events to its CSV file, if there were any, and forget them."""
+    events: List[LogEvent] = _table.clear()
+    if not events:
+        return None
+    path: Path = archive_path(test_id, ".events.csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as export:
+        writer = csv.writer(export)
+        writer.writerow(("at", "service", "container", "kind", "key", "fields"))
+        for event in events:
+            writer.writerow(
+                (
+                    datetime.fromtimestamp(event.at).isoformat(timespec="milliseconds"),
+                    event.service,
+                    event.container,
+                    event.kind,
+                    event.key or "",
+                    json.dumps(event.fields) if event.fields else "",
+                )
+            )
+    return path
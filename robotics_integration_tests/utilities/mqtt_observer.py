@@ -0,0 +1,102 @@
+"""Follow what the robots report on the Flotilla broker.
+
+The observer subscribes to ISAR's status, mission and task topics and reports
+each message to the wait engine as activity on what it concerns, e.g. a status
+message on the robots of the backend the broker serves, so that a wait on those
+robots looks again the moment a robot reports a change rather than up to a
+second later. The backend tells the observer which activity that is with
+report(). The messages themselves are not kept.
+
+Flotilla's API stays the source of truth for what the tests assert, since it
+is what Flotilla makes of these messages that is under test.
+"""
+
+import ssl
+import uuid
+from typing import Dict, Hashable, Tuple
+
+import paho.mqtt.client as mqtt
+from loguru import logger
+
+from robotics_integration_tests.utilities.wait_engine import report_activity
+
+# ISAR publishes on isar/<isar id>/<topic>.
+ISAR_TOPICS: Tuple[str, ...] = (
+    "isar/+/status",
+    "isar/+/mission",
+    "isar/+/task",
+)
+
+_KEEP_ALIVE_SECONDS = 30
+_RECONNECT_DELAY_SECONDS = 2
+
+
+class MqttObserver:
+    def __init__(self, host: str, port: int, username: str, password: str) -> None:
+        self.host: str = host
+        self.port: int = port
+        # ISAR's topic, e.g. "status" -> the activity its messages are reported on
+        self._activity: Dict[str, Tuple[Hashable, ...]] = {}
+        self._client: mqtt.Client = mqtt.Client(
+            mqtt.CallbackAPIVersion.VERSION2,
+            client_id=f"armada-observer-{uuid.uuid4().hex[:8]}",
+            protocol=mqtt.MQTTv311,
+        )
+        self._client.username_pw_set(username, password)
+        # The broker's certificate is issued to its network alias, which the
+        # host does not resolve; what is observed here is not trusted anyway.
+        self._client.tls_set(cert_reqs=ssl.CERT_NONE)
+        self._client.tls_insecure_set(True)
+        self._client.reconnect_delay_set(
+            min_delay=1, max_delay=_RECONNECT_DELAY_SECONDS
+        )
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+        self._started: bool = False
+
+    def start(self) -> "MqttObserver":
+        # The client's thread connects, and reconnects after losing the broker.
+        self._client.connect_async(self.host, self.port, _KEEP_ALIVE_SECONDS)
+        self._client.loop_start()
+        self._started = True
+        return self
+
+    def stop(self) -> None:
+        if not self._started:
+            return
+        self._client.disconnect()
+        self._client.loop_stop()
+        self._started = False
+
+    def report(self, topic: str, *keys: Hashable) -> None:
+        """Report each message on ISAR's *topic*, e.g. "status", as activity on
+        *keys*, as well as on what it was reported on before."""
+        self._activity[topic] = self._activity.get(topic, ()) + keys
+
+    def __enter__(self) -> "MqttObserver":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties) -> None:
+        if reason_code.is_failure:
+            logger.warning(f"MQTT broker refused the observer: {reason_code}")
+            return
+        client.subscribe([(topic, 0) for topic in ISAR_TOPICS])
+        logger.debug(f"MQTT observer subscribed to {', '.join(ISAR_TOPICS)}")
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties) -> None:
+        if self._started and reason_code.is_failure:
+            # Until it is back, the waits poll at their usual pace.
+            logger.warning(
+                f"MQTT observer lost the broker, reconnecting: {reason_code}"
+            )
+
+    def _on_message(self, client, userdata, message: mqtt.MQTTMessage) -> None:
+        keys: Tuple[Hashable, ...] = self._activity.get(
+            message.topic.rsplit("/", 1)[-1], ()
+        )
+        if keys:
+            report_activity(*keys)
@@ -1,39 +1,32 @@
-import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Tuple
+from typing import Dict, List, Tuple
 
-import requests
 from loguru import logger
-from requests import Response
 
 from robotics_integration_tests.custom_containers.stream_logging_docker_container import (
     StreamLoggingDockerContainer,
 )
 from robotics_integration_tests.settings.settings import settings
-from robotics_integration_tests.utilities.authentication import (
-    retrieve_access_token_for_integration_tests_app,
+from robotics_integration_tests.utilities.backend_client import (
+    BackendClient,
+    backend_client,
 )
+from robotics_integration_tests.utilities.container_readiness import Backoff
+from robotics_integration_tests.utilities.wait_engine import Expectation
 
 
-def _add_headers() -> Dict[str, str]:
-    access_token: str = retrieve_access_token_for_integration_tests_app(
-        settings.SARA_SCOPE
-    )
-    headers = {"Authorization": f"Bearer {access_token}"}
-    return headers
+def sara_client(sara_url: str) -> BackendClient:
+    return backend_client(sara_url, settings.SARA_SCOPE)
 
 
 def _list_database_entries(backend_url: str, request_path: str) -> List[Dict]:
     logger.info(f"Listing database entries for path: {backend_url}/{request_path}")
-    response: Response = requests.get(
-        f"{backend_url}/{request_path}", headers=_add_headers()
-    )
-    response.raise_for_status()
-    return response.json()
+    return sara_client(backend_url).get(request_path)
 
 
 def wait_for_sara_to_be_responsive(sara_url: str, timeout: int = 60) -> None:
     start_time: datetime = datetime.now()
+    backoff: Backoff = Backoff()
     while True:
         if datetime.now() - start_time > timedelta(seconds=timeout):
             raise RuntimeError(
@@ -48,7 +41,7 @@ def wait_for_sara_to_be_responsive(sara_url: str, timeout: int = 60) -> None:
             logger.warning(
                 f"Backend is not responsive yet, will retry until timeout... Exception: {e}"
             )
-            time.sleep(1)
+            backoff.sleep()
             continue
 
         if len(analysis_groups) >= 0:
@@ -56,27 +49,13 @@ def wait_for_sara_to_be_responsive(sara_url: str, timeout: int = 60) -> None:
             return
 
 
-def wait_for_sara_logs(
-    container: StreamLoggingDockerContainer, log_message: str, timeout: int = 60
-) -> List[Dict]:
-
-    def logs_to_text(logs: Any) -> str:
-        if logs is None:
-            return ""
-        if isinstance(logs, str):
-            return logs
-        if isinstance(logs, (bytes, bytearray)):
-            return logs.decode("utf-8", errors="replace")
-        if isinstance(logs, (list, tuple)):
-            return "\n".join(logs_to_text(part) for part in logs)
-        return str(logs)
+def sara_log_contains(
+    container: StreamLoggingDockerContainer, log_message: str
+) -> Expectation:
+    return container.logged(log_message, description=f"SARA logged: {log_message}")
 
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        logs = container.get_logs()
-        logs = logs_to_text(logs)
 
-        if log_message in logs:
-            return
-        time.sleep(1)
-    raise AssertionError(f"Did not find log line within {timeout}s: {log_message}")
+def wait_for_sara_logs(
+    container: StreamLoggingDockerContainer, log_message: str, timeout: int = 60
+) -> None:
+    container.wait_for_log(log_message, timeout=timeout)
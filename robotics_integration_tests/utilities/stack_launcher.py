@@ -0,0 +1,157 @@
+"""Start the components of a stack concurrently, in dependency order.
+
+A component is a context manager factory shaped like a generator fixture: it is
+called with the values of the components it depends on as keyword arguments,
+yields its own value, and is cleaned up when the launcher closes. Every component
+starts as soon as its dependencies have, so bringing up a stack takes as long as
+its longest dependency chain rather than the sum of all of them.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Set, Tuple
+
+from loguru import logger
+
+ComponentFactory = Callable[..., ContextManager[Any]]
+
+
+class _Component:
+    def __init__(
+        self, name: str, factory: ComponentFactory, depends_on: Tuple[str, ...]
+    ) -> None:
+        self.name: str = name
+        self.factory: ComponentFactory = factory
+        self.depends_on: Tuple[str, ...] = depends_on
+
+
+class StackLauncher:
+    def __init__(self, name: str = "stack") -> None:
+        self.name: str = name
+        self._components: Dict[str, _Component] = {}
+        self._futures: Dict[str, Future] = {}
+        # Filled in order of completion, so closing in reverse tears every
+        # component down before anything it depends on.
+        self._exit_stacks: List[ExitStack] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def add(
+        self,
+        name: str,
+        factory: ComponentFactory,
+        depends_on: Iterable[str] = (),
+    ) -> "StackLauncher":
+        if name in self._components:
+            raise ValueError(f"Component '{name}' is already part of {self.name}")
+        self._components[name] = _Component(name, factory, tuple(depends_on))
+        return self
+
+    def start(self, *names: str) -> "StackLauncher":
+        """Start the given components, or all of them, without blocking.
+
+        Dependencies are started along with the components that need them.
+        """
+        with self._lock:
+            if self._executor is None:
+                # One thread per component: a component waiting on its
+                # dependencies holds a thread, so fewer could deadlock.
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(len(self._components), 1),
+                    thread_name_prefix=self.name,
+                )
+            for name in self._resolve(names or tuple(self._components)):
+                if name not in self._futures:
+                    # In a copy of the caller's context, so that context variables
+                    # set around start() reach the components.
+                    self._futures[name] = self._executor.submit(
+                        contextvars.copy_context().run, self._run, name
+                    )
+        return self
+
+    def get(self, name: str) -> Any:
+        """Start a component if needed and block until it is up."""
+        self.start(name)
+        return self._futures[name].result()
+
+    def get_all(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Start the components and block until all are up, or one has failed.
+
+        Raises the first failure as soon as it happens, without waiting for the
+        others to finish starting.
+        """
+        names = tuple(names)
+        self.start(*names)
+        futures: List[Future] = [self._futures[name] for name in names]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        return {name: self._futures[name].result() for name in names}
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        while self._exit_stacks:
+            self._exit_stacks.pop().close()
+
+    def __enter__(self) -> "StackLauncher":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _resolve(self, names: Iterable[str]) -> List[str]:
+        """The given components and everything they depend on, dependencies first."""
+        ordered: List[str] = []
+        visiting: Set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in ordered:
+                return
+            if name not in self._components:
+                raise KeyError(f"{self.name} has no component named '{name}'")
+            if name in visiting:
+                raise ValueError(f"Dependency cycle in {self.name} through '{name}'")
+            visiting.add(name)
+            for dependency in self._components[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for name in names:
+            visit(name)
+        return ordered
+
+    def _run(self, name: str) -> Any:
+        component: _Component = self._components[name]
+        dependencies: Dict[str, Any] = {}
+        for dependency in component.depends_on:
+            try:
+                dependencies[dependency] = self._futures[dependency].result()
+            except Exception as e:
+                raise RuntimeError(
+                    f"{self.name}: '{name}' was not started because its "
+                    f"dependency '{dependency}' failed"
+                ) from e
+
+        start_time: float = time.monotonic()
+        stack: ExitStack = ExitStack()
+        try:
+            value: Any = stack.enter_context(component.factory(**dependencies))
+        except Exception:
+            logger.exception(f"{self.name}: '{name}' failed to start")
+            stack.close()
+            raise
+
+        with self._lock:
+            self._exit_stacks.append(stack)
+        logger.info(
+            f"{self.name}: '{name}' started in {time.monotonic() - start_time:.1f}s"
+        )
+        return value
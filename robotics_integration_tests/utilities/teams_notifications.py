@@ -1,68 +1,82 @@
-import time
-from datetime import datetime, timedelta
-from typing import Dict, List
-
-from loguru import logger
+from typing import Dict, List, Optional
 
 from robotics_integration_tests.custom_containers.teams_webhook_receiver import (
     TeamsWebhookReceiver,
 )
+from robotics_integration_tests.utilities.wait_engine import (
+    Expectation,
+    Source,
+    wait_for,
+)
 
 
-def wait_for_all_teams_notifications(
+def notification_messages_source(receiver: TeamsWebhookReceiver) -> Source:
+    return Source(
+        key=("teams_notifications", receiver.host_url),
+        fetch=receiver.get_notification_messages,
+        description="Teams notifications",
+    )
+
+
+def teams_notification_received(
     receiver: TeamsWebhookReceiver,
-    notification_expectations: Dict[str, bool],
-    timeout: int = 60,
-) -> None:
-    """Poll the webhook receiver until all expected notifications have arrived,
-    or *timeout* seconds have elapsed.
+    robot_name: str,
+    after: Optional[Expectation] = None,
+) -> Expectation:
+    """Met once a Teams notification mentions the robot; returns the first one."""
+    return Expectation(
+        description=f"Teams notification for robot '{robot_name}'",
+        source=notification_messages_source(receiver),
+        predicate=lambda messages: bool(_mentioning(messages, robot_name)),
+        result=lambda messages: _mentioning(messages, robot_name)[0],
+        show=len,
+        after=after,
+    )
+
+
+def no_teams_notification(
+    receiver: TeamsWebhookReceiver, robot_name: str
+) -> Expectation:
+    """Checked once everything else is met: no notification mentions the robot."""
+    return Expectation(
+        description=f"No Teams notification for robot '{robot_name}'",
+        source=notification_messages_source(receiver),
+        predicate=lambda messages: not _mentioning(messages, robot_name),
+        show=lambda messages: _mentioning(messages, robot_name),
+        final=True,
+    )
 
-    *notification_expectations* maps robot names to whether a notification is
+
+def teams_notification_expectations(
+    receiver: TeamsWebhookReceiver, notification_expectations: Dict[str, bool]
+) -> List[Expectation]:
+    """*notification_expectations* maps robot names to whether a notification is
     expected (``True``) or not (``False``).
 
-    Robots expecting notifications are polled in a loop. Once all expected
-    notifications have arrived, robots that should **not** have notifications
-    are verified to have none.
+    Robots that should **not** have notifications are verified to have none
+    once all expected notifications have arrived.
     """
-    expected: List[str] = [
-        name for name, should_notify in notification_expectations.items() if should_notify
-    ]
-    not_expected: List[str] = [
-        name for name, should_notify in notification_expectations.items() if not should_notify
+    return [
+        teams_notification_received(receiver, robot_name)
+        if should_notify
+        else no_teams_notification(receiver, robot_name)
+        for robot_name, should_notify in notification_expectations.items()
     ]
 
-    remaining: set = set(expected)
-    start_time: datetime = datetime.now()
-
-    while remaining:
-        if datetime.now() - start_time > timedelta(seconds=timeout):
-            messages = receiver.get_notification_messages()
-            raise TimeoutError(
-                f"Timeout waiting for Teams notifications within {timeout}s. "
-                f"Still waiting for robots: {remaining}. "
-                f"Received messages: {messages}"
-            )
 
-        messages = receiver.get_notification_messages()
-        for robot_name in list(remaining):
-            matching = [m for m in messages if robot_name in m]
-            if matching:
-                logger.info(
-                    f"Received Teams notification for robot '{robot_name}': {matching[0]}"
-                )
-                remaining.discard(robot_name)
-
-        if remaining:
-            time.sleep(1)
+def wait_for_all_teams_notifications(
+    receiver: TeamsWebhookReceiver,
+    notification_expectations: Dict[str, bool],
+    timeout: int = 60,
+) -> None:
+    """Wait until all expected notifications have arrived, or *timeout* seconds
+    have elapsed; see teams_notification_expectations().
+    """
+    wait_for(
+        teams_notification_expectations(receiver, notification_expectations),
+        timeout=timeout,
+    )
 
-    messages = receiver.get_notification_messages()
-    logger.info(f"All expected notifications received. Total messages: {messages}")
 
-    for robot_name in not_expected:
-        matching = [m for m in messages if robot_name in m]
-        if matching:
-            raise AssertionError(
-                f"Robot '{robot_name}' should not have a Teams notification "
-                f"but received: {matching}"
-            )
-        logger.info(f"Robot '{robot_name}' correctly has no Teams notification")
+def _mentioning(messages: List[str], robot_name: str) -> List[str]:
+    return [message for message in messages if robot_name in message]
@@ -0,0 +1,297 @@
+"""Wait for many outcomes at once, each declared as a predicate over a source.
+
+A Source is something to poll, such as a mission run, the robot list or a blob
+container; an Expectation is a condition on what a source returns. wait_for()
+polls until every expectation it is given has been met:
+
+- Each tick fetches every source that an unmet expectation depends on, once,
+  however many expectations share it, and concurrently with the other sources.
+- An expectation with `after` is only evaluated once that one has been met, so
+  a test can wait on its whole chain of outcomes in one call, e.g. "the robot
+  is Home" only counting after "the mission run is Successful".
+- A `final` expectation is checked once, after all the others are met, for
+  things that must not have happened; it fails the wait rather than being
+  waited for.
+- A source may have a close hook, such as a log watch to unregister. It is
+  called once no unmet expectation of the wait uses the source, and at the
+  latest when the wait ends, however it ends.
+- The interval between ticks starts short, backs off while nothing changes and
+  starts short again after any progress.
+- A source may name the activity that changes what it returns, e.g. the robots
+  of one Flotilla backend. When something reports that activity, as the MQTT
+  observer does for each message on that backend's broker, the waits on the
+  source tick at once; waits on other sources are not woken.
+
+The domain modules provide the sources and expectations: mission runs and robots
+in flotilla_backend_api.py, blobs in blob_storage.py, notifications in
+teams_notifications.py and container output in log_collector.py.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
+
+from loguru import logger
+
+# At most this many sources are fetched at the same time.
+_MAX_CONCURRENT_FETCHES = 8
+
+# The shortest interval between ticks, and the longest.
+_MIN_INTERVAL = 0.1
+_MAX_INTERVAL = 1.0
+
+# How long after a report of activity the next tick starts.
+_SETTLE = 0.05
+
+
+class _Subscription:
+    def __init__(self) -> None:
+        # The activity the sources of the next tick follow.
+        self.keys: FrozenSet[Hashable] = frozenset()
+        self.reported: threading.Event = threading.Event()
+
+
+class _Activity:
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self._subscriptions: Set[_Subscription] = set()
+
+    def notify(self, keys: Iterable[Hashable]) -> None:
+        reported: FrozenSet[Hashable] = frozenset(keys)
+        with self._lock:
+            for subscription in self._subscriptions:
+                if not subscription.keys.isdisjoint(reported):
+                    subscription.reported.set()
+
+    @contextmanager
+    def subscription(self) -> Iterator[_Subscription]:
+        subscription: _Subscription = _Subscription()
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+    def listen(self, subscription: _Subscription, keys: Iterable[Hashable]) -> None:
+        """Follow *keys* from now on, forgetting what was reported before."""
+        with self._lock:
+            subscription.keys = frozenset(keys)
+            subscription.reported.clear()
+
+
+_activity: _Activity = _Activity()
+
+
+def report_activity(*keys: Hashable) -> None:
+    """Wake the wait_for() calls on sources following any of *keys* for a tick."""
+    _activity.notify(keys)
+
+
+class Source:
+    def __init__(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Any],
+        description: str,
+        activity: Iterable[Hashable] = (),
+        close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        # Sources with equal keys are the same source, and fetched once per tick.
+        self.key: Hashable = key
+        self.fetch: Callable[[], Any] = fetch
+        self.description: str = description
+        # The keys of report_activity() that may mean a change in what it returns.
+        self.activity: FrozenSet[Hashable] = frozenset(activity)
+        # Releases what fetching needs, once a wait_for() is done with the source.
+        self.close: Optional[Callable[[], None]] = close
+
+
+class Expectation:
+    def __init__(
+        self,
+        description: str,
+        source: Source,
+        predicate: Callable[[Any], bool],
+        result: Callable[[Any], Any] = lambda value: value,
+        show: Callable[[Any], Any] = lambda value: value,
+        after: Optional["Expectation"] = None,
+        final: bool = False,
+    ) -> None:
+        self.description: str = description
+        self.source: Source = source
+        self.predicate: Callable[[Any], bool] = predicate
+        # What wait_for() returns for this expectation, from the value that met it.
+        self.result: Callable[[Any], Any] = result
+        # What a timeout or failure reports as last seen.
+        self.show: Callable[[Any], Any] = show
+        self.after: Optional[Expectation] = after
+        self.final: bool = final
+
+    def __repr__(self) -> str:
+        return self.description
+
+
+def wait_for(
+    expectations: Iterable[Expectation], timeout: float = 60
+) -> Dict[Expectation, Any]:
+    """Block until every expectation is met; maps each to its result.
+
+    Raises TimeoutError listing what is still unmet, and AssertionError when a
+    final expectation does not hold.
+    """
+    pending: List[Expectation] = _with_dependencies(expectations)
+    met: Dict[Expectation, Any] = {}
+    last_seen: Dict[Expectation, Any] = {}
+    interval: _Interval = _Interval()
+    deadline: float = time.monotonic() + timeout
+
+    with (
+        ThreadPoolExecutor(
+            max_workers=_MAX_CONCURRENT_FETCHES, thread_name_prefix="wait-engine"
+        ) as executor,
+        _activity.subscription() as subscription,
+        _OpenSources(pending) as open_sources,
+    ):
+        while pending:
+            due: List[Expectation] = _due(pending, met)
+            _activity.listen(
+                subscription, (key for e in due for key in e.source.activity)
+            )
+            values: Dict[Hashable, Any] = _fetch_all(
+                executor, {e.source.key: e.source for e in due}
+            )
+
+            progressed: bool = False
+            for expectation in due:
+                if expectation.source.key not in values:
+                    continue
+                value: Any = values[expectation.source.key]
+                if expectation.predicate(value):
+                    met[expectation] = expectation.result(value)
+                    pending.remove(expectation)
+                    progressed = True
+                    logger.info(f"Met: {expectation.description}")
+                elif expectation.final:
+                    raise AssertionError(
+                        f"{expectation.description} does not hold, "
+                        f"found: {expectation.show(value)}"
+                    )
+                else:
+                    last_seen[expectation] = expectation.show(value)
+
+            if not pending:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Timed out after {timeout}s waiting for:\n"
+                    + "\n".join(
+                        f"  - {e.description} (last seen: {last_seen.get(e, 'nothing')})"
+                        for e in pending
+                    )
+                )
+            if progressed:
+                interval.reset()
+                open_sources.close_unused(pending)
+            # The last tick comes at the deadline rather than an interval past it.
+            delay: float = min(interval.next(), max(deadline - time.monotonic(), 0))
+            if subscription.reported.wait(timeout=delay):
+                # What was reported may take a moment to reach the sources, e.g.
+                # Flotilla's database, and often comes in bursts; look shortly
+                # after. Only progress shortens the interval again, so that a
+                # stream of reports that change nothing does not keep it short.
+                time.sleep(_SETTLE)
+
+    return met
+
+
+class _OpenSources:
+    """The sources of a wait with a close hook that has not been called yet."""
+
+    def __init__(self, expectations: Iterable[Expectation]) -> None:
+        self._sources: List[Source] = []
+        for expectation in expectations:
+            source: Source = expectation.source
+            if source.close is not None and source not in self._sources:
+                self._sources.append(source)
+
+    def close_unused(self, pending: Iterable[Expectation]) -> None:
+        used: Set[Hashable] = {e.source.key for e in pending}
+        for source in [s for s in self._sources if s.key not in used]:
+            self._sources.remove(source)
+            source.close()
+
+    def __enter__(self) -> "_OpenSources":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close_unused(())
+
+
+class _Interval:
+    def __init__(self) -> None:
+        self._delay: float = _MIN_INTERVAL
+
+    def next(self) -> float:
+        delay: float = self._delay
+        self._delay = min(self._delay * 2, _MAX_INTERVAL)
+        return delay
+
+    def reset(self) -> None:
+        self._delay = _MIN_INTERVAL
+
+
+def _with_dependencies(expectations: Iterable[Expectation]) -> List[Expectation]:
+    """The expectations together with everything they wait for via `after`."""
+    result: List[Expectation] = []
+    for expectation in expectations:
+        chain: List[Expectation] = []
+        current: Optional[Expectation] = expectation
+        while current is not None and current not in result and current not in chain:
+            chain.append(current)
+            current = current.after
+        result.extend(reversed(chain))
+    return result
+
+
+def _due(pending: List[Expectation], met: Dict[Expectation, Any]) -> List[Expectation]:
+    ready: List[Expectation] = [e for e in pending if e.after is None or e.after in met]
+    waiting: List[Expectation] = [e for e in ready if not e.final]
+    if waiting or any(not e.final for e in pending):
+        return waiting
+    return ready
+
+
+def _fetch_all(
+    executor: ThreadPoolExecutor, sources: Dict[Hashable, Source]
+) -> Dict[Hashable, Any]:
+    """Fetch every source concurrently; a source that fails is left out."""
+    # The fetches authenticate with the issuer of the waiting thread.
+    futures: Dict[Hashable, Future] = {
+        key: executor.submit(contextvars.copy_context().run, source.fetch)
+        for key, source in sources.items()
+    }
+    values: Dict[Hashable, Any] = {}
+    for key, future in futures.items():
+        try:
+            values[key] = future.result()
+        except Exception as e:
+            logger.warning(
+                f"Failed to fetch {sources[key].description}, will retry... {e}"
+            )
+    return values